@@ -0,0 +1,229 @@
+"""
+Micro-benchmarks for the CPU-bound, LLM-free hot paths, with regression thresholds.
+
+Usage:
+    python -m backend.benchmarks.bench_hot_paths [--corpus-dir DIR] [--filter TEXT]
+        [--update-baseline] [--max-slowdown 0.15] [--max-memory-growth 0.25] [--json out.json]
+
+Every case runs over the resume corpus (see `corpus.py`): text extraction,
+page counting, section identification, the rule checker, score aggregation,
+both `backend.core.parsers` parsers and Typst rendering at three resume
+sizes. For each case the script reports the median throughput of several
+timed rounds and the peak Python heap of a single call (tracemalloc; memory
+allocated inside native libraries such as MuPDF is not visible to it).
+
+Results are compared against the stored baseline (baselines/hot_paths.json).
+The script exits with status 1 if any case is slower than the baseline by
+more than --max-slowdown, or its peak memory grew by more than
+--max-memory-growth. Baselines are machine-specific: after an intended
+change, or on a new reference machine, refresh them with --update-baseline
+and commit the file alongside the change.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import tempfile
+import tracemalloc
+from contextlib import redirect_stdout
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backend.benchmarks.corpus import SIZES, CorpusFile, build_corpus, resume_lines
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "hot_paths.json")
+
+# Peak-memory changes below this are noise, whatever the relative growth.
+MEMORY_SLACK_BYTES = 16 * 1024
+
+SAMPLE_EVALUATION = json.dumps({
+    category: {"score": 7, "feedback": f"Sample feedback on {category}."}
+    for category in ("structure", "language", "ats", "summary", "experience", "skills", "relevance")
+})
+
+
+def measure(func: Callable[[], object], min_time_seconds: float, rounds: int) -> Dict[str, float]:
+    """
+    Times `func` and records its peak Python heap.
+
+    The number of calls per round is calibrated so one round takes at least
+    `min_time_seconds`; the reported throughput is the median over `rounds`.
+    """
+    with redirect_stdout(io.StringIO()):
+        func()  # Warm caches and lazy imports.
+
+        calls, elapsed = 1, 0.0
+        while True:
+            started = time.perf_counter()
+            for _ in range(calls):
+                func()
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_time_seconds:
+                break
+            calls = max(calls * 2, int(calls * min_time_seconds / max(elapsed, 1e-9)))
+
+        samples = [calls / elapsed]
+        for _ in range(rounds - 1):
+            started = time.perf_counter()
+            for _ in range(calls):
+                func()
+            samples.append(calls / (time.perf_counter() - started))
+
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {"ops_per_sec": statistics.median(samples), "peak_bytes": peak}
+
+
+def build_cases(corpus: List[CorpusFile]) -> List[Tuple[str, Callable[[], object]]]:
+    """The benchmark cases, as (name, zero-argument callable) pairs."""
+    from backend.core.agents.analyzer.preprocessor_agent import PreprocessorAgent
+    from backend.core.agents.analyzer.rule_checker_agent import RuleCheckerAgent
+    from backend.core.agents.analyzer.aggregator_agent import AggregatorAgent
+    from backend.core.parsers import get_parser
+
+    preprocessor, rule_checker, aggregator = PreprocessorAgent(), RuleCheckerAgent(), AggregatorAgent()
+    cases = []
+    for item in corpus:
+        text = preprocessor.extract_text(item.path)
+        page_count = preprocessor.get_page_count(item.path)
+        with open(item.path, "rb") as f:
+            content = f.read()
+        parser = get_parser(item.path)()
+
+        cases += [
+            (f"preprocessor.extract_text[{item.name}]", lambda p=item.path: preprocessor.extract_text(p)),
+            (f"preprocessor.identify_sections[{item.name}]", lambda t=text: preprocessor.identify_sections(t)),
+            (f"rule_checker.check_rules[{item.name}]", lambda t=text, n=page_count: rule_checker.check_rules(t, n)),
+            (f"parsers.{type(parser).__name__}[{item.name}]",
+             lambda p=parser, c=content: p.parse_to_text(io.BytesIO(c))),
+        ]
+        if item.file_type == ".pdf":
+            # Other formats return a constant estimate without opening the file.
+            cases.append((f"preprocessor.get_page_count[{item.name}]", lambda p=item.path: preprocessor.get_page_count(p)))
+
+    rule_feedback = rule_checker.check_rules(preprocessor.extract_text(corpus[0].path), 1)
+    cases.append(("aggregator.aggregate_scores", lambda: aggregator.aggregate_scores(SAMPLE_EVALUATION, rule_feedback)))
+    cases += render_cases()
+    return cases
+
+
+def render_cases() -> List[Tuple[str, Callable[[], object]]]:
+    """Typst rendering at each corpus size, or nothing if no Typst backend is available here."""
+    from backend.core.data_models import FinalResumeSections
+    from backend.core.tools.pdf_renderer import TypstRenderer
+
+    renderer = TypstRenderer()
+    cases = []
+    for size in SIZES:
+        lines = resume_lines(size)
+        start, projects, education = lines.index("Work Experience"), lines.index("Projects"), lines.index("Education")
+        resume = FinalResumeSections(
+            summary=lines[start - 1],
+            experience="\n".join(line.replace("- ", "* ", 1) for line in lines[start + 1:projects]),
+            projects="\n".join(line.replace("- ", "* ", 1) for line in lines[projects + 1:education]),
+            skills=lines[-1],
+            education=f"* {lines[education + 1]}",
+        )
+        try:
+            with redirect_stdout(io.StringIO()):
+                renderer.render_to_pdf(resume)
+        except Exception as e:
+            print(f"Skipping typst.render_to_pdf: no working Typst backend ({e}).")
+            return []
+        cases.append((f"typst.render_to_pdf[{size}]", lambda r=resume: renderer.render_to_pdf(r)))
+    return cases
+
+
+def load_baseline(path: str) -> Dict[str, Dict[str, float]]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("cases", {})
+
+
+def save_baseline(path: str, results: Dict[str, Dict[str, float]]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    document = {
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "processor": platform.machine()},
+        "cases": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(current: Dict[str, float], baseline: Optional[Dict[str, float]],
+            max_slowdown: float, max_memory_growth: float) -> Tuple[str, List[str]]:
+    """Returns a one-line delta description and the list of threshold violations."""
+    if baseline is None:
+        return "new", []
+    speed = current["ops_per_sec"] / baseline["ops_per_sec"] - 1
+    memory = (current["peak_bytes"] - baseline["peak_bytes"]) / max(baseline["peak_bytes"], 1)
+    problems = []
+    if speed < -max_slowdown:
+        problems.append(f"throughput {speed:+.0%} (limit -{max_slowdown:.0%})")
+    if memory > max_memory_growth and current["peak_bytes"] - baseline["peak_bytes"] > MEMORY_SLACK_BYTES:
+        problems.append(f"peak memory {memory:+.0%} (limit +{max_memory_growth:.0%})")
+    return f"{speed:+7.1%} {memory:+7.1%}", problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus-dir", help="Directory of real .pdf/.docx resumes to include (or BENCH_CORPUS_DIR).")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this text.")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per timed round.")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the new baseline.")
+    parser.add_argument("--max-slowdown", type=float, default=0.15, help="Allowed throughput loss, as a fraction.")
+    parser.add_argument("--max-memory-growth", type=float, default=0.25, help="Allowed peak memory growth, as a fraction.")
+    parser.add_argument("--json", help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="rcraft_corpus_") as directory:
+        corpus = build_corpus(directory, args.corpus_dir)
+        cases = [(name, func) for name, func in build_cases(corpus) if args.filter in name]
+        baseline = load_baseline(args.baseline)
+
+        results, failures = {}, []
+        print(f"{'case':<58} {'ops/s':>10} {'peak KiB':>9} {'Δ ops/s':>8} {'Δ peak':>7}")
+        for name, func in cases:
+            result = results[name] = measure(func, args.min_time, args.rounds)
+            delta, problems = compare(result, baseline.get(name), args.max_slowdown, args.max_memory_growth)
+            failures += [f"{name}: {problem}" for problem in problems]
+            print(f"{name[:58]:<58} {result['ops_per_sec']:>10.1f} {result['peak_bytes'] / 1024:>9.1f} {delta}"
+                  f"{'  REGRESSION' if problems else ''}")
+
+    for name in sorted(set(baseline) - set(results)):
+        if args.filter in name:
+            print(f"{name[:58]:<58} {'skipped (in baseline, not run)':>36}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        # Keep baseline entries for cases this run filtered out or could not run.
+        save_baseline(args.baseline, {**baseline, **results})
+        print(f"\nBaseline updated: {args.baseline}")
+        return
+
+    if failures:
+        print("\nRegressions against the baseline:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nNo regressions against the baseline." if baseline else "\nNo baseline yet; run with --update-baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Measures how quickly a fresh API worker becomes ready to serve.
+
+Usage:
+    python -m backend.benchmarks.bench_startup [--runs 5] [--warmup none|background|blocking]
+
+Each run starts `uvicorn backend.main:app` on a free port and polls `GET /`
+until it answers, reporting the time from process start to the first
+successful response. The import cost of `backend.main` alone is reported
+separately so regressions can be traced to import time or to the lifespan.
+"""
+
+import argparse
+import statistics
+
+from backend.benchmarks.import_report import measure_imports
+from backend.benchmarks.server import start_api_server, stop_api_server
+
+
+def time_to_ready(warmup: str) -> float:
+    """Starts one worker and returns the milliseconds until `GET /` succeeds."""
+    process, _, ready_ms = start_api_server({"STARTUP_WARMUP": warmup})
+    stop_api_server(process)
+    return ready_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warmup", default="background", choices=["none", "background", "blocking"])
+    args = parser.parse_args()
+
+    import_ms = [
+        next(cumulative for name, _, cumulative, _ in measure_imports("backend.main") if name == "backend.main") / 1000
+        for _ in range(args.runs)
+    ]
+    ready_ms = [time_to_ready(args.warmup) for _ in range(args.runs)]
+
+    print(f"{'metric':<22} {'min':>10} {'median':>10} {'max':>10}")
+    for label, values in (("import backend.main", import_ms), (f"ready ({args.warmup})", ready_ms)):
+        print(f"{label:<22} {min(values):>8.1f}ms {statistics.median(values):>8.1f}ms {max(values):>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+A corpus of resume files for the parsing and analysis benchmarks.
+
+Synthetic resumes are generated in PDF and DOCX at three sizes (a short
+one-pager, a typical two-pager and a long CV) from a fixed seed, so every
+run sees identical input. Real-world files can be added by pointing
+`--corpus-dir` (or BENCH_CORPUS_DIR) at a directory of .pdf and .docx
+resumes; they are never committed, since they contain personal data.
+"""
+
+import os
+import random
+from dataclasses import dataclass
+from typing import List, Optional
+
+# Number of jobs, bullets per job and projects for each synthetic size.
+SIZES = {
+    "small": (2, 3, 1),
+    "medium": (4, 5, 3),
+    "large": (10, 8, 8),
+}
+
+_VERBS = ["Built", "Led", "Designed", "Reduced", "Migrated", "Automated", "Scaled", "Shipped"]
+_OBJECTS = ["a payments API", "the data pipeline", "an internal CLI", "the search service", "CI/CD", "a Redis cache"]
+_RESULTS = ["cutting p99 latency by 40%", "saving $120k/year", "serving 12M requests/day", "with zero downtime"]
+_SKILLS = ["Python", "Go", "FastAPI", "PostgreSQL", "Redis", "Kafka", "Kubernetes", "AWS", "Terraform", "React"]
+
+
+@dataclass(frozen=True)
+class CorpusFile:
+    name: str       # e.g. "synthetic-medium.pdf"
+    path: str
+    file_type: str  # ".pdf" or ".docx"
+    size_bytes: int
+
+
+def resume_lines(size: str, seed: int = 0) -> List[str]:
+    """The text of one synthetic resume, one line per paragraph."""
+    jobs, bullets, projects = SIZES[size]
+    rng = random.Random(f"{size}-{seed}")
+    lines = [
+        "Jane Doe",
+        "jane.doe@example.com | +1 555 010 0199 | linkedin.com/in/janedoe",
+        "Professional Summary",
+        "Backend engineer with a track record of shipping reliable, low-latency services.",
+        "Work Experience",
+    ]
+    for job in range(jobs):
+        lines.append(f"Software Engineer, Company {job + 1} ({2024 - 2 * job - 2} - {2024 - 2 * job})")
+        for _ in range(bullets):
+            lines.append(f"- {rng.choice(_VERBS)} {rng.choice(_OBJECTS)}, {rng.choice(_RESULTS)}.")
+    lines.append("Projects")
+    for project in range(projects):
+        lines.append(f"- Project {project + 1}: {rng.choice(_VERBS).lower()} {rng.choice(_OBJECTS)} in {rng.choice(_SKILLS)}.")
+    lines += [
+        "Education",
+        "B.Tech in Computer Science, Example University (2016)",
+        "Skills",
+        ", ".join(rng.sample(_SKILLS, 6)),
+    ]
+    return lines
+
+
+def write_pdf(lines: List[str], path: str) -> None:
+    import fitz
+
+    document = fitz.open()
+    page, y = None, 0
+    for line in lines:
+        if page is None or y > 770:
+            page, y = document.new_page(), 72
+        page.insert_text((72, y), line, fontsize=10)
+        y += 14
+    document.save(path)
+    document.close()
+
+
+def write_docx(lines: List[str], path: str) -> None:
+    import docx
+
+    document = docx.Document()
+    for line in lines:
+        document.add_paragraph(line)
+    document.save(path)
+
+
+def build_corpus(directory: str, corpus_dir: Optional[str] = None) -> List[CorpusFile]:
+    """
+    Writes the synthetic resumes into `directory` and collects any real ones.
+
+    Args:
+        directory: Where to write the generated files.
+        corpus_dir: Optional directory of real .pdf/.docx resumes. Defaults to
+            BENCH_CORPUS_DIR.
+
+    Returns:
+        The corpus, synthetic files first, in a stable order.
+    """
+    files = []
+    for size in SIZES:
+        lines = resume_lines(size)
+        for file_type, writer in ((".pdf", write_pdf), (".docx", write_docx)):
+            path = os.path.join(directory, f"synthetic-{size}{file_type}")
+            writer(lines, path)
+            files.append(CorpusFile(os.path.basename(path), path, file_type, os.path.getsize(path)))
+
+    corpus_dir = corpus_dir or os.getenv("BENCH_CORPUS_DIR")
+    if corpus_dir:
+        for name in sorted(os.listdir(corpus_dir)):
+            file_type = os.path.splitext(name)[1].lower()
+            if file_type in (".pdf", ".docx"):
+                path = os.path.join(corpus_dir, name)
+                files.append(CorpusFile(f"real-{name}", path, file_type, os.path.getsize(path)))
+    return files
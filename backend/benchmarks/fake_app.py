@@ -0,0 +1,13 @@
+"""
+The API with the offline stand-ins for Gemini and web search installed.
+
+Benchmarks serve `backend.benchmarks.fake_app:app` instead of
+`backend.main:app`; the fakes are configured through the FAKE_* environment
+variables (see `fake_providers`).
+"""
+
+from backend.benchmarks.fake_providers import install
+
+install()
+
+from backend.main import app  # noqa: E402
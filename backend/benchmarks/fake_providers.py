@@ -0,0 +1,244 @@
+import os
+import json
+import math
+import time
+import random
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Type, get_args, get_origin
+
+from pydantic import BaseModel
+
+# Local stand-ins for the Gemini API and the web search provider, so the whole
+# service can be load-tested offline without burning quota. `install()` plugs
+# them in at the shared call paths (`llm_client.set_llm_provider` and
+# `web_search_tool.set_search_provider`), so every agent, the scheduler,
+# tracing and retries run exactly as in production. Benchmarks start the API
+# through `backend.benchmarks.fake_app`, which installs them first.
+#
+# Behaviour is configured through the environment:
+#   FAKE_LLM_LATENCY_MS     latency distribution of one LLM call (see LatencyDistribution)
+#   FAKE_LLM_ERROR_RATE     probability that a call fails with a rate-limit error
+#   FAKE_LLM_FIXTURES       optional JSON file with canned outputs (see FakeLLM)
+#   FAKE_SEARCH_LATENCY_MS  latency distribution of one web search
+#   FAKE_SEARCH_ERROR_RATE  probability that a search fails
+#   FAKE_PROVIDER_SEED      seed for reproducible latencies and errors
+
+
+class LatencyDistribution:
+    """
+    A latency distribution in milliseconds, parsed from a spec string:
+
+    - "fixed:200"            always 200ms
+    - "uniform:100:500"      uniformly between 100 and 500ms
+    - "normal:800:150"       mean 800ms, standard deviation 150ms (clamped at 0)
+    - "lognormal:800:0.5"    median 800ms, log-space sigma 0.5 (a realistic long tail)
+    """
+
+    def __init__(self, spec: str, rng: random.Random):
+        kind, *params = spec.split(":")
+        self.kind = kind.strip().lower()
+        self.params = [float(p) for p in params]
+        self._rng = rng
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if self.kind not in expected or len(self.params) != expected[self.kind]:
+            raise ValueError(f"Invalid latency distribution: '{spec}'")
+
+    def sample_ms(self) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return self._rng.uniform(*self.params)
+        if self.kind == "normal":
+            return max(0.0, self._rng.gauss(*self.params))
+        median, sigma = self.params
+        return self._rng.lognormvariate(math.log(max(median, 1e-3)), sigma)
+
+
+def _rate_limit_error(message: str) -> Exception:
+    """The error the real SDKs raise when quota runs out, so retry paths are exercised."""
+    try:
+        from google.api_core import exceptions
+        return exceptions.ResourceExhausted(message)
+    except ImportError:
+        return RuntimeError(message)
+
+
+def build_fake_instance(schema: Type[BaseModel], overrides: Optional[Dict[str, Any]] = None) -> BaseModel:
+    """
+    Builds a valid instance of a Pydantic model with placeholder values.
+
+    Strings get a readable placeholder, lists get three items, numbers respect
+    `ge`/`le` bounds, and nested models are built recursively. `overrides`
+    supplies exact field values (e.g. from a fixture file).
+    """
+    values = dict(overrides or {})
+    for name, field in schema.model_fields.items():
+        if name not in values:
+            values[name] = _fake_value(field.annotation, name, field.metadata)
+    return schema.model_validate(values)
+
+
+def _fake_value(annotation: Any, name: str, metadata: List[Any]) -> Any:
+    origin = get_origin(annotation)
+    if origin is not None and type(None) in get_args(annotation):
+        # Optional[X]: fill in X.
+        annotation = next(arg for arg in get_args(annotation) if arg is not type(None))
+        origin = get_origin(annotation)
+    if origin in (list, List):
+        item_type = (get_args(annotation) or (str,))[0]
+        return [_fake_value(item_type, f"{name} {i + 1}", []) for i in range(3)]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return build_fake_instance(annotation)
+    if annotation in (int, float):
+        low = next((m.ge for m in metadata if getattr(m, "ge", None) is not None), 0)
+        high = next((m.le for m in metadata if getattr(m, "le", None) is not None), low + 10)
+        return annotation((low + high) / 2)
+    if annotation is bool:
+        return True
+    return f"Sample {name.replace('_', ' ')} for load testing."
+
+
+_DEFAULT_PERSONA = {
+    "hard_skills": ["Python", "Distributed systems", "SQL"],
+    "soft_skills": ["Communication", "Ownership"],
+    "key_responsibilities": ["Design services", "Mentor engineers", "Improve reliability"],
+}
+
+_DEFAULT_EVALUATION = {
+    category: {"score": 7, "feedback": f"Sample feedback on {category}."}
+    for category in ("structure", "language", "ats", "summary", "experience", "skills", "relevance")
+}
+
+_DEFAULT_DRAFT = "\n".join([
+    "**Summary**",
+    "Backend engineer with 6 years of experience building reliable Python services.",
+    "**Experience**",
+    "* Cut p99 latency by 40% by moving scoring to an async pipeline.",
+    "* Led a team of 4 engineers through a zero-downtime migration.",
+    "**Projects**",
+    "* resume-craft: LLM-driven resume optimizer.",
+    "**Skills**",
+    "Python, FastAPI, Redis, PostgreSQL, Kubernetes",
+])
+
+
+class FakeLLM:
+    """
+    A stand-in for Gemini that sleeps for a sampled latency and returns canned output.
+
+    Structured calls return the fixture for the schema's class name if one is
+    configured, otherwise an instance built by `build_fake_instance`. Text
+    calls return the first fixture whose "contains" string occurs in the
+    prompt, otherwise a default: the role persona and holistic evaluation
+    JSON for the analyzer, and a resume draft for the optimizer agents.
+
+    Fixture file layout (FAKE_LLM_FIXTURES):
+        {"schemas": {"ContextOutput": {...}},
+         "prompts": [{"contains": "ideal candidate persona", "text": "{...}"}]}
+    """
+
+    def __init__(self, latency_spec: Optional[str] = None, error_rate: Optional[float] = None,
+                 fixtures_path: Optional[str] = None, seed: Optional[int] = None):
+        seed = seed if seed is not None else os.getenv("FAKE_PROVIDER_SEED")
+        self._rng = random.Random(int(seed) if seed is not None else None)
+        self._rng_lock = threading.Lock()
+        self.latency = LatencyDistribution(latency_spec or os.getenv("FAKE_LLM_LATENCY_MS", "lognormal:800:0.5"), self._rng)
+        self.error_rate = error_rate if error_rate is not None else float(os.getenv("FAKE_LLM_ERROR_RATE", 0))
+        self.fixtures = {"schemas": {}, "prompts": []}
+        fixtures_path = fixtures_path or os.getenv("FAKE_LLM_FIXTURES")
+        if fixtures_path:
+            with open(fixtures_path, "r", encoding="utf-8") as f:
+                self.fixtures.update(json.load(f))
+
+    def _simulate_call(self, prompt_chars: int) -> Dict[str, int]:
+        """Sleeps for one sampled latency, maybe fails, and returns plausible token usage."""
+        with self._rng_lock:
+            delay_ms = self.latency.sample_ms()
+            failed = self._rng.random() < self.error_rate
+        time.sleep(delay_ms / 1000)
+        if failed:
+            raise _rate_limit_error("Fake provider: quota exceeded.")
+        input_tokens = max(1, prompt_chars // 4)
+        return {"input_tokens": input_tokens, "output_tokens": 256, "total_tokens": input_tokens + 256}
+
+    def _text_for(self, prompt: str) -> str:
+        for fixture in self.fixtures.get("prompts", []):
+            if fixture.get("contains", "") in prompt:
+                return fixture["text"]
+        if "ideal candidate persona" in prompt:
+            return json.dumps(_DEFAULT_PERSONA)
+        if "AI Resume Coach" in prompt:
+            return json.dumps(_DEFAULT_EVALUATION)
+        return _DEFAULT_DRAFT
+
+    def invoke(self, prompt: str, output_schema: Optional[Type[BaseModel]] = None):
+        """
+        Answers a chat prompt.
+
+        Returns:
+            A tuple of the result (a schema instance, or text) and the token usage.
+        """
+        usage = self._simulate_call(len(prompt))
+        if output_schema is None:
+            return self._text_for(prompt), usage
+        return build_fake_instance(output_schema, self.fixtures.get("schemas", {}).get(output_schema.__name__)), usage
+
+    def generate_content(self, prompt: str) -> "FakeGenerateContentResponse":
+        """Answers a `GenerativeModel.generate_content` call."""
+        text, usage = self.invoke(prompt)
+        return FakeGenerateContentResponse(text, usage)
+
+
+class FakeGenerateContentResponse:
+    """Mimics the parts of the google.generativeai response the agents read."""
+
+    class _Usage:
+        def __init__(self, usage: Dict[str, int]):
+            self.prompt_token_count = usage["input_tokens"]
+            self.candidates_token_count = usage["output_tokens"]
+            self.total_token_count = usage["total_tokens"]
+
+    def __init__(self, text: str, usage: Dict[str, int]):
+        self.text = text
+        self.usage_metadata = self._Usage(usage)
+
+
+class FakeSearch:
+    """A stand-in for DuckDuckGo that returns generated snippets after a sampled latency."""
+
+    def __init__(self, latency_spec: Optional[str] = None, error_rate: Optional[float] = None, seed: Optional[int] = None):
+        seed = seed if seed is not None else os.getenv("FAKE_PROVIDER_SEED")
+        self._rng = random.Random(int(seed) if seed is not None else None)
+        self._rng_lock = threading.Lock()
+        self.latency = LatencyDistribution(latency_spec or os.getenv("FAKE_SEARCH_LATENCY_MS", "lognormal:400:0.4"), self._rng)
+        self.error_rate = error_rate if error_rate is not None else float(os.getenv("FAKE_SEARCH_ERROR_RATE", 0))
+
+    def text(self, query: str, max_results: int = 3) -> List[str]:
+        with self._rng_lock:
+            delay_ms = self.latency.sample_ms()
+            failed = self._rng.random() < self.error_rate
+        time.sleep(delay_ms / 1000)
+        if failed:
+            raise ConnectionError("Fake search provider: request failed.")
+        return [
+            f"Result {i + 1} for '{query}': the company values ownership, customer focus and "
+            f"continuous learning, and its engineering teams ship small, well-tested changes."
+            for i in range(max_results)
+        ]
+
+
+def install(llm: Optional[FakeLLM] = None, search: Optional[FakeSearch] = None) -> Tuple[FakeLLM, FakeSearch]:
+    """
+    Routes every LLM call and web search of this process to the fakes.
+
+    Returns:
+        The installed fakes, configured from the environment unless given.
+    """
+    from backend.core.tools.llm_client import set_llm_provider
+    from backend.core.tools.web_search_tool import set_search_provider
+
+    llm = llm or FakeLLM()
+    search = search or FakeSearch()
+    set_llm_provider(llm)
+    set_search_provider(search)
+    return llm, search
@@ -0,0 +1,60 @@
+"""
+Reports what importing a module costs, broken down per imported module.
+
+Usage:
+    python -m backend.benchmarks.import_report [--module backend.main] [--top 25]
+
+Runs a fresh interpreter with `-X importtime` and prints the slowest modules
+by cumulative time (the module plus everything it imported first), together
+with their self time. Use it to check that heavy subsystems stay out of the
+API import path.
+"""
+
+import os
+import re
+import sys
+import argparse
+import subprocess
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def measure_imports(module: str) -> list:
+    """
+    Imports `module` in a fresh interpreter and parses the `-X importtime` output.
+
+    Returns:
+        A list of (module, self_us, cumulative_us, depth) tuples in import order.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env={**os.environ, "PYTHONPATH": os.getcwd()},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="backend.main")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    rows = measure_imports(args.module)
+    total_us = next(cumulative for name, _, cumulative, _ in rows if name == args.module)
+    print(f"Importing {args.module} took {total_us / 1000:.1f}ms ({len(rows)} modules)\n")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for name, self_us, cumulative_us, _ in sorted(rows, key=lambda row: row[2], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>10.1f}ms {self_us / 1000:>8.1f}ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
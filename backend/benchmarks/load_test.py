@@ -0,0 +1,226 @@
+"""
+End-to-end load test of the API against local stand-ins for Gemini and web search.
+
+Usage:
+    python -m backend.benchmarks.load_test [--concurrency 8] [--requests 40]
+        [--scenarios analyze,optimize,download] [--llm-latency lognormal:800:0.5]
+        [--llm-error-rate 0.0] [--search-latency lognormal:400:0.4] [--with-caches]
+        [--json results.json]
+
+Unless --base-url points at a running server, the script starts a uvicorn
+worker serving `backend.benchmarks.fake_app` (offline stand-ins for Gemini and
+web search, so no quota is used), drives each scenario at the target
+concurrency, and reports throughput and
+p50/p95/p99 latency per endpoint. Spans are exported to a trace file, which
+is summarised into a per-stage breakdown (pipeline steps, optimizer nodes,
+LLM calls, Typst compiles, Redis operations).
+
+The generated requests share most of their text, so the LLM response cache
+and the job-description dedup index would answer nearly all of them and the
+run would measure cache hits rather than the pipeline. Both are switched off
+in the started worker unless --with-caches asks to measure them.
+
+Requires httpx.
+"""
+
+import os
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from backend.benchmarks.server import start_api_server, stop_api_server
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))]
+
+
+def summarize(latencies_ms: List[float]) -> Dict[str, Optional[float]]:
+    return {
+        "p50_ms": percentile(latencies_ms, 50),
+        "p95_ms": percentile(latencies_ms, 95),
+        "p99_ms": percentile(latencies_ms, 99),
+        "mean_ms": sum(latencies_ms) / len(latencies_ms) if latencies_ms else None,
+    }
+
+
+def sample_resume_pdf(index: int) -> bytes:
+    """A small one-page PDF resume. The index makes each upload unique, so requests are not coalesced."""
+    import fitz
+
+    document = fitz.open()
+    page = document.new_page()
+    lines = [
+        f"Jane Doe #{index}",
+        "Summary: Backend engineer with 6 years of experience in Python and Go.",
+        "Experience: Senior Software Engineer, Acme Payments (2021 - Present)",
+        "- Cut p99 checkout latency by 42% by moving fraud scoring to an async pipeline.",
+        "Education: B.Tech in Computer Science, Example University (2018)",
+        "Skills: Python, FastAPI, PostgreSQL, Redis, Kubernetes",
+    ]
+    for i, line in enumerate(lines):
+        page.insert_text((72, 72 + i * 18), line)
+    return document.tobytes()
+
+
+def sample_job(index: int) -> Dict[str, str]:
+    return {
+        "job_description": f"Posting {index}: We are hiring a backend engineer to design and operate Python services, "
+                           "own reliability, and mentor engineers. Experience with Redis and Kubernetes is a plus.",
+        "job_role": "Backend Engineer",
+        "company_name": "Acme",
+    }
+
+
+class ScenarioResult:
+    def __init__(self, name: str):
+        self.name = name
+        self.samples: List[Tuple[float, int]] = []  # (latency in ms, HTTP status)
+        self.statuses: Dict[int, int] = defaultdict(int)
+        self.elapsed_seconds = 0.0
+
+    def report(self) -> Dict:
+        ok = [latency for latency, status in self.samples if 200 <= status < 400]
+        return {
+            "requests": len(self.samples),
+            "statuses": dict(self.statuses),
+            "throughput_rps": len(self.samples) / self.elapsed_seconds if self.elapsed_seconds else 0.0,
+            **summarize(ok),
+        }
+
+
+async def run_scenario(name: str, client: httpx.AsyncClient, concurrency: int, total: int,
+                       workflow_ids: List[str]) -> ScenarioResult:
+    """Sends `total` requests of one kind, at most `concurrency` at a time."""
+    result = ScenarioResult(name)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                if name == "analyze":
+                    response = await client.post(
+                        "/api/v1/analyze",
+                        data={"job_role": "Backend Engineer"},
+                        files={"file": (f"resume_{index}.pdf", sample_resume_pdf(index), "application/pdf")},
+                    )
+                elif name == "optimize":
+                    response = await client.post("/api/v1/optimizer/run", data=sample_job(index))
+                    if response.status_code == 200:
+                        workflow_ids.append(response.json()["workflow_id"])
+                else:
+                    response = await client.get(f"/api/v1/optimizer/download-pdf/{workflow_ids[index % len(workflow_ids)]}")
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 599
+            result.samples.append(((time.perf_counter() - started) * 1000, status))
+            result.statuses[status] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    result.elapsed_seconds = time.perf_counter() - started
+    return result
+
+
+def stage_breakdown(trace_path: str) -> Dict[str, Dict]:
+    """Groups the exported spans by name and summarises their durations."""
+    durations: Dict[str, List[float]] = defaultdict(list)
+    if not os.path.exists(trace_path):
+        return {}
+    with open(trace_path, "r", encoding="utf-8") as f:
+        for line in f:
+            span = json.loads(line)
+            durations[span["name"]].append(span["duration_ms"])
+    return {
+        name: {"count": len(values), "total_ms": sum(values), **summarize(values)}
+        for name, values in sorted(durations.items(), key=lambda item: sum(item[1]), reverse=True)
+    }
+
+
+def _fmt(value: Optional[float]) -> str:
+    return f"{value:>9.1f}" if value is not None else f"{'-':>9}"
+
+
+async def drive(base_url: str, scenarios: List[str], concurrency: int, total: int) -> Dict[str, Dict]:
+    results = {}
+    workflow_ids: List[str] = []
+    async with httpx.AsyncClient(base_url=base_url, timeout=httpx.Timeout(600.0)) as client:
+        for name in scenarios:
+            if name == "download" and not workflow_ids:
+                print("Skipping download: no optimizer run succeeded to provide workflow IDs.")
+                continue
+            results[name] = (await run_scenario(name, client, concurrency, total, workflow_ids)).report()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="Test an already running server instead of starting one.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=40, help="Requests per scenario.")
+    parser.add_argument("--scenarios", default="analyze,optimize,download")
+    parser.add_argument("--llm-latency", default="lognormal:800:0.5")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--search-latency", default="lognormal:400:0.4")
+    parser.add_argument("--search-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--with-caches", action="store_true",
+                        help="Keep the LLM response cache and job-description dedup on in the started worker.")
+    parser.add_argument("--json", help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    trace_path = os.path.join(tempfile.mkdtemp(prefix="rcraft_load_"), "traces.jsonl")
+    process = None
+    base_url = args.base_url
+    if base_url is None:
+        process, base_url, ready_ms = start_api_server({
+            "GOOGLE_API_KEY": os.getenv("GOOGLE_API_KEY", "fake-key"),
+            "FAKE_LLM_LATENCY_MS": args.llm_latency,
+            "FAKE_LLM_ERROR_RATE": str(args.llm_error_rate),
+            "FAKE_SEARCH_LATENCY_MS": args.search_latency,
+            "FAKE_SEARCH_ERROR_RATE": str(args.search_error_rate),
+            "FAKE_PROVIDER_SEED": str(args.seed),
+            "TRACE_EXPORTER": "file",
+            "TRACE_FILE_PATH": trace_path,
+            "STARTUP_WARMUP": "blocking",
+            "LLM_CACHE_ENABLED": "1" if args.with_caches else "0",
+            "JD_DEDUP_ENABLED": "1" if args.with_caches else "0",
+        }, app="backend.benchmarks.fake_app:app")
+        print(f"Started API worker at {base_url} in {ready_ms:.0f}ms (traces: {trace_path})")
+
+    try:
+        results = asyncio.run(drive(base_url, scenarios, args.concurrency, args.requests))
+    finally:
+        if process is not None:
+            stop_api_server(process)
+
+    print(f"\n{'endpoint':<10} {'reqs':>5} {'rps':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  statuses")
+    for name, report in results.items():
+        print(f"{name:<10} {report['requests']:>5} {report['throughput_rps']:>7.2f} {_fmt(report['p50_ms'])} "
+              f"{_fmt(report['p95_ms'])} {_fmt(report['p99_ms'])}  {report['statuses']}")
+
+    stages = stage_breakdown(trace_path) if process is not None else {}
+    if stages:
+        print(f"\n{'stage':<40} {'count':>6} {'total ms':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for name, stage in stages.items():
+            print(f"{name[:40]:<40} {stage['count']:>6} {stage['total_ms']:>10.0f} {_fmt(stage['p50_ms'])} "
+                  f"{_fmt(stage['p95_ms'])} {_fmt(stage['p99_ms'])}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"endpoints": results, "stages": stages, "config": vars(args)}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Helpers for benchmarks that run the API in a separate uvicorn process."""
+
+import os
+import sys
+import time
+import socket
+import subprocess
+import urllib.request
+from typing import Dict, Optional, Tuple
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_api_server(env: Optional[Dict[str, str]] = None, timeout_seconds: float = 60.0,
+                     quiet: bool = True, app: str = "backend.main:app") -> Tuple[subprocess.Popen, str, float]:
+    """
+    Starts the API under uvicorn on a free port and waits until `GET /` answers.
+
+    Args:
+        env: Extra environment variables for the server process.
+        app: The ASGI application to serve, e.g. `backend.benchmarks.fake_app:app`
+            for the API with offline providers.
+        timeout_seconds: How long to wait for the server to become ready.
+        quiet: Discard the server's output.
+
+    Returns:
+        The process, its base URL and the milliseconds it took to become ready.
+        The caller must terminate the process.
+    """
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    output = subprocess.DEVNULL if quiet else None
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, "PYTHONPATH": os.getcwd(), **(env or {})}, stdout=output, stderr=output,
+    )
+    while time.perf_counter() - started < timeout_seconds:
+        if process.poll() is not None:
+            raise RuntimeError("The API worker exited during startup.")
+        try:
+            with urllib.request.urlopen(f"{base_url}/", timeout=1):
+                return process, base_url, (time.perf_counter() - started) * 1000
+        except OSError:
+            time.sleep(0.01)
+    stop_api_server(process)
+    raise TimeoutError(f"The API worker was not ready within {timeout_seconds}s.")
+
+
+def stop_api_server(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
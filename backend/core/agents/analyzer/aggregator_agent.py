@@ -1,7 +1,10 @@
 # aggregator_agent.py
 
+import logging
 import json
 
+logger = logging.getLogger(__name__)
+
 class AggregatorAgent:
     """Combines scores from the holistic LLM evaluation into a final report."""
 
@@ -47,7 +50,7 @@ class AggregatorAgent:
                     recommendations.add(fb)
         
         except (json.JSONDecodeError, TypeError, ValueError) as e:
-            print(f"CRITICAL ERROR: Could not process the LLM's holistic response. {e}")
+            logger.error("Could not process the LLM's holistic response: %s", e)
             for category in self.weights:
                 category_scores[category] = 0
             feedback_summary["error"] = "Could not parse the complete AI analysis. The response was likely malformed or an error."
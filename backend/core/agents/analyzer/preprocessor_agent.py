@@ -4,6 +4,7 @@ import os
 import re
 import fitz  
 import docx
+from typing import IO, Tuple
 
 class PreprocessorAgent:
     """Handles resume file ingestion, text extraction, and section identification."""
@@ -37,6 +38,31 @@ class PreprocessorAgent:
         # Simple estimation for other formats
         return 1
 
+    def extract_from_stream(self, stream: IO[bytes], file_type: str) -> Tuple[str, int]:
+        """
+        Extracts text and page count from an uploaded file without writing it to disk.
+
+        The document is opened once for both values.
+
+        Args:
+            stream: A readable, seekable binary stream positioned anywhere in the file.
+            file_type: The sniffed type of the content, ".pdf" or ".docx".
+
+        Returns:
+            A tuple of the extracted text and the page count.
+        """
+        stream.seek(0)
+        if file_type == ".pdf":
+            with fitz.open(stream=stream.read(), filetype="pdf") as doc:
+                text = "".join(page.get_text() for page in doc)
+                return text.strip(), doc.page_count
+        elif file_type == ".docx":
+            doc = docx.Document(stream)
+            text = "".join(para.text + "\n" for para in doc.paragraphs)
+            # Simple estimation for other formats
+            return text.strip(), 1
+        raise ValueError("Unsupported file format. Please use PDF or DOCX.")
+
     def identify_sections(self, resume_text: str) -> dict:
         """Identifies and extracts standard resume sections using regex."""
         sections = {}
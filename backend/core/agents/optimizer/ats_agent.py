@@ -1,12 +1,12 @@
 # core/agents/optimizer_agents/ats_agent.py
 
-from dotenv import load_dotenv
+import logging
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
 from langchain_google_genai import ChatGoogleGenerativeAI
 from backend.core.data_models import OptimizerWorkflowState
+from backend.core.tools.llm_client import invoke_chat_model
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
 class ATSOptimizerAgent:
     """
@@ -30,7 +30,7 @@ class ATSOptimizerAgent:
         """
         The main execution method for this agent, designed as a LangGraph node.
         """
-        print("--- AGENT: Starting ATS Optimizer ---")
+        logger.debug("Starting ATS optimizer")
 
         # Input validation: Ensure the agent has the necessary data to work.
         if not state.draft_resume_text or not state.context:
@@ -68,24 +68,20 @@ class ATSOptimizerAgent:
                 """
             )
         ])
-        
-        output_parser = StrOutputParser()
-        
-        chain = prompt | self.llm | output_parser
 
         try:
             # Invoke the chain with the draft and the context.
-            optimized_text = chain.invoke({
+            optimized_text = invoke_chat_model(self.llm, prompt, {
                 "job_context": context_json,
                 "draft_resume": state.draft_resume_text
-            })
+            }, agent="ATSOptimizerAgent")
             
             # Update the workflow state with the newly optimized text.
             state.optimized_resume_text = optimized_text
-            print("--- AGENT: ATS Optimization Complete ---")
+            logger.info("ATS optimization complete")
 
         except Exception as e:
-            print(f"ERROR in ATSOptimizerAgent: {e}")
+            logger.error("ATS optimization failed: %s", e)
             raise
 
         return state
\ No newline at end of file
@@ -1,12 +1,12 @@
 # core/agents/optimizer_agents/builder_agent.py
 
-from dotenv import load_dotenv
+import logging
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
 from langchain_google_genai import ChatGoogleGenerativeAI
 from backend.core.data_models import OptimizerWorkflowState
+from backend.core.tools.llm_client import invoke_chat_model
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
 class ResumeBuilderAgent:
     """
@@ -30,7 +30,7 @@ class ResumeBuilderAgent:
         """
         The main execution method for this agent, designed as a LangGraph node.
         """
-        print("--- AGENT: Starting Resume Builder ---")
+        logger.debug("Starting resume builder")
 
         # Input validation: Ensure the agent has the necessary blueprint to work from.
         if not state.context or not state.research or not state.strategy:
@@ -71,26 +71,21 @@ class ResumeBuilderAgent:
                 """
             )
         ])
-        
-        # The output parser ensures we get a clean string back from the LLM call.
-        output_parser = StrOutputParser()
-        
-        chain = prompt | self.llm | output_parser
 
         try:
             # Invoke the chain with all the necessary context.
-            draft_text = chain.invoke({
+            draft_text = invoke_chat_model(self.llm, prompt, {
                 "strategy": strategy_json,
                 "context": context_json,
                 "research": research_json
-            })
+            }, agent="ResumeBuilderAgent")
             
             # Update the workflow state with the generated draft.
             state.draft_resume_text = draft_text
-            print("--- AGENT: Resume Builder Complete ---")
+            logger.info("Resume builder complete")
 
         except Exception as e:
-            print(f"ERROR in ResumeBuilderAgent: {e}")
+            logger.error("Resume builder failed: %s", e)
             raise
 
         return state
\ No newline at end of file
@@ -1,10 +1,11 @@
-from dotenv import load_dotenv
+import logging
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_google_genai import ChatGoogleGenerativeAI
 from backend.core.data_models import OptimizerWorkflowState, ContextOutput
+from backend.core.tools.llm_client import invoke_chat_model
+from backend.core.tools.jd_fingerprint_index import get_jd_index, jd_dedup_enabled
 
-
-load_dotenv()
+logger = logging.getLogger(__name__)
 
 class ContextExtractionAgent:
     """
@@ -24,7 +25,16 @@ class ContextExtractionAgent:
         """
         The main execution method for this agent, designed to be a node in a LangGraph.
         """
-        print("--- AGENT: Executing Context Extractor ---")
+        logger.debug("Starting context extraction")
+
+        # The same posting often arrives again with trivial edits (tracking links,
+        # reordered bullets, EEO text); reuse the context extracted for it then.
+        if jd_dedup_enabled():
+            match = get_jd_index().lookup(state.company_name, state.job_description)
+            if match is not None:
+                state.context, similarity = match
+                logger.info("Reused context from a near-duplicate job description", extra={"similarity": round(similarity, 3)})
+                return state
 
         prompt = ChatPromptTemplate.from_messages([
             (
@@ -46,22 +56,21 @@ class ContextExtractionAgent:
             )
         ])
 
-
-        chain = prompt | self.llm.with_structured_output(ContextOutput)
-
         try:
-            result = chain.invoke({
+            result = invoke_chat_model(self.llm, prompt, {
                 "role": state.job_role,
                 "company": state.company_name,
                 "jd": state.job_description
-            })
+            }, ContextOutput, agent="ContextExtractionAgent")
             
             state.context = result
-            print("--- AGENT: Context Extraction Complete ---")
-            print(f"Generated Boolean String: {result.boolean_search_string}")
+            if jd_dedup_enabled():
+                get_jd_index().add(state.company_name, state.job_description, result)
+            logger.info("Context extraction complete")
+            logger.debug("Generated boolean search string: %s", result.boolean_search_string)
 
         except Exception as e:
-            print(f"ERROR in ContextExtractionAgent: {e}")
+            logger.error("Context extraction failed: %s", e)
             raise
         
         return state
\ No newline at end of file
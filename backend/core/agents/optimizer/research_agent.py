@@ -1,12 +1,14 @@
 # core/agents/optimizer_agents/research_agent.py
 
-from dotenv import load_dotenv
+import logging
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_google_genai import ChatGoogleGenerativeAI
 from backend.core.data_models import OptimizerWorkflowState, ResearchOutput
+from backend.core.tools.llm_client import invoke_chat_model
 from backend.core.tools.web_search_tool import WebSearchTool
+from backend.core.tools.snippet_ranker import SnippetRanker
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
 class ResearchAgent:
     """
@@ -17,19 +19,23 @@ class ResearchAgent:
     def __init__(self):
         """
         Initializes the agent with the Flash model for speed and cost-efficiency,
-        and an instance of the WebSearchTool.
+        an instance of the WebSearchTool, and the local SnippetRanker that
+        trims the search results before they reach the LLM.
         """
         self.llm = ChatGoogleGenerativeAI(
             model="gemini-2.5-flash",
             temperature=0.2
         )
         self.search_tool = WebSearchTool()
+        self.snippet_ranker = SnippetRanker()
+        # Over-fetch candidates per query; the ranker decides what reaches the prompt.
+        self.results_per_query = 8
 
     def execute(self, state: OptimizerWorkflowState) -> OptimizerWorkflowState:
         """
         The main execution method for this agent, designed as a LangGraph node.
         """
-        print("--- AGENT: Starting Research & Insight ---")
+        logger.debug("Starting research")
 
         # Input validation: Ensure the previous agent has run successfully.
         if not state.context:
@@ -44,18 +50,22 @@ class ResearchAgent:
         mission_query = f"{company} mission statement"
         specific_role_query = f"what it's like to work as a {role} at {company}"
 
-        culture_results = self.search_tool.search(culture_query)
-        mission_results = self.search_tool.search(mission_query)
-        role_results = self.search_tool.search(specific_role_query)
+        culture_results = self.search_tool.search_snippets(culture_query, max_results=self.results_per_query)
+        mission_results = self.search_tool.search_snippets(mission_query, max_results=self.results_per_query)
+        role_results = self.search_tool.search_snippets(specific_role_query, max_results=self.results_per_query)
         
         # Fallback Logic: If the highly specific query failed, try a broader one.
-        if "No information found" in role_results:
-            print("--- AGENT: Specific role search failed. Trying a broader query. ---")
+        if not role_results:
+            logger.info("Specific role search found nothing; trying a broader query")
             broader_role_query = f"employee reviews and work environment at {company}"
-            role_results = self.search_tool.search(broader_role_query)
+            role_results = self.search_tool.search_snippets(broader_role_query, max_results=self.results_per_query)
 
-        # Aggregate all successful search results into a single context block.
-        search_results = "\n\n".join([culture_results, mission_results, role_results])
+        # Drop near-duplicate snippets, rank the rest against the role and company,
+        # and keep only what fits the token budget.
+        candidates = culture_results + mission_results + role_results
+        selected = self.snippet_ranker.select(candidates, query=f"{role} {company} culture values mission")
+        logger.debug("Selected %d of %d search snippets for the research prompt", len(selected), len(candidates))
+        search_results = "\n\n---\n\n".join(selected) or "No information found for the specified queries."
 
         # 3. Define the prompt using the modern, message-based structure.
         prompt = ChatPromptTemplate.from_messages([
@@ -81,23 +91,21 @@ class ResearchAgent:
                 ---"""
             )
         ])
-        
-        # 4. Create and invoke the chain to get structured output.
-        chain = prompt | self.llm.with_structured_output(ResearchOutput)
 
+        # 4. Invoke the model through the shared LLM client to get structured output.
         try:
-            result = chain.invoke({
+            result = invoke_chat_model(self.llm, prompt, {
                 "company": company,
                 "role": role,
                 "search_results": search_results
-            })
+            }, ResearchOutput, agent="ResearchAgent")
             
             # 5. Update the workflow state.
             state.research = result
-            print("--- AGENT: Research & Insight Complete ---")
+            logger.info("Research complete")
 
         except Exception as e:
-            print(f"ERROR in ResearchAgent: {e}")
+            logger.error("Research failed: %s", e)
             raise
 
         return state
@@ -1,11 +1,12 @@
 # core/agents/optimizer_agents/reviewer_agent.py
 
-from dotenv import load_dotenv
+import logging
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_google_genai import ChatGoogleGenerativeAI
 from backend.core.data_models import OptimizerWorkflowState, ReviewerOutput
+from backend.core.tools.llm_client import invoke_chat_model
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
 class FinalReviewerAgent:
     """
@@ -29,7 +30,7 @@ class FinalReviewerAgent:
         """
         The main execution method for this agent, designed as the final node in a LangGraph.
         """
-        print("--- AGENT: Starting Final Reviewer ---")
+        logger.debug("Starting final review")
 
         # Input validation
         if not state.optimized_resume_text:
@@ -67,23 +68,20 @@ class FinalReviewerAgent:
                 """
             )
         ])
-        
-        # The chain with structured output is the key to reliable JSON.
-        chain = prompt | self.llm.with_structured_output(ReviewerOutput)
 
         try:
             # Invoke the chain with the optimized resume text and the original strategy.
-            final_report = chain.invoke({
+            final_report = invoke_chat_model(self.llm, prompt, {
                 "strategy": state.strategy.model_dump_json(indent=2),
                 "optimized_resume": state.optimized_resume_text
-            })
+            }, ReviewerOutput, agent="FinalReviewerAgent")
             
             # This is the final state of our workflow.
             state.final_report = final_report
-            print("--- AGENT: Final Review Complete. Workflow finished. ---")
+            logger.info("Final review complete")
 
         except Exception as e:
-            print(f"ERROR in FinalReviewerAgent: {e}")
+            logger.error("Final review failed: %s", e)
             raise
 
         return state
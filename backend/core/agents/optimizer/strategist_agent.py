@@ -1,11 +1,12 @@
 # core/agents/optimizer_agents/strategist_agent.py
 
-from dotenv import load_dotenv
+import logging
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_google_genai import ChatGoogleGenerativeAI
 from backend.core.data_models import OptimizerWorkflowState, StrategyOutput
+from backend.core.tools.llm_client import invoke_chat_model
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
 class ResumeStrategistAgent:
     """
@@ -29,7 +30,7 @@ class ResumeStrategistAgent:
         """
         The main execution method for this agent, designed as a LangGraph node.
         """
-        print("--- AGENT: Starting Resume Strategist ---")
+        logger.debug("Starting resume strategist")
 
         # Input validation: Ensure the required data from previous agents exists.
         if not state.context or not state.research:
@@ -69,22 +70,19 @@ class ResumeStrategistAgent:
                 """
             )
         ])
-        
-        # The chain with structured output remains a best practice.
-        chain = prompt | self.llm.with_structured_output(StrategyOutput)
 
         try:
-            result = chain.invoke({
+            result = invoke_chat_model(self.llm, prompt, {
                 "context": context_json,
                 "research": research_json
-            })
+            }, StrategyOutput, agent="ResumeStrategistAgent")
             
             # Update the workflow state with the new strategy.
             state.strategy = result
-            print("--- AGENT: Resume Strategist Complete ---")
+            logger.info("Resume strategist complete")
 
         except Exception as e:
-            print(f"ERROR in ResumeStrategistAgent: {e}")
+            logger.error("Resume strategist failed: %s", e)
             raise
 
         return state
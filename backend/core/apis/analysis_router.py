@@ -1,9 +1,18 @@
 # api/analysis_router.py
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException , Depends
+import logging
+import json
+import hashlib
+from typing import IO, Optional
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException , Depends, Header, Request
+from starlette.concurrency import run_in_threadpool
 from backend.core.services.resume_analysis_service import ResumeAnalysisService
 from backend.core.data_models import FinalHolisticReport
-import tempfile
-import os
+from backend.core.parsers import SNIFF_BYTES, sniff_file_type
+from backend.core.tools.admission import AdmissionRejectedError, get_admission_controller
+from backend.core.tools.llm_scheduler import Priority, scheduling, tenant_for
+from backend.core.tools.single_flight import SingleFlight, request_key
+
+logger = logging.getLogger(__name__)
 
 
 router = APIRouter()
@@ -16,47 +25,91 @@ def get_resume_service():
     """Provides a ResumeProcessingService instance."""
     return ResumeAnalysisService()
 
+def get_single_flight(request: Request) -> SingleFlight:
+    """Provides the request coalescer built in the application lifespan."""
+    return request.app.state.single_flight
+
+def _hash_upload(stream: IO[bytes]) -> str:
+    """SHA-256 of the whole upload, read in chunks so memory stays bounded."""
+    digest = hashlib.sha256()
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(64 * 1024), b""):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
 @router.post("/analyze", response_model=FinalHolisticReport)
 async def analyze_resume(
     # The file and form data remain the same
+    request: Request,
     file: UploadFile = File(..., description="The user's resume file (PDF or DOCX)."),
     job_role: str = Form(..., description="The job role the user is targeting."),
+    session_id: Optional[str] = Form(None, description="The user's session; revisions within a session are re-scored incrementally."),
+    x_session_id: Optional[str] = Header(None),
     
     # --- UPDATED: FastAPI will now inject the service instance for us ---
     # It calls get_resume_service() and the result is passed to this parameter.
-    service: ResumeAnalysisService = Depends(get_resume_service)
+    service: ResumeAnalysisService = Depends(get_resume_service),
+    single_flight: SingleFlight = Depends(get_single_flight)
 ):
     """
     Accepts a resume file and a target job role, processes them,
     and returns the final_holistic_report for the frontend.
+
+    The upload is never read into memory as a whole: the body size is capped
+    by `BodySizeLimitMiddleware` (413 when exceeded), multipart parsing spools
+    the file to disk past 1 MiB, and the file type is sniffed from its first
+    bytes so unsupported content is rejected (415) before any parsing.
+
+    Identical requests (same file content and job role) that arrive while one
+    is already running share its result instead of starting another pipeline.
+    Under overload, admission control sheds requests with a fast 429/503 and
+    a Retry-After header instead of letting them queue until they time out.
+
+    With a session id (form field or X-Session-ID header), an upload that
+    revises the session's previous resume for the same role only re-scores
+    the categories its changed sections affect.
     """
-    tmp_path = None
     try:
-        # with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as tmp:
-        #     tmp.write(await file.read())
-        #     tmp_path = tmp.name
-        
-        # # We now use the 'service' instance that FastAPI provided.
-        # final_report = service.analyze_resume(tmp_path, target_job_role=job_role)
-        resume_bytes = await file.read()
-        filename = file.filename
-
-        # Call the class method
-        final_report = service.analyze_resume(
-            resume_content=resume_bytes,
-            filename=filename,
-            target_job_role=job_role
+        file_type = sniff_file_type(await file.read(SNIFF_BYTES), file.filename)
+    except ValueError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+
+    try:
+        session_id = session_id or x_session_id
+        upload_sha256 = await run_in_threadpool(_hash_upload, file.file)
+        key = request_key("analyze", upload_sha256, job_role, session_id or "")
+
+        async def admit_and_analyze() -> dict:
+            # The service reads straight from the request's spooled file. It is
+            # synchronous, so it runs in the threadpool to keep the event loop free.
+            # A user is waiting, so its LLM calls are scheduled as interactive.
+            async with get_admission_controller("analyze").admit():
+                with scheduling(Priority.INTERACTIVE, tenant=tenant_for(request)):
+                    return await run_in_threadpool(
+                        service.analyze_resume,
+                        resume_file=file.file,
+                        file_type=file_type,
+                        target_job_role=job_role,
+                        session_id=session_id,
+                        upload_sha256=upload_sha256,
+                    )
+
+        final_report = await single_flight.run(
+            key,
+            admit_and_analyze,
+            encode=lambda report: json.dumps(report).encode("utf-8"),
+            decode=json.loads,
         )
 
         # If your method returns a dict compatible with FinalHolisticReport
         
         return final_report
 
+    except AdmissionRejectedError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after_seconds)})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"An unexpected error occurred in the API: {e}")
+        logger.exception("An unexpected error occurred in the API: %s", e)
         raise HTTPException(status_code=500, detail="An internal server error occurred.")
-    finally:
-        if tmp_path and os.path.exists(tmp_path):
-            os.unlink(tmp_path)
\ No newline at end of file
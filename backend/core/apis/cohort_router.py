@@ -0,0 +1,44 @@
+# api/cohort_router.py
+import logging
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+from backend.core.data_models import CohortPercentileReport
+
+logger = logging.getLogger(__name__)
+
+
+router = APIRouter()
+
+@router.get("/cohorts/percentiles", response_model=CohortPercentileReport)
+async def cohort_percentiles(
+    job_role: str = Query(..., description="The job role whose cohort to compare against."),
+    overall_score: Optional[float] = Query(None, ge=0, le=100),
+    structure: Optional[float] = Query(None, ge=0, le=10),
+    language: Optional[float] = Query(None, ge=0, le=10),
+    ats: Optional[float] = Query(None, ge=0, le=10),
+    summary: Optional[float] = Query(None, ge=0, le=10),
+    experience: Optional[float] = Query(None, ge=0, le=10),
+    skills: Optional[float] = Query(None, ge=0, le=10),
+    relevance: Optional[float] = Query(None, ge=0, le=10),
+):
+    """
+    Ranks an analysis' scores against everyone who targeted the same role.
+
+    Every analysed resume is recorded once in the cohort store under its
+    canonical role (seniority words dropped, case and punctuation ignored);
+    repeat uploads are skipped and a session keeps only its latest revision.
+    Pass any of the scores from a `FinalHolisticReport` to get their
+    percentile ranks; the cohort quartiles are returned for every score.
+    """
+    scores = {
+        "overall_score": overall_score, "structure": structure, "language": language, "ats": ats,
+        "summary": summary, "experience": experience, "skills": skills, "relevance": relevance,
+    }
+    try:
+        # NumPy is only loaded once cohort analytics are actually used.
+        from backend.core.tools.score_store import get_score_store
+        return await run_in_threadpool(get_score_store().percentiles, job_role, scores)
+    except OSError as e:
+        logger.error("An unexpected error occurred reading the cohort store: %s", e)
+        raise HTTPException(status_code=503, detail="Cohort analytics are temporarily unavailable.")
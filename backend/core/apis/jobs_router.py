@@ -0,0 +1,95 @@
+# api/jobs_router.py
+import logging
+from typing import Optional
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+from backend.core.data_models import JobMatchResponse, OptimizerWorkflowState, SavedJobResponse
+from backend.core.parsers import SNIFF_BYTES, sniff_file_type
+from backend.core.tools.admission import AdmissionRejectedError, get_admission_controller
+from backend.core.tools.job_match_index import get_job_index
+from backend.core.tools.llm_scheduler import Priority, scheduling, tenant_for
+
+logger = logging.getLogger(__name__)
+
+
+router = APIRouter()
+
+_context_agent = None
+
+def get_context_agent():
+    """Provides a context extraction agent, built on first use because it loads the Gemini SDK."""
+    global _context_agent
+    if _context_agent is None:
+        from backend.core.agents.optimizer.context_extraction_agent import ContextExtractionAgent
+        _context_agent = ContextExtractionAgent()
+    return _context_agent
+
+def _extract_resume_text(file: UploadFile, file_type: str) -> str:
+    from backend.core.agents.analyzer.preprocessor_agent import PreprocessorAgent
+    text, _ = PreprocessorAgent().extract_from_stream(file.file, file_type)
+    return text
+
+@router.post("/jobs", response_model=SavedJobResponse)
+async def save_job(
+    request: Request,
+    job_description: str = Form(...),
+    job_role: str = Form(...),
+    company_name: str = Form(...),
+):
+    """
+    Saves a job description to the caller's match index.
+
+    The structured context (skills, responsibilities, ...) is extracted once
+    here, with the same agent the optimizer uses, so matching resumes against
+    saved jobs later needs no LLM call. Jobs are only indexed when saved
+    here, and only the tenant that saved them can match against them.
+    """
+    tenant = tenant_for(request)
+    try:
+        state = OptimizerWorkflowState(job_description=job_description, job_role=job_role, company_name=company_name)
+        async with get_admission_controller("jobs").admit():
+            with scheduling(Priority.INTERACTIVE, tenant=tenant):
+                state = await run_in_threadpool(get_context_agent().execute, state)
+        job_index = await run_in_threadpool(get_job_index, tenant)
+        job_id = await run_in_threadpool(job_index.add, company_name, job_role, job_description, state.context)
+        return SavedJobResponse(job_id=job_id, context=state.context)
+
+    except AdmissionRejectedError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after_seconds)})
+    except Exception as e:
+        logger.exception("An unexpected error occurred while saving a job: %s", e)
+        raise HTTPException(status_code=500, detail="An internal server error occurred while saving the job.")
+
+@router.post("/jobs/match", response_model=JobMatchResponse)
+async def match_jobs(
+    request: Request,
+    file: Optional[UploadFile] = File(None, description="The resume file (PDF or DOCX)."),
+    resume_text: Optional[str] = Form(None, description="The resume's text, instead of a file."),
+    top_k: int = Form(5, ge=1, le=50),
+    job_ids: Optional[str] = Form(None, description="Comma-separated job IDs to restrict the ranking to."),
+):
+    """
+    Ranks the caller's saved jobs by how well a resume fits them.
+
+    This is a local inverted-index lookup (weighted BM25 over each job's
+    extracted skills, responsibilities and description) and takes
+    milliseconds, so only the shortlisted jobs need to go through the
+    analysis or optimizer pipelines.
+    """
+    if file is None and not resume_text:
+        raise HTTPException(status_code=400, detail="Provide a resume file or resume_text.")
+    if file is not None:
+        try:
+            file_type = sniff_file_type(await file.read(SNIFF_BYTES), file.filename)
+        except ValueError as e:
+            raise HTTPException(status_code=415, detail=str(e))
+        try:
+            resume_text = await run_in_threadpool(_extract_resume_text, file, file_type)
+        except Exception as e:
+            logger.warning("Could not extract text from the uploaded resume: %s", e)
+            raise HTTPException(status_code=400, detail="Could not read the uploaded resume.")
+
+    job_index = await run_in_threadpool(get_job_index, tenant_for(request))
+    allowed = [job_id.strip() for job_id in job_ids.split(",") if job_id.strip()] if job_ids else None
+    matches = await run_in_threadpool(job_index.match, resume_text, top_k, allowed)
+    return JobMatchResponse(matches=matches, jobs_indexed=len(job_index))
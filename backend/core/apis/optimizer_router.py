@@ -1,107 +1,322 @@
-import os
-from fastapi import APIRouter, Form, HTTPException, Depends
-from fastapi.responses import FileResponse
+import logging
+import json
+import threading
+from typing import Dict, Optional
+from fastapi import APIRouter, BackgroundTasks, Form, HTTPException, Depends, Header, Request
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
 from backend.core.services.resume_optimizer_service import ResumeOptimizerService
-from backend.core.data_models import OptimizerWorkflowState, WorkflowRunResponse
-from backend.core.tools.pdf_renderer import TypstRenderer
+from backend.core.data_models import FinalResumeSections, ForkRequest, OptimizerWorkflowState, WorkflowRunResponse
+from backend.core.tools.pdf_renderer import TypstRenderer, get_renderer
+from backend.core.tools.render_cache import PdfRenderCache
+from backend.core.tools.render_pool import RenderQueueFullError
+from backend.core.tools.typst_backends import TypstCompileError
+from backend.core.tools.admission import AdmissionRejectedError, get_admission_controller
+from backend.core.tools.llm_scheduler import Priority, scheduling, tenant_for
+from backend.core.tools.single_flight import SingleFlight, request_key
+from backend.core.tools.structured_logging import bind_workflow_id
 from backend.core.tools.workflow_state_manager import WorkflowStateManager
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
-def get_optimizer_service():
-    """Dependency injector for the optimizer service."""
-    # This now correctly instantiates our LangGraph-powered service.
-    return ResumeOptimizerService()
+# Cookie a load balancer can use to pin a client to the worker holding its run while Redis is down.
+AFFINITY_COOKIE = "rcraft_node"
+
+_optimizer_service: Optional[ResumeOptimizerService] = None
+_optimizer_service_lock = threading.Lock()
+
+def get_optimizer_service() -> ResumeOptimizerService:
+    """
+    Provides the worker's optimizer service. Its agents and compiled graphs
+    (the full run and each fork entry point) are built once and shared by
+    every request; FastAPI resolves this sync dependency in the threadpool,
+    so the first build does not block the event loop.
+    """
+    global _optimizer_service
+    with _optimizer_service_lock:
+        if _optimizer_service is None:
+            _optimizer_service = ResumeOptimizerService()
+        return _optimizer_service
+
+def get_state_manager(request: Request) -> WorkflowStateManager:
+    """Provides the shared WorkflowStateManager built on the lifespan-scoped Redis pool."""
+    return request.app.state.state_manager
+
+def get_single_flight(request: Request) -> SingleFlight:
+    """Provides the request coalescer built in the application lifespan."""
+    return request.app.state.single_flight
+
+_render_cache: Optional[PdfRenderCache] = None
+
+def get_render_cache() -> PdfRenderCache:
+    """Provides the worker's PDF render cache (PDF_CACHE_MAX_BYTES), shared by downloads and pre-renders."""
+    global _render_cache
+    if _render_cache is None:
+        _render_cache = PdfRenderCache()
+    return _render_cache
+
+def routing_hints(state_manager: WorkflowStateManager) -> Dict[str, str]:
+    """
+    Sticky-routing hints for the client and load balancer.
+
+    Every response names the worker that served it. While the state store is
+    degraded, a new run only exists in this worker's memory, so the response
+    also flags that and sets an affinity cookie; follow-up requests carrying
+    it can be routed back here until Redis recovers.
+    """
+    headers = {"X-Served-By": state_manager.node_id}
+    if state_manager.degraded:
+        headers["X-State-Degraded"] = "1"
+    return headers
+
+def _set_routing_hints(response: Response, state_manager: WorkflowStateManager) -> None:
+    """Applies `routing_hints` to a response, adding the affinity cookie while degraded."""
+    response.headers.update(routing_hints(state_manager))
+    if state_manager.degraded:
+        response.set_cookie(AFFINITY_COOKIE, state_manager.node_id, httponly=True, samesite="lax")
 
-def get_state_manager() -> WorkflowStateManager:
-    """Provides a WorkflowStateManager instance to manage Redis connections."""
-    return WorkflowStateManager()
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Checks an If-None-Match header (which may list several, possibly weak, tags) against an ETag."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+async def prerender_pdf(workflow_id: str, resume_data: FinalResumeSections,
+                        state_manager: WorkflowStateManager, render_cache: PdfRenderCache) -> None:
+    """
+    Background task that compiles the PDF as soon as a workflow completes.
+
+    The bytes are stored in Redis next to the workflow state (same TTL) and in
+    the local render cache, so the later download is a single Redis read. A
+    failure here is only logged: the download endpoint renders on demand.
+    """
+    bind_workflow_id(workflow_id)
+    try:
+        renderer = await run_in_threadpool(get_renderer)
+        fingerprint = renderer.fingerprint(resume_data)
+        pdf_bytes = await run_in_threadpool(render_cache.get, fingerprint)
+        if pdf_bytes is None:
+            pdf_bytes = await renderer.render_to_pdf_async(resume_data)
+            await run_in_threadpool(render_cache.put, fingerprint, pdf_bytes)
+        await state_manager.save_artifact(workflow_id, pdf_bytes)
+    except Exception as e:
+        logger.warning("Background PDF pre-render failed: %s", e)
 
 
 # --- API ENDPOINT 1: RUN THE WORKFLOW ---
 
 @router.post("/optimizer/run", response_model=WorkflowRunResponse)
 async def run_optimizer_workflow(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    response: Response,
     job_description: str = Form(..., description="The full text of the job description."),
     job_role: str = Form(..., description="The job role the user is targeting (e.g., 'Software Engineer')."),
     company_name: str = Form(..., description="The name of the target company."),
     service: ResumeOptimizerService = Depends(get_optimizer_service),
-    state_manager: WorkflowStateManager = Depends(get_state_manager)
+    state_manager: WorkflowStateManager = Depends(get_state_manager),
+    render_cache: PdfRenderCache = Depends(get_render_cache),
+    single_flight: SingleFlight = Depends(get_single_flight)
 ):
     """
     Kicks off the long-running, multi-agent LangGraph workflow to generate resume content.
 
     This endpoint is asynchronous from the user's perspective. It performs the
     heavy lifting and, upon completion, saves the result to a temporary state
-    store (Redis) and returns a unique ID for that result.
+    store (Redis) and returns a unique ID for that result. The PDF is then
+    pre-rendered in the background so the download does not wait on Typst.
+
+    If Redis is down the result is still returned: it is held by this worker
+    and the response carries sticky-routing hints (see `routing_hints`).
+
+    Identical submissions (same job description, role and company) that
+    arrive while one is already running share its result and workflow ID.
+    Under overload, admission control sheds requests with a fast 429/503 and
+    a Retry-After header before any LLM work starts.
     """
-    print("--- API: Kicking off optimizer workflow run ---")
+    logger.info("Kicking off optimizer workflow run")
     try:
-        # --- THE FIX IS HERE ---
-        # 1. The service now directly returns the final report, not the entire state.
-        #    We rename the variable for clarity.
-        final_report = service.optimize_resume(jd=job_description, role=job_role, company=company_name)
+        async def run_and_save() -> WorkflowRunResponse:
+            # 1. Run the workflow and keep the complete final state, not just the report.
+            #    The LangGraph pipeline is synchronous, so it runs in the threadpool,
+            #    and only once admission control has granted it a slot. Its many LLM
+            #    calls are scheduled as batch work, behind interactive analyses.
+            async with get_admission_controller("optimize").admit():
+                with scheduling(Priority.BATCH, tenant=tenant_for(request)):
+                    workflow_state = await run_in_threadpool(service.run_workflow, jd=job_description, role=job_role, company=company_name)
 
-        # 2. Accessing the resume data is now simpler and more direct.
-        resume_data = final_report.final_resume
-        
-        # 3. Save the final data to Redis and get a unique ID.
-        workflow_id = state_manager.save_state(resume_data)
-        
-        # 4. Return the successful response, including the ID and the data for preview.
-        return WorkflowRunResponse(
-            workflow_id=workflow_id,
-            resume_data=resume_data
+            # 2. The resume data is what the preview and the PDF need.
+            resume_data = workflow_state.final_report.final_resume
+
+            # 3. Save the final data, plus the full state for replay, to Redis and get a unique ID.
+            workflow_id = await state_manager.save_state(resume_data, workflow_state=workflow_state)
+
+            # 4. Compile the PDF after the response is sent, while the user reviews the preview.
+            #    Only the request that ran the workflow schedules this.
+            background_tasks.add_task(prerender_pdf, workflow_id, resume_data, state_manager, render_cache)
+
+            return WorkflowRunResponse(
+                workflow_id=workflow_id,
+                resume_data=resume_data
+            )
+
+        # 5. Return the successful response, including the ID and the data for preview.
+        key = request_key("optimize", job_description, job_role, company_name)
+        run_response = await single_flight.run(
+            key,
+            run_and_save,
+            encode=lambda result: result.model_dump_json().encode("utf-8"),
+            decode=WorkflowRunResponse.model_validate_json,
         )
+        bind_workflow_id(run_response.workflow_id)
+        _set_routing_hints(response, state_manager)
+        return run_response
         
     except ConnectionError as e:
         # Handle specific case where Redis is down
-        print(f"ERROR: Could not connect to state manager (Redis): {e}")
+        logger.error("Could not connect to state manager (Redis): %s", e)
         raise HTTPException(status_code=503, detail=f"State service unavailable: {e}")
+    except AdmissionRejectedError as e:
+        # Shed load early; Retry-After tells the client when a slot is expected to free up.
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after_seconds)})
     except ValueError as e:
         # Handle cases where the service raises a value error (e.g., workflow fails)
-        print(f"ERROR: A validation error occurred during the workflow: {e}")
+        logger.error("A validation error occurred during the workflow: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
         # Handle any other unexpected errors during the workflow
-        print(f"An unexpected error occurred during workflow run: {e}")
+        logger.exception("An unexpected error occurred during workflow run: %s", e)
         raise HTTPException(status_code=500, detail="An internal server error occurred during the workflow.")
 
 
+# --- API ENDPOINT 1b: FORK A FINISHED RUN ---
+
+@router.post("/optimizer/{workflow_id}/fork", response_model=WorkflowRunResponse)
+async def fork_optimizer_workflow(
+    workflow_id: str,
+    fork: ForkRequest,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    response: Response,
+    service: ResumeOptimizerService = Depends(get_optimizer_service),
+    state_manager: WorkflowStateManager = Depends(get_state_manager),
+    render_cache: PdfRenderCache = Depends(get_render_cache),
+    single_flight: SingleFlight = Depends(get_single_flight)
+):
+    """
+    Starts a new run from a stage of a finished one, with some fields changed.
+
+    The parent's full state (saved with every run) supplies the outputs of
+    all stages before `from_node`, so "same JD, more formal tone" only runs
+    the strategist onward and "different company" can skip context
+    extraction. The fork gets its own workflow ID and is saved, pre-rendered
+    and forkable like any other run; the parent is left untouched.
+    """
+    logger.info("Forking workflow %s from %s", workflow_id, fork.from_node)
+    try:
+        parent_state = await state_manager.load_workflow_state(workflow_id)
+
+        async def fork_and_save() -> WorkflowRunResponse:
+            async with get_admission_controller("optimize").admit():
+                with scheduling(Priority.BATCH, tenant=tenant_for(request)):
+                    workflow_state = await run_in_threadpool(service.fork_workflow, parent_state, fork.from_node, fork.overrides)
+
+            resume_data = workflow_state.final_report.final_resume
+            forked_id = await state_manager.save_state(resume_data, workflow_state=workflow_state)
+            background_tasks.add_task(prerender_pdf, forked_id, resume_data, state_manager, render_cache)
+            return WorkflowRunResponse(workflow_id=forked_id, resume_data=resume_data, forked_from=workflow_id)
+
+        key = request_key("fork", workflow_id, fork.from_node, json.dumps(fork.overrides, sort_keys=True, default=str))
+        fork_response = await single_flight.run(
+            key,
+            fork_and_save,
+            encode=lambda result: result.model_dump_json().encode("utf-8"),
+            decode=WorkflowRunResponse.model_validate_json,
+        )
+        bind_workflow_id(fork_response.workflow_id)
+        _set_routing_hints(response, state_manager)
+        return fork_response
+
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ConnectionError as e:
+        # Redis is down and this worker does not hold the parent run.
+        raise HTTPException(status_code=503, detail=f"State service unavailable: {e}", headers=routing_hints(state_manager))
+    except AdmissionRejectedError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after_seconds)})
+    except ValueError as e:
+        # The fork point or the overrides do not fit the parent run.
+        logger.warning("Could not fork workflow %s: %s", workflow_id, e)
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("An unexpected error occurred while forking workflow %s: %s", workflow_id, e)
+        raise HTTPException(status_code=500, detail="An internal server error occurred while forking the workflow.")
+
+
 # --- API ENDPOINT 2: DOWNLOAD THE PDF ---
 
 @router.get("/optimizer/download-pdf/{workflow_id}")
 async def download_resume_pdf(
     workflow_id: str,
-    state_manager: WorkflowStateManager = Depends(get_state_manager)
+    if_none_match: Optional[str] = Header(None),
+    state_manager: WorkflowStateManager = Depends(get_state_manager),
+    render_cache: PdfRenderCache = Depends(get_render_cache),
+    renderer: TypstRenderer = Depends(get_renderer),
 ):
     """
     Retrieves the result of a completed workflow and returns the generated
     resume as a downloadable, professionally typeset .pdf file using Typst.
+
+    The PDF pre-rendered when the workflow completed is served straight from
+    Redis. Otherwise it comes from the local render cache, keyed by a hash of
+    the resume content and template version, and is only compiled on a miss.
+    The hash is also sent as the ETag, so a client that already holds this
+    version gets a 304 Not Modified.
     """
-    print(f"--- API: Received request to download PDF for ID: {workflow_id} ---")
-    renderer = TypstRenderer() # <-- The only change is here
-    file_path = None
+    bind_workflow_id(workflow_id)
+    logger.info("Received request to download PDF")
     try:
-        resume_data = state_manager.load_state(workflow_id)
-        file_path = renderer.render_to_pdf(resume_data)
-        
-        return FileResponse(
-            path=file_path,
-            media_type='application/pdf',
-            filename=f"Optimized_Resume_{workflow_id[:8]}.pdf")
+        resume_data, pdf_bytes = await state_manager.load_state_with_artifact(workflow_id)
+        fingerprint = renderer.fingerprint(resume_data)
+        headers = {
+            "ETag": f'"{fingerprint}"',
+            "Cache-Control": "private, no-cache",
+            **routing_hints(state_manager),
+        }
+
+        if _etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+        # Disk reads, writes and the eviction scan run in the threadpool, off the event loop.
+        if pdf_bytes is None:
+            pdf_bytes = await run_in_threadpool(render_cache.get, fingerprint)
+        if pdf_bytes is None:
+            pdf_bytes = await renderer.render_to_pdf_async(resume_data)
+            await run_in_threadpool(render_cache.put, fingerprint, pdf_bytes)
+
+        headers["Content-Disposition"] = f'attachment; filename="Optimized_Resume_{workflow_id[:8]}.pdf"'
+        return Response(content=pdf_bytes, media_type='application/pdf', headers=headers)
         
     except FileNotFoundError as e:
         # This error is raised by the state manager if the ID is invalid or expired.
         raise HTTPException(status_code=404, detail=str(e))
+    except TypstCompileError as e:
+        # Retrying on another node would fail the same way, so no routing hints.
+        logger.error("PDF generation failed: %s", e)
+        raise HTTPException(status_code=500, detail="An internal server error occurred during PDF generation.")
     except ConnectionError as e:
-        # Handle specific case where Redis is down
-        raise HTTPException(status_code=503, detail=f"State service unavailable: {e}")
+        # Redis is down and this worker does not hold the run; the client should retry on the node that does.
+        raise HTTPException(status_code=503, detail=f"State service unavailable: {e}", headers=routing_hints(state_manager))
+    except RenderQueueFullError as e:
+        # The compile pool is saturated; ask the client to back off briefly.
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "2"})
+    except TimeoutError as e:
+        logger.error("PDF generation timed out: %s", e)
+        raise HTTPException(status_code=504, detail="PDF generation timed out.")
     except Exception as e:
         # Handle errors during the PDF rendering process
-        print(f"An unexpected error occurred during PDF generation: {e}")
+        logger.exception("An unexpected error occurred during PDF generation: %s", e)
         raise HTTPException(status_code=500, detail="An internal server error occurred during PDF generation.")
-    finally:
-        if file_path and os.path.exists(file_path):
-            os.remove(file_path)
-            print(f"--- API: Cleaned up temporary PDF file: {file_path} ---")
\ No newline at end of file
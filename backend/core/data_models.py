@@ -1,6 +1,6 @@
 # core/data_models.py
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 class Education(BaseModel):
     degree: str
@@ -64,6 +64,21 @@ class FinalHolisticReport(BaseModel):
     recommendations: List[str] = Field(..., description="List of general recommendations for improving the resume.", example=["Focus on ATS keywords", "Improve summary section"])
 
 
+class CohortMetric(BaseModel):
+    """Where one score sits among the scores of everyone who targeted the same role."""
+    value: Optional[float] = Field(None, description="The score that was ranked, if one was given.")
+    percentile: Optional[float] = Field(None, description="Share of the cohort scoring below the value (ties count half), 0-100.")
+    cohort_quantiles: Dict[str, float] = Field(default_factory=dict, description="The cohort's p25/p50/p75/p90 for this score.")
+
+
+class CohortPercentileReport(BaseModel):
+    """Percentile ranks of an analysis against its role cohort."""
+    job_role: str = Field(description="The job role as given in the request.")
+    canonical_role: str = Field(description="The normalised role that defines the cohort.")
+    cohort_size: int = Field(description="Number of stored analyses in the cohort.")
+    metrics: Dict[str, CohortMetric] = Field(description="One entry for the overall score and one per category.")
+
+
 
 # --- NEW MODELS FOR THE OPTIMIZER VERTICAL ---
 
@@ -145,4 +160,37 @@ class WorkflowRunResponse(BaseModel):
     ID for the results and the data needed for a frontend preview.
     """
     workflow_id: str = Field(description="The unique ID for this workflow run, used to download the final asset.")
-    resume_data: FinalResumeSections = Field(description="The structured resume content for preview.")
\ No newline at end of file
+    resume_data: FinalResumeSections = Field(description="The structured resume content for preview.")
+    forked_from: Optional[str] = Field(None, description="The workflow ID this run was forked from, if any.")
+
+
+class ForkRequest(BaseModel):
+    """A request to re-run a finished workflow from one of its stages with some fields changed."""
+    from_node: Literal["context_extractor", "researcher", "strategist", "builder", "optimizer", "reviewer"] = Field(
+        description="The first stage to run again; the outputs of earlier stages are reused as-is.")
+    overrides: Dict[str, Any] = Field(default_factory=dict, description=(
+        "New values keyed by field path, e.g. {\"company_name\": \"Acme\"} or "
+        "{\"strategy.tone_of_voice\": \"formal\"}. Fields produced by `from_node` or a later stage cannot be overridden, "
+        "and `job_description` only when forking from `context_extractor`."))
+
+
+class SavedJobResponse(BaseModel):
+    """The response after a job description is saved to the local match index."""
+    job_id: str = Field(description="Stable ID of the saved job; saving the same posting again returns the same ID.")
+    context: ContextOutput = Field(description="The structured details extracted from the job description.")
+
+
+class JobMatch(BaseModel):
+    """One saved job ranked against a resume."""
+    job_id: str
+    company_name: str
+    job_role: str
+    score: float = Field(description="BM25 relevance of the job to the resume; only comparable within one response.")
+    skills: List[str] = Field(description="The skills extracted from the job description.")
+    matched_skills: List[str] = Field(description="The job's skills that appear in the resume.")
+
+
+class JobMatchResponse(BaseModel):
+    """The shortlist of saved jobs that best fit a resume."""
+    matches: List[JobMatch]
+    jobs_indexed: int = Field(description="Number of saved jobs the resume was ranked against.")
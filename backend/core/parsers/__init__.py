@@ -1,20 +1,22 @@
 import os
 from typing import Type
 from .base import ResumeParser
-from .docx_parser import DocxParser
-from .pdf_parser import PdfParser
+from .sniffing import SNIFF_BYTES, sniff_file_type
 
-__all__ = ["get_parser"]
+__all__ = ["get_parser", "sniff_file_type", "SNIFF_BYTES"]
 
 def get_parser(file_path: str) -> Type[ResumeParser]:
     """
     Factory function to get the correct parser instance based on file extension.
     This is the public entry point for the parsers package.
+    The concrete parsers (python-docx, PyPDF2) are imported on first use.
     """
     extension = os.path.splitext(file_path)[1].lower()
     if extension == ".docx":
+        from .docx_parser import DocxParser
         return DocxParser
     elif extension == ".pdf":
+        from .pdf_parser import PdfParser
         return PdfParser
     else:
-        raise ValueError(f"Unsupported file type: {extension}")
\ No newline at end of file
+        raise ValueError(f"Unsupported file type: {extension}")
@@ -1,7 +1,10 @@
+import logging
 from typing import IO
 import docx
 from .base import ResumeParser
 
+logger = logging.getLogger(__name__)
+
 class DocxParser(ResumeParser):
     """Concrete implementation for parsing DOCX files."""
     def parse_to_text(self, file: IO[bytes]) -> str:
@@ -9,5 +12,5 @@ class DocxParser(ResumeParser):
             doc = docx.Document(file)
             return "\n".join([para.text for para in doc.paragraphs])
         except Exception as e:
-            print(f"Error parsing DOCX file: {e}")
+            logger.warning("Error parsing DOCX file: %s", e)
             return ""
\ No newline at end of file
@@ -1,8 +1,11 @@
 # core/parsers/pdf_parser.py
+import logging
 from typing import IO
 from PyPDF2 import PdfReader
 from .base import ResumeParser
 
+logger = logging.getLogger(__name__)
+
 
 
 class PdfParser(ResumeParser):
@@ -12,5 +15,5 @@ class PdfParser(ResumeParser):
             reader = PdfReader(file)
             return "\n".join([page.extract_text() for page in reader.pages if page.extract_text()])
         except Exception as e:
-            print(f"Error parsing PDF file: {e}")
+            logger.warning("Error parsing PDF file: %s", e)
             return ""
\ No newline at end of file
@@ -0,0 +1,34 @@
+import os
+from typing import Optional
+
+# Leading bytes that identify each supported upload format.
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+
+# Enough of the first chunk to recognise every signature above.
+SNIFF_BYTES = 8
+
+
+def sniff_file_type(head: bytes, filename: Optional[str] = None) -> str:
+    """
+    Detects the type of an upload from its first bytes instead of trusting its name.
+
+    DOCX files are ZIP containers, so a ZIP signature is only accepted as DOCX
+    when the filename does not claim some other format (e.g. `.xlsx`).
+
+    Args:
+        head: At least the first `SNIFF_BYTES` bytes of the upload.
+        filename: The client-supplied name, used only to disambiguate ZIP containers.
+
+    Returns:
+        The canonical extension for the detected type: ".pdf" or ".docx".
+
+    Raises:
+        ValueError: If the content is not a supported resume format.
+    """
+    extension = os.path.splitext(filename or "")[1].lower()
+    if head.startswith(PDF_MAGIC):
+        return ".pdf"
+    if head.startswith(ZIP_MAGIC) and extension in ("", ".docx"):
+        return ".docx"
+    raise ValueError("Unsupported file content. Please upload a PDF or DOCX resume.")
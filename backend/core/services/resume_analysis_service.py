@@ -1,17 +1,18 @@
 # backend/core/services/resume_analysis_service.py
 
 import os
-import tempfile
 import logging
 import json
-from dotenv import load_dotenv
+from typing import IO, Optional
 
-from backend.core.agents.analyzer.preprocessor_agent import PreprocessorAgent
-from backend.core.agents.analyzer.rule_checker_agent import RuleCheckerAgent
-from backend.core.agents.analyzer.llm_analyzer_agent import LLMAnalyzerAgent
-from backend.core.agents.analyzer.aggregator_agent import AggregatorAgent
+from backend.core.tools.analysis_sessions import (
+    AnalysisSnapshot, get_analysis_session_store, resume_signature, revision_categories,
+)
+from backend.core.tools.metrics import metrics
+from backend.core.tools.structured_logging import log_stage
+from backend.core.tools.tracing import tracer
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
 
 class ResumeAnalysisService:
     """
@@ -19,68 +20,155 @@ class ResumeAnalysisService:
     """
 
     def __init__(self):
-        load_dotenv()
+        # The .env file is loaded once at startup (see backend.main), not per request.
         api_key = os.getenv("GOOGLE_API_KEY")
         if not api_key:
-            logging.error("CRITICAL: GOOGLE_API_KEY not found in .env file.")
+            logger.critical("GOOGLE_API_KEY not found in .env file.")
             raise ValueError("Configuration Error: GOOGLE_API_KEY is not set.")
 
+        # The agents pull in PyMuPDF, python-docx and the Gemini SDK, so they are
+        # imported on first use rather than when the API module is imported.
+        from backend.core.agents.analyzer.preprocessor_agent import PreprocessorAgent
+        from backend.core.agents.analyzer.rule_checker_agent import RuleCheckerAgent
+        from backend.core.agents.analyzer.llm_analyzer_agent import LLMAnalyzerAgent
+        from backend.core.agents.analyzer.aggregator_agent import AggregatorAgent
+
         self.preprocessor = PreprocessorAgent()
         self.rule_checker = RuleCheckerAgent()
         self.llm_analyzer = LLMAnalyzerAgent(api_key)
         self.aggregator = AggregatorAgent()
-        logging.info("ResumeAnalysisService initialized successfully.")
 
-    def analyze_resume(self, resume_content: bytes, filename: str, target_job_role: str) -> dict:
+        self._full_runs = metrics.counter("analysis.full_evaluations", "Analyses that evaluated every category.")
+        self._incremental_runs = metrics.counter("analysis.incremental_evaluations", "Revisions re-scored incrementally.")
+        self._categories_reused = metrics.counter("analysis.categories_reused", "Category evaluations carried over from a previous revision.")
+        logger.debug("ResumeAnalysisService initialized successfully.")
+
+    def analyze_resume(self, resume_file: IO[bytes], file_type: str, target_job_role: str,
+                       session_id: Optional[str] = None, upload_sha256: Optional[str] = None) -> dict:
         """
-        Analyzes a resume provided as byte content. This contains the entire pipeline.
+        Analyzes an uploaded resume. This contains the entire pipeline.
+
+        Args:
+            resume_file: A seekable binary stream with the upload (e.g. the request's spooled file).
+            file_type: The type sniffed from the content, ".pdf" or ".docx".
+            target_job_role: The job role the resume is evaluated against.
+            session_id: Identifies the user's session. If the session's previous
+                upload was an earlier version of this resume for the same role,
+                only the categories affected by the changed sections are
+                re-evaluated; the rest are carried over from the previous report.
+            upload_sha256: Digest of the upload, so a repeat upload is counted
+                once in the cohort statistics.
+        """
+        file_bytes = resume_file.seek(0, os.SEEK_END)
+        logger.info("Starting analysis for role %r on a %d byte %s upload", target_job_role, file_bytes, file_type)
+        with tracer.start_span("analysis.pipeline", attributes={"analysis.job_role": target_job_role, "analysis.file_bytes": file_bytes}):
+            return self._run_pipeline(resume_file, file_type, target_job_role, session_id, upload_sha256)
+
+    def _record_scores(self, target_job_role: str, final_report: dict, upload_sha256: Optional[str],
+                       session_id: Optional[str]) -> None:
         """
-        logging.info(f"Starting analysis for role: '{target_job_role}' on file: '{filename}'")
-        
-        # --- KEY CHANGE: Robust and platform-safe temporary file handling ---
-        file_extension = os.path.splitext(filename)[1]
-        # 1. Create the temporary file but instruct it NOT to delete on close.
-        #    We will handle deletion manually in a `finally` block for robustness.
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=file_extension)
-        resume_path = temp_file.name
+        Adds the report's scores to the role's cohort for percentile analytics. Never fails the analysis.
 
+        The upload digest and session keep each resume to one entry: a repeat
+        upload is skipped and a session revision replaces the session's entry.
+        """
+        if "error" in final_report.get("feedback", {}):
+            # The LLM evaluation failed and every score is 0; it would skew the cohort.
+            return
         try:
+            from backend.core.tools.score_store import get_score_store
+            get_score_store().append(target_job_role, final_report, upload_sha256=upload_sha256, session_id=session_id)
+        except (OSError, KeyError, TypeError, ValueError) as e:
+            logger.warning("Could not record scores for cohort analytics: %s", e)
+
+    def _evaluate(self, resume_text: str, sections: dict, page_count: int, target_job_role: str,
+                  previous: Optional[AnalysisSnapshot]) -> tuple:
+        """
+        Steps 2 and 3: the persona and the holistic evaluation, incremental where possible.
+
+        Returns:
+            The persona JSON and the evaluation JSON.
+        """
+        categories = None
+        if previous is not None:
+            categories = revision_categories(previous, target_job_role, resume_text, sections, page_count)
+
+        if categories is None:
+            with log_stage("analysis.generate_persona", logger), tracer.start_span("analysis.generate_persona"):
+                role_persona_json = self.llm_analyzer.generate_role_persona(target_job_role)
+
+            with log_stage("analysis.holistic_evaluation", logger), tracer.start_span("analysis.holistic_evaluation"):
+                holistic_eval_json = self.llm_analyzer.analyze_resume_holistically(
+                    resume_text, role_persona_json
+                )
+            self._full_runs.inc()
+            return role_persona_json, holistic_eval_json
 
-            temp_file.write(resume_content)
-            temp_file.close() 
+        # A revision of the session's previous upload for the same role: the
+        # persona is reused and only the affected categories are re-scored.
+        logger.info("Revision detected; re-evaluating %s", ", ".join(categories) or "no categories")
+        evaluation = dict(previous.evaluation)
+        if categories:
+            attributes = {"analysis.categories": ",".join(categories)}
+            with log_stage("analysis.incremental_evaluation", logger), \
+                    tracer.start_span("analysis.incremental_evaluation", attributes=attributes):
+                partial = self._parse_evaluation(self.llm_analyzer.analyze_resume_categories(
+                    resume_text, previous.persona_json, categories
+                ))
+            if partial is None or not set(categories) <= partial.keys():
+                logger.info("Incremental evaluation incomplete; falling back to a full analysis")
+                return self._evaluate(resume_text, sections, page_count, target_job_role, None)
+            evaluation.update({category: partial[category] for category in categories})
+        self._incremental_runs.inc()
+        self._categories_reused.inc(len(evaluation) - len(categories))
+        return previous.persona_json, json.dumps(evaluation)
+
+    @staticmethod
+    def _parse_evaluation(evaluation_json: str) -> Optional[dict]:
+        """The evaluation as a dict, or None if the LLM returned an error or malformed JSON."""
+        try:
+            evaluation = json.loads(evaluation_json)
+        except (json.JSONDecodeError, TypeError):
+            return None
+        if not isinstance(evaluation, dict) or "error" in evaluation:
+            return None
+        return evaluation
 
+    def _run_pipeline(self, resume_file: IO[bytes], file_type: str, target_job_role: str,
+                      session_id: Optional[str] = None, upload_sha256: Optional[str] = None) -> dict:
+        """Runs the four analysis steps directly against the uploaded stream."""
+        try:
             # --- Agentic Workflow ---
-            logging.info("Step 1/4: Pre-processing and running local checks...")
-            resume_text = self.preprocessor.extract_text(resume_path)
-            page_count = self.preprocessor.get_page_count(resume_path)
-            rule_feedback = self.rule_checker.check_rules(resume_text, page_count)
-            logging.info("  - Local processing complete.")
-
-            logging.info("Step 2/4: Generating ideal candidate persona...")
-            role_persona_json = self.llm_analyzer.generate_role_persona(target_job_role)
-            logging.info("  - Persona generation complete.")
-
-            logging.info("Step 3/4: Performing holistic resume analysis with AI...")
-            holistic_eval_json = self.llm_analyzer.analyze_resume_holistically(
-                resume_text, role_persona_json
+            with log_stage("analysis.preprocess", logger), tracer.start_span("analysis.preprocess") as span:
+                resume_text, page_count = self.preprocessor.extract_from_stream(resume_file, file_type)
+                rule_feedback = self.rule_checker.check_rules(resume_text, page_count)
+                sections = self.preprocessor.identify_sections(resume_text)
+                span.set_attributes({"resume.page_count": page_count, "resume.text_length": len(resume_text)})
+
+            sessions = get_analysis_session_store()
+            previous = sessions.get(session_id) if session_id else None
+            role_persona_json, holistic_eval_json = self._evaluate(
+                resume_text, sections, page_count, target_job_role, previous
             )
-            logging.info("  - Holistic AI analysis complete.")
 
-            logging.info("Step 4/4: Aggregating scores and generating final report...")
-            final_report_str = self.aggregator.aggregate_scores(holistic_eval_json, rule_feedback)
-            logging.info("Analysis finished successfully.")
-            
-            return json.loads(final_report_str)
+            evaluation = self._parse_evaluation(holistic_eval_json)
+            if session_id and evaluation is not None:
+                sessions.put(session_id, AnalysisSnapshot(
+                    job_role=target_job_role, resume_text=resume_text, sections=sections, page_count=page_count,
+                    persona_json=role_persona_json, evaluation=evaluation, signature=resume_signature(resume_text),
+                ))
+
+            with log_stage("analysis.aggregate", logger), tracer.start_span("analysis.aggregate"):
+                final_report_str = self.aggregator.aggregate_scores(holistic_eval_json, rule_feedback)
+            logger.info("Analysis finished successfully")
+
+            final_report = json.loads(final_report_str)
+            self._record_scores(target_job_role, final_report, upload_sha256, session_id)
+            return final_report
 
         except Exception as e:
-            logging.error(f"An unexpected error occurred during the analysis pipeline: {e}", exc_info=True)
+            logger.exception("An unexpected error occurred during the analysis pipeline: %s", e)
             return {
                 "error": "An internal error occurred during the analysis pipeline.",
                 "details": str(e)
             }
-        finally:
-            # 3. GUARANTEE DELETION: This block runs no matter what, ensuring we
-            #    don't leave temporary files on the disk if an error occurs.
-            if os.path.exists(resume_path):
-                os.remove(resume_path)
-                logging.info(f"Cleaned up temporary file: {resume_path}")
\ No newline at end of file
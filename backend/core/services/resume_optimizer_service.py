@@ -1,13 +1,30 @@
+import logging
+from typing import Any, Dict
 
-from langgraph.graph import StateGraph, END
+from pydantic import ValidationError
 
-from backend.core.agents.optimizer.ats_agent import ATSOptimizerAgent
-from backend.core.agents.optimizer.builder_agent import ResumeBuilderAgent
-from backend.core.agents.optimizer.context_extraction_agent import ContextExtractionAgent
-from backend.core.agents.optimizer.research_agent import ResearchAgent
-from backend.core.agents.optimizer.reviewer_agent import FinalReviewerAgent
-from backend.core.agents.optimizer.strategist_agent import ResumeStrategistAgent
 from backend.core.data_models import OptimizerWorkflowState, ReviewerOutput
+from backend.core.tools.structured_logging import log_stage
+from backend.core.tools.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# The nodes of the optimizer graph in execution order, and the state field each one produces.
+NODE_ORDER = ["context_extractor", "researcher", "strategist", "builder", "optimizer", "reviewer"]
+NODE_OUTPUTS = {
+    "context_extractor": "context",
+    "researcher": "research",
+    "strategist": "strategy",
+    "builder": "draft_resume_text",
+    "optimizer": "optimized_resume_text",
+    "reviewer": "final_report",
+}
+# Inputs only one node reads; overriding one in a fork that starts after that
+# node would change nothing. The company and role are also carried into the
+# reused context (see `fork_workflow`), so they can be overridden from any node.
+INPUT_CONSUMERS = {
+    "job_description": "context_extractor",
+}
 
 class ResumeOptimizerService:
     """
@@ -23,6 +40,15 @@ class ResumeOptimizerService:
         Initializes the service by building and compiling the LangGraph workflow.
         This one-time setup ensures the service is ready to handle requests efficiently.
         """
+        # LangGraph and the agents (LangChain, Gemini SDK, web search) are heavy to import,
+        # so they are loaded on first use rather than when the API module is imported.
+        from backend.core.agents.optimizer.ats_agent import ATSOptimizerAgent
+        from backend.core.agents.optimizer.builder_agent import ResumeBuilderAgent
+        from backend.core.agents.optimizer.context_extraction_agent import ContextExtractionAgent
+        from backend.core.agents.optimizer.research_agent import ResearchAgent
+        from backend.core.agents.optimizer.reviewer_agent import FinalReviewerAgent
+        from backend.core.agents.optimizer.strategist_agent import ResumeStrategistAgent
+
         # 1. Instantiate all agents that will act as nodes in our graph.
         context_agent = ContextExtractionAgent()
         research_agent = ResearchAgent()
@@ -31,39 +57,56 @@ class ResumeOptimizerService:
         optimizer_agent = ATSOptimizerAgent()
         reviewer_agent = FinalReviewerAgent()
 
-        # 2. Define the StateGraph with our Pydantic model as the central state.
+        # 2. Map each node's unique identifier to the agent method it runs.
+        self.nodes = {
+            "context_extractor": context_agent.execute,
+            "researcher": research_agent.execute,
+            "strategist": strategist_agent.execute,
+            "builder": builder_agent.execute,
+            "optimizer": optimizer_agent.execute,
+            "reviewer": reviewer_agent.execute,
+        }
+        self._graphs = {}
+
+        # 3. Compile the full graph into a runnable application. This is a crucial
+        #    step that creates an optimized, executable version of our workflow.
+        self.graph = self._graph_from(NODE_ORDER[0])
+
+    def _graph_from(self, entry_node: str):
+        """
+        Compiles the sequential pipeline starting at `entry_node`.
+
+        The full run starts at the first node; forks start further down and
+        never execute the nodes before their entry point. Compiled graphs are
+        kept, so each entry point is compiled once per service; the API shares
+        one service per worker (see `get_optimizer_service`).
+        """
+        if entry_node in self._graphs:
+            return self._graphs[entry_node]
+        from langgraph.graph import StateGraph, END
+
+        # Define the StateGraph with our Pydantic model as the central state.
         workflow = StateGraph(OptimizerWorkflowState)
 
-        # 3. Add each agent's `execute` method as a node in the graph.
-        #    Each node is given a unique identifier string.
-        workflow.add_node("context_extractor", context_agent.execute)
-        workflow.add_node("researcher", research_agent.execute)
-        workflow.add_node("strategist", strategist_agent.execute)
-        workflow.add_node("builder", builder_agent.execute)
-        workflow.add_node("optimizer", optimizer_agent.execute)
-        workflow.add_node("reviewer", reviewer_agent.execute)
-
-        # 4. Define the sequential edges that dictate the flow of the pipeline.
-        #    The graph will proceed from one node to the next in this order.
-        workflow.add_edge("context_extractor", "researcher")
-        workflow.add_edge("researcher", "strategist")
-        workflow.add_edge("strategist", "builder")
-        workflow.add_edge("builder", "optimizer")
-        workflow.add_edge("optimizer", "reviewer")
-        
-        # The final node in the sequence points to the special END state.
-        workflow.add_edge("reviewer", END)
+        # Add each agent's `execute` method as a node, running inside its own trace
+        # span and logging its duration.
+        order = NODE_ORDER[NODE_ORDER.index(entry_node):]
+        for name in order:
+            node = log_stage(f"optimizer.{name}", logger)(self.nodes[name])
+            workflow.add_node(name, tracer.traced(f"optimizer.node.{name}")(node))
 
-        # 5. Set the entry point of the graph.
-        workflow.set_entry_point("context_extractor")
+        # The sequential edges dictate the flow of the pipeline; the final node points to END.
+        for current, following in zip(order, order[1:]):
+            workflow.add_edge(current, following)
+        workflow.add_edge(order[-1], END)
+        workflow.set_entry_point(entry_node)
 
-        # 6. Compile the graph into a runnable application. This is a crucial
-        #    step that creates an optimized, executable version of our workflow.
-        self.graph = workflow.compile()
+        graph = self._graphs[entry_node] = workflow.compile()
+        return graph
 
-    def optimize_resume(self, jd: str, role: str, company: str) -> ReviewerOutput:
+    def run_workflow(self, jd: str, role: str, company: str) -> OptimizerWorkflowState:
         """
-        Executes the full agentic pipeline to generate a tailored resume.
+        Executes the full agentic pipeline and returns the complete final state.
 
         Args:
             jd: The raw text of the job description.
@@ -71,10 +114,10 @@ class ResumeOptimizerService:
             company: The name of the company.
 
         Returns:
-            The final state of the workflow, containing the complete analysis and
+            The final state of the workflow, containing every agent's output and
             the final, structured resume report.
         """
-        print("--- ORCHESTRATOR: Kicking off Resume Optimizer Workflow ---")
+        logger.info("Starting resume optimizer workflow")
         
         # Define the initial state of the workflow with the user's inputs.
         initial_state = {
@@ -83,16 +126,102 @@ class ResumeOptimizerService:
             "company_name": company
         }
         
-        final_state = self.graph.invoke(initial_state)
+        with tracer.start_span("optimizer.workflow", attributes={"optimizer.job_role": role, "optimizer.company": company}):
+            final_state = self.graph.invoke(initial_state)
         
-        print("--- ORCHESTRATOR: Workflow Complete ---")
+        logger.info("Resume optimizer workflow complete")
         
         final_state_model = OptimizerWorkflowState(**final_state)
 
-                # Add a crucial check to ensure the final report was actually generated.
+        # Add a crucial check to ensure the final report was actually generated.
         if not final_state_model.final_report:
             raise ValueError("Workflow completed, but the final report was not generated.")
-            
-        # Return ONLY the final, clean result.
-        return final_state_model.final_report
-   
+
+        return final_state_model
+
+    def optimize_resume(self, jd: str, role: str, company: str) -> ReviewerOutput:
+        """
+        Executes the full agentic pipeline to generate a tailored resume.
+
+        Returns:
+            ONLY the final, clean result: the structured resume report.
+        """
+        return self.run_workflow(jd, role, company).final_report
+
+    def fork_workflow(self, parent: OptimizerWorkflowState, from_node: str,
+                      overrides: Dict[str, Any]) -> OptimizerWorkflowState:
+        """
+        Re-runs a finished workflow from `from_node` onward with some fields changed.
+
+        The outputs of every node before `from_node` are taken from `parent` as-is,
+        so a what-if edit (a more formal tone, a different company) only pays
+        for the downstream stages.
+
+        Args:
+            parent: The complete state of the run being forked.
+            from_node: The first node to execute again (see `NODE_ORDER`).
+            overrides: New values keyed by field path, e.g. "company_name" or
+                "strategy.tone_of_voice". Only inputs and upstream outputs can be
+                overridden; everything from `from_node` on is regenerated, and
+                an input such as `job_description` only when its consuming node
+                runs again (see `INPUT_CONSUMERS`). When
+                `company_name` or `job_role` changes, the reused context follows
+                unless it is overridden explicitly.
+
+        Returns:
+            The final state of the forked run.
+
+        Raises:
+            ValueError: If the node is unknown, the parent lacks an upstream
+                output, an override targets a regenerated or unknown field or
+                an input no forked node reads, or the result fails validation.
+        """
+        if from_node not in NODE_ORDER:
+            raise ValueError(f"Unknown node '{from_node}'. Expected one of: {', '.join(NODE_ORDER)}.")
+        start = NODE_ORDER.index(from_node)
+        regenerated = {NODE_OUTPUTS[node] for node in NODE_ORDER[start:]}
+
+        state = parent.model_dump()
+        for node in NODE_ORDER[:start]:
+            if state[NODE_OUTPUTS[node]] is None:
+                raise ValueError(f"The parent run has no '{NODE_OUTPUTS[node]}' output to fork from '{from_node}'.")
+        for field in regenerated:
+            state[field] = None
+
+        for path, value in overrides.items():
+            parts = path.split(".")
+            if parts[0] in regenerated:
+                raise ValueError(f"'{path}' is regenerated when forking from '{from_node}' and cannot be overridden.")
+            consumer = INPUT_CONSUMERS.get(parts[0])
+            if consumer is not None and NODE_ORDER.index(consumer) < start:
+                raise ValueError(f"'{path}' is only read by '{consumer}', which does not run when forking from "
+                                 f"'{from_node}'. Fork from '{consumer}' to change it.")
+            target = state
+            for part in parts[:-1]:
+                target = target.get(part) if isinstance(target, dict) else None
+            if not isinstance(target, dict) or parts[-1] not in target:
+                raise ValueError(f"Unknown field '{path}'.")
+            target[parts[-1]] = value
+
+        # Downstream agents read the company and role from the context, so a
+        # reused context must agree with the overridden inputs.
+        if state["context"] is not None:
+            for input_field, context_field in (("company_name", "company"), ("job_role", "role")):
+                if input_field in overrides and f"context.{context_field}" not in overrides:
+                    state["context"][context_field] = state[input_field]
+
+        try:
+            forked = OptimizerWorkflowState.model_validate(state)
+        except ValidationError as e:
+            raise ValueError(f"The overrides do not produce a valid workflow state: {e}")
+
+        logger.info("Forking workflow from %s (%d of %d stages)", from_node, len(NODE_ORDER) - start, len(NODE_ORDER))
+        attributes = {"optimizer.fork_from": from_node, "optimizer.overrides": ",".join(sorted(overrides))}
+        with tracer.start_span("optimizer.fork", attributes=attributes):
+            final_state = self._graph_from(from_node).invoke(forked)
+        logger.info("Forked workflow complete")
+
+        final_state_model = OptimizerWorkflowState(**final_state)
+        if not final_state_model.final_report:
+            raise ValueError("Forked workflow completed, but the final report was not generated.")
+        return final_state_model
@@ -0,0 +1,150 @@
+import logging
+import os
+import math
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from backend.core.tools.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejectedError(Exception):
+    """
+    Raised when a request is shed instead of queued.
+
+    Attributes:
+        status_code: 429 when the wait queue is full, 503 when the expected
+            (or actual) wait exceeds the endpoint's deadline.
+        retry_after_seconds: When a slot is expected to be free again.
+    """
+
+    def __init__(self, message: str, status_code: int, retry_after_seconds: int):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after_seconds = retry_after_seconds
+
+
+class AdmissionController:
+    """
+    Admission control for one LLM-backed endpoint.
+
+    At most `max_concurrency` requests run at once and up to `max_queue` more
+    wait for a slot. A request is rejected immediately, before any LLM work,
+    when the queue is full or when the estimated wait already exceeds
+    `max_wait_seconds`; a queued request that is still waiting at the deadline
+    is rejected too. The estimate comes from an exponentially weighted moving
+    average of recent service times, which also sets the Retry-After hint.
+
+    Queue depth, in-flight count, wait and service times and rejections are
+    recorded under `admission.<name>.*` in the metrics registry.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, max_wait_seconds: float,
+                 smoothing: float = 0.2):
+        """
+        Args:
+            name: The endpoint name, used in metric names and messages.
+            max_concurrency: Requests allowed to run at once.
+            max_queue: Requests allowed to wait for a slot.
+            max_wait_seconds: The longest a request may wait before it is shed.
+            smoothing: Weight of the newest sample in the service-time average.
+        """
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self.smoothing = smoothing
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._waiting = 0
+        self._service_seconds: Optional[float] = None
+
+        self._queue_depth = metrics.gauge(f"admission.{name}.queue_depth", "Requests waiting for a slot.")
+        self._in_flight = metrics.gauge(f"admission.{name}.in_flight", "Requests currently running.")
+        self._queue_wait = metrics.histogram(f"admission.{name}.queue_wait_ms", "Time spent waiting for a slot.")
+        self._service_time = metrics.histogram(f"admission.{name}.service_ms", "Time spent running once admitted.")
+        self._rejected = metrics.counter(f"admission.{name}.rejected", "Requests shed by admission control.")
+
+    def estimated_wait_seconds(self, position: Optional[int] = None) -> float:
+        """Expected wait for a request at `position` in the queue (default: joining it now)."""
+        if self._service_seconds is None or not self._semaphore.locked():
+            return 0.0
+        position = self._waiting if position is None else position
+        return (position + 1) / self.max_concurrency * self._service_seconds
+
+    def _reject(self, message: str, status_code: int) -> AdmissionRejectedError:
+        self._rejected.inc()
+        retry_after = max(1, math.ceil(self.estimated_wait_seconds() or self._service_seconds or 1))
+        logger.warning("Admission control shed a %s request (%d): %s", self.name, status_code, message)
+        return AdmissionRejectedError(message, status_code, retry_after)
+
+    @asynccontextmanager
+    async def admit(self):
+        """
+        Holds a slot for the duration of the block.
+
+        Raises:
+            AdmissionRejectedError: If the request is shed instead of admitted.
+        """
+        if self._semaphore.locked():
+            if self._waiting >= self.max_queue:
+                raise self._reject("The server is at capacity. Please retry later.", 429)
+            if self.estimated_wait_seconds() > self.max_wait_seconds:
+                raise self._reject("The expected wait exceeds the request deadline. Please retry later.", 503)
+
+        self._waiting += 1
+        self._queue_depth.inc()
+        enqueued_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            raise self._reject("Timed out waiting for capacity. Please retry later.", 503)
+        finally:
+            self._waiting -= 1
+            self._queue_depth.dec()
+        self._queue_wait.observe((time.perf_counter() - enqueued_at) * 1000)
+
+        self._in_flight.inc()
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started_at
+            self._service_time.observe(elapsed * 1000)
+            self._service_seconds = elapsed if self._service_seconds is None else (
+                self.smoothing * elapsed + (1 - self.smoothing) * self._service_seconds
+            )
+            self._in_flight.dec()
+            self._semaphore.release()
+
+
+# Per-endpoint defaults: (max concurrency, max queue, max wait in seconds).
+# Each can be overridden with ADMISSION_<NAME>_MAX_CONCURRENCY / _MAX_QUEUE / _MAX_WAIT.
+_DEFAULTS = {
+    "analyze": (8, 16, 20.0),
+    "optimize": (4, 8, 60.0),
+    "jobs": (4, 8, 30.0),
+}
+
+_controllers: Dict[str, AdmissionController] = {}
+
+
+def get_admission_controller(name: str) -> AdmissionController:
+    """
+    The admission controller of an endpoint, configured by ADMISSION_<NAME>_MAX_CONCURRENCY,
+    _MAX_QUEUE and _MAX_WAIT. Its asyncio primitives bind to the running loop, so it must
+    first be requested from inside that loop.
+    """
+    controller = _controllers.get(name)
+    if controller is None:
+        concurrency, queue, wait = _DEFAULTS.get(name, (4, 8, 30.0))
+        prefix = f"ADMISSION_{name.upper()}"
+        controller = _controllers[name] = AdmissionController(
+            name,
+            max_concurrency=int(os.getenv(f"{prefix}_MAX_CONCURRENCY", concurrency)),
+            max_queue=int(os.getenv(f"{prefix}_MAX_QUEUE", queue)),
+            max_wait_seconds=float(os.getenv(f"{prefix}_MAX_WAIT", wait)),
+        )
+    return controller
@@ -0,0 +1,134 @@
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from backend.core.tools.memory_cache import TTLCache
+from backend.core.tools.text_similarity import tokenize, shingles, minhash_signature, estimate_jaccard
+
+# Categories of the holistic evaluation whose score can change when a section
+# changes. Categories that judge the resume as a whole (relevance, language)
+# depend on every content section.
+SECTION_CATEGORIES: Dict[str, Set[str]] = {
+    "summary": {"summary", "language", "relevance"},
+    "experience": {"experience", "language", "relevance"},
+    "skills": {"skills", "ats", "relevance"},
+    "education": {"relevance"},
+}
+
+# Re-evaluated when the layout changes: sections added or removed, a different
+# page count, or edits outside the recognised sections (e.g. contact details).
+LAYOUT_CATEGORIES: Set[str] = {"structure", "ats"}
+
+
+@dataclass
+class AnalysisSnapshot:
+    """What a session's previous analysis is needed for when the next revision arrives."""
+    job_role: str
+    resume_text: str
+    sections: Dict[str, str]
+    page_count: int
+    persona_json: str
+    evaluation: Dict[str, dict]
+    signature: Tuple[int, ...]
+
+
+def resume_signature(resume_text: str) -> Tuple[int, ...]:
+    return minhash_signature(shingles(tokenize(resume_text), 3))
+
+
+def _normalized(text: str) -> str:
+    return " ".join(text.split())
+
+
+def changed_sections(previous: Dict[str, str], current: Dict[str, str]) -> Set[str]:
+    """Sections whose text differs (ignoring whitespace), including added and removed ones."""
+    return {
+        name for name in previous.keys() | current.keys()
+        if _normalized(previous.get(name, "")) != _normalized(current.get(name, ""))
+    }
+
+
+def revision_categories(previous: AnalysisSnapshot, job_role: str, resume_text: str,
+                        sections: Dict[str, str], page_count: int,
+                        min_similarity: Optional[float] = None) -> Optional[List[str]]:
+    """
+    Decides which categories a revised resume needs re-evaluated.
+
+    Args:
+        previous: The session's last analysis.
+        job_role, resume_text, sections, page_count: The new upload.
+        min_similarity: Estimated Jaccard similarity below which the upload is
+            treated as a different resume. Defaults to
+            ANALYSIS_REVISION_MIN_SIMILARITY, or 0.5.
+
+    Returns:
+        The categories to re-evaluate (empty if nothing relevant changed), or
+        None if the upload is not a revision of the previous one and needs a
+        full analysis.
+    """
+    if min_similarity is None:
+        min_similarity = float(os.getenv("ANALYSIS_REVISION_MIN_SIMILARITY", 0.5))
+    if job_role.strip().casefold() != previous.job_role.strip().casefold():
+        return None
+    # Without recognised sections there is nothing to diff.
+    if "full_text" in sections or "full_text" in previous.sections:
+        return None
+    if _normalized(resume_text) == _normalized(previous.resume_text):
+        return []
+    if estimate_jaccard(resume_signature(resume_text), previous.signature) < min_similarity:
+        return None
+
+    changed = changed_sections(previous.sections, sections)
+    categories: Set[str] = set()
+    for name in changed:
+        categories |= SECTION_CATEGORIES.get(name, set())
+    if changed & (previous.sections.keys() ^ sections.keys()) or page_count != previous.page_count or not changed:
+        # Sections appeared or vanished, the length changed, or the edit was
+        # outside every recognised section.
+        categories |= LAYOUT_CATEGORIES
+    return sorted(categories)
+
+
+class AnalysisSessionStore:
+    """
+    The latest analysis of each session, so a revised upload can be re-scored incrementally.
+
+    Kept in process memory with a TTL and LRU bound (see `TTLCache`). A miss,
+    e.g. because the revision landed on another worker or the entry expired,
+    only means the revision gets a full analysis.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        """
+        Args:
+            max_entries: Defaults to ANALYSIS_SESSION_MAX_ENTRIES, or 1024.
+            ttl_seconds: Defaults to ANALYSIS_SESSION_TTL, or 1 hour.
+        """
+        self._cache = TTLCache(
+            max_entries=max_entries or int(os.getenv("ANALYSIS_SESSION_MAX_ENTRIES", 1024)),
+            default_ttl_seconds=ttl_seconds or float(os.getenv("ANALYSIS_SESSION_TTL", 3600)),
+        )
+
+    def get(self, session_id: str) -> Optional[AnalysisSnapshot]:
+        return self._cache.get(session_id)
+
+    def put(self, session_id: str, snapshot: AnalysisSnapshot) -> None:
+        self._cache.put(session_id, snapshot)
+
+
+_session_store: Optional[AnalysisSessionStore] = None
+_session_store_lock = threading.Lock()
+
+
+def get_analysis_session_store() -> AnalysisSessionStore:
+    """
+    The worker's session store. Sessions live in memory (ANALYSIS_SESSION_MAX_ENTRIES,
+    ANALYSIS_SESSION_TTL), so a revision is only incremental on the worker that
+    saw the previous upload.
+    """
+    global _session_store
+    with _session_store_lock:
+        if _session_store is None:
+            _session_store = AnalysisSessionStore()
+        return _session_store
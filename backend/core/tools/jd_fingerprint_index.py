@@ -0,0 +1,207 @@
+import os
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+from backend.core.data_models import ContextOutput
+from backend.core.tools.metrics import metrics
+from backend.core.tools.text_similarity import tokenize, shingles, minhash_signature, estimate_jaccard
+
+_URL_PATTERN = re.compile(r"https?://\S+|www\.\S+")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+# Sentences that only carry legal boilerplate (equal-opportunity statements,
+# accommodation notices, agency disclaimers). Postings for the same job often
+# differ only in whether these are included.
+_BOILERPLATE_PATTERN = re.compile(
+    r"equal (employment )?opportunity|without regard to|race, colou?r|sexual orientation|gender identity"
+    r"|veteran status|reasonable accommodation|e-verify|recruitment agenc|unsolicited resumes",
+    re.IGNORECASE,
+)
+
+
+def normalize_job_description(text: str) -> List[str]:
+    """
+    Reduces a job description to its meaningful lines.
+
+    URLs (and with them tracking parameters) are removed, legal boilerplate
+    sentences are dropped, and the text is split into sentence-sized lines so
+    reordered bullets produce the same set of lines.
+    """
+    text = _URL_PATTERN.sub(" ", text)
+    lines = []
+    for sentence in _SENTENCE_SPLIT.split(text):
+        sentence = sentence.strip(" \t-*•·")
+        if sentence and not _BOILERPLATE_PATTERN.search(sentence):
+            lines.append(sentence)
+    return lines
+
+
+def _company_key(company: str) -> str:
+    return " ".join(company.casefold().split())
+
+
+class _Entry:
+    __slots__ = ("signature", "digest", "context_json", "expires_at")
+
+    def __init__(self, signature: Tuple[int, ...], digest: str, context_json: str, expires_at: float):
+        self.signature = signature
+        self.digest = digest
+        self.context_json = context_json
+        self.expires_at = expires_at
+
+
+class _CompanyIndex:
+    """The fingerprints of one company's job descriptions. Guarded by the index lock."""
+
+    def __init__(self):
+        self.entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self.buckets: Dict[Tuple[int, Tuple[int, ...]], Set[int]] = {}
+        self.by_digest: Dict[str, int] = {}
+
+
+class JDFingerprintIndex:
+    """
+    Finds previously analysed job descriptions that are near-duplicates of a new one.
+
+    Each description is normalised (see `normalize_job_description`), shingled
+    per line and fingerprinted with MinHash. Fingerprints are bucketed with
+    locality-sensitive hashing (the signature is cut into bands; two
+    descriptions sharing any band become candidates), so a lookup only
+    compares against likely matches instead of every stored posting.
+    Candidates whose estimated Jaccard similarity reaches `threshold` are
+    treated as the same posting and their extracted `ContextOutput` is reused.
+
+    Entries are kept per company (a posting is only matched against the same
+    company's postings), bounded per company with LRU eviction, and expire
+    after a TTL so a company's evolving postings are re-extracted eventually.
+    """
+
+    def __init__(self, threshold: Optional[float] = None, bands: int = 16, shingle_size: int = 3,
+                 max_entries_per_company: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        """
+        Args:
+            threshold: Estimated Jaccard similarity at or above which two
+                descriptions count as the same posting. Defaults to
+                JD_DEDUP_THRESHOLD, or 0.85.
+            bands: LSH bands; the 64-value MinHash signature is split into
+                this many equal bands.
+            shingle_size: Word n-gram size used within each line.
+            max_entries_per_company: Defaults to JD_DEDUP_MAX_PER_COMPANY, or 256.
+            ttl_seconds: Defaults to JD_DEDUP_TTL, or 24 hours.
+        """
+        self.threshold = threshold if threshold is not None else float(os.getenv("JD_DEDUP_THRESHOLD", 0.85))
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.max_entries_per_company = max_entries_per_company or int(os.getenv("JD_DEDUP_MAX_PER_COMPANY", 256))
+        self.ttl_seconds = ttl_seconds or float(os.getenv("JD_DEDUP_TTL", 24 * 3600))
+        self._companies: Dict[str, _CompanyIndex] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+        self._hits = metrics.counter("jd_index.hits", "Context extractions reused from a near-duplicate job description.")
+        self._misses = metrics.counter("jd_index.misses", "Job descriptions with no near-duplicate on record.")
+        self._similarity = metrics.histogram("jd_index.match_similarity", "Estimated similarity of reused matches.")
+
+    def fingerprint(self, job_description: str) -> Tuple[Tuple[int, ...], str]:
+        """Returns the MinHash signature and an exact digest of the normalised description."""
+        lines = normalize_job_description(job_description)
+        items: Set[str] = set()
+        for line in lines:
+            items |= shingles(tokenize(line), self.shingle_size)
+        digest = hashlib.sha256("\n".join(sorted(" ".join(tokenize(line)) for line in lines)).encode("utf-8")).hexdigest()
+        return minhash_signature(items), digest
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+        rows = max(1, len(signature) // self.bands)
+        return [(band, signature[band * rows:(band + 1) * rows]) for band in range(self.bands)]
+
+    def _remove(self, company: _CompanyIndex, entry_id: int) -> None:
+        entry = company.entries.pop(entry_id)
+        for band_key in self._band_keys(entry.signature):
+            bucket = company.buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del company.buckets[band_key]
+        if company.by_digest.get(entry.digest) == entry_id:
+            del company.by_digest[entry.digest]
+
+    def lookup(self, company: str, job_description: str) -> Optional[Tuple[ContextOutput, float]]:
+        """
+        Returns the stored context of the most similar earlier posting by `company`.
+
+        Returns:
+            The reusable `ContextOutput` and its estimated similarity, or None
+            if no stored posting reaches the threshold.
+        """
+        signature, digest = self.fingerprint(job_description)
+        now = time.monotonic()
+        best_id, best_similarity = None, 0.0
+        with self._lock:
+            index = self._companies.get(_company_key(company))
+            if index is not None:
+                exact_id = index.by_digest.get(digest)
+                if exact_id is not None:
+                    best_id, best_similarity = exact_id, 1.0
+                else:
+                    candidates = set()
+                    for band_key in self._band_keys(signature):
+                        candidates |= index.buckets.get(band_key, set())
+                    for entry_id in candidates:
+                        similarity = estimate_jaccard(signature, index.entries[entry_id].signature)
+                        if similarity >= self.threshold and similarity > best_similarity:
+                            best_id, best_similarity = entry_id, similarity
+                if best_id is not None and index.entries[best_id].expires_at <= now:
+                    self._remove(index, best_id)
+                    best_id = None
+                if best_id is not None:
+                    index.entries.move_to_end(best_id)
+                    context_json = index.entries[best_id].context_json
+
+        if best_id is None:
+            self._misses.inc()
+            return None
+        self._hits.inc()
+        self._similarity.observe(best_similarity)
+        return ContextOutput.model_validate_json(context_json), best_similarity
+
+    def add(self, company: str, job_description: str, context: ContextOutput) -> None:
+        """Records the context extracted for a posting so later near-duplicates can reuse it."""
+        signature, digest = self.fingerprint(job_description)
+        with self._lock:
+            self._next_id += 1
+            entry_id = self._next_id
+            index = self._companies.setdefault(_company_key(company), _CompanyIndex())
+            if digest in index.by_digest:
+                self._remove(index, index.by_digest[digest])
+            index.entries[entry_id] = _Entry(signature, digest, context.model_dump_json(), time.monotonic() + self.ttl_seconds)
+            index.by_digest[digest] = entry_id
+            for band_key in self._band_keys(signature):
+                index.buckets.setdefault(band_key, set()).add(entry_id)
+
+            now = time.monotonic()
+            for expired_id in [i for i, e in index.entries.items() if e.expires_at <= now]:
+                self._remove(index, expired_id)
+            while len(index.entries) > self.max_entries_per_company:
+                self._remove(index, next(iter(index.entries)))
+
+
+_jd_index: Optional[JDFingerprintIndex] = None
+_jd_index_lock = threading.Lock()
+
+
+def jd_dedup_enabled() -> bool:
+    """Near-duplicate reuse can be switched off with JD_DEDUP_ENABLED=0."""
+    return os.getenv("JD_DEDUP_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+
+
+def get_jd_index() -> JDFingerprintIndex:
+    """The near-duplicate index consulted by the context extractor (see JD_DEDUP_THRESHOLD and JD_DEDUP_TTL)."""
+    global _jd_index
+    with _jd_index_lock:
+        if _jd_index is None:
+            _jd_index = JDFingerprintIndex()
+        return _jd_index
@@ -0,0 +1,314 @@
+import logging
+import os
+import json
+import math
+import time
+import fcntl
+import hashlib
+import tempfile
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from typing import Dict, List, Optional, Sequence, Set
+
+from backend.core.data_models import ContextOutput
+from backend.core.tools.metrics import metrics
+from backend.core.tools.text_similarity import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Relative weight of a term occurrence in each field of a job. A skill the JD
+# lists explicitly says more about fit than a word in the marketing prose.
+FIELD_WEIGHTS = {"skills": 3.0, "responsibilities": 1.5, "text": 1.0}
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on", "or",
+    "our", "that", "the", "this", "to", "we", "will", "with", "you", "your", "who", "have", "has", "can",
+    "work", "team", "role", "experience", "ability", "strong", "years", "including", "across", "using",
+}
+
+
+def index_terms(text: str) -> List[str]:
+    """Word tokens and adjacent-word bigrams, without stopwords, so "machine learning" matches as a phrase too."""
+    tokens = [token for token in tokenize(text) if token not in _STOPWORDS]
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def job_id_for(company: str, role: str, job_description: str) -> str:
+    """A stable id for a posting, so saving the same job twice indexes it once."""
+    digest = hashlib.sha256()
+    for part in (company.casefold().strip(), role.casefold().strip(), " ".join(job_description.split())):
+        digest.update(part.encode("utf-8") + b"\0")
+    return digest.hexdigest()[:16]
+
+
+class JobMatchIndex:
+    """
+    A local inverted index of saved job descriptions for ranking them against a resume.
+
+    Each job contributes the skills and responsibilities of its extracted
+    `ContextOutput` and the raw description text. Term frequencies are
+    weighted per field (`FIELD_WEIGHTS`) and scored with BM25, so ranking a
+    resume against thousands of jobs is a few dictionary lookups per resume
+    term and no LLM call. Only the top matches need the expensive pipelines.
+
+    Jobs are appended to a JSON-lines file. Every worker replays the file on
+    first use and picks up lines written by other workers before each query.
+    The index keeps at most `max_jobs` jobs: once the file holds a quarter
+    more than that, it is compacted to the most recently saved `max_jobs`
+    and every worker rebuilds from the compacted file.
+    """
+
+    def __init__(self, path: str, k1: float = 1.2, b: float = 0.75, max_jobs: Optional[int] = None):
+        """
+        Args:
+            path: The JSON-lines file backing the index.
+            k1, b: Standard BM25 term-saturation and length-normalisation parameters.
+            max_jobs: Jobs kept after a compaction (JOB_INDEX_MAX_JOBS, default 1000).
+        """
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.max_jobs = max_jobs or int(os.getenv("JOB_INDEX_MAX_JOBS", 1000))
+        self._lines = 0
+        self._inode: Optional[int] = None
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._lengths: Dict[str, float] = {}
+        self._total_length = 0.0
+        self._norms: Dict[str, float] = {}
+        self._norms_size = 0
+        self._skills: Dict[str, Set[str]] = {}
+        self._jobs: Dict[str, dict] = {}
+        self._offset = 0
+        self._lock = threading.Lock()
+
+        self._query_ms = metrics.histogram("job_index.query_ms", "Time to rank saved jobs against a resume.")
+        self._size = metrics.gauge("job_index.jobs", "Jobs in the local match indexes this worker holds.")
+        self._compactions = metrics.counter("job_index.compactions", "Job index files compacted to max_jobs.")
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def release(self) -> None:
+        """Stops counting this index's jobs in the `job_index.jobs` gauge once it is dropped from memory."""
+        with self._lock:
+            self._size.dec(len(self._jobs))
+
+    def _reset(self) -> None:
+        """Drops everything indexed so far, so the file is replayed from the start. Call with the lock held."""
+        self._size.dec(len(self._jobs))
+        self._postings = defaultdict(dict)
+        self._lengths = {}
+        self._total_length = 0.0
+        self._norms = {}
+        self._norms_size = 0
+        self._skills = {}
+        self._jobs = {}
+        self._offset = 0
+        self._lines = 0
+
+    def _index(self, record: dict) -> None:
+        job_id = record["job_id"]
+        if job_id in self._jobs:
+            return
+        context = ContextOutput.model_validate(record["context"])
+        fields = {
+            "skills": " . ".join(context.skills),
+            "responsibilities": " . ".join(context.responsibilities),
+            "text": record["job_description"],
+        }
+        weighted: Counter = Counter()
+        for field, text in fields.items():
+            for term in index_terms(text):
+                weighted[term] += FIELD_WEIGHTS[field]
+        for term, weight in weighted.items():
+            self._postings[term][job_id] = weight
+        self._lengths[job_id] = sum(weighted.values())
+        self._total_length += self._lengths[job_id]
+        self._skills[job_id] = {skill.casefold() for skill in context.skills}
+        self._jobs[job_id] = {
+            "job_id": job_id,
+            "company_name": record["company_name"],
+            "job_role": record["job_role"],
+            "skills": context.skills,
+        }
+        self._size.inc()
+
+    def _length_norms(self) -> Dict[str, float]:
+        """BM25 length normalisation per job; recomputed only after jobs were added. Call with the lock held."""
+        if self._norms_size != len(self._jobs):
+            avg_length = self._total_length / len(self._jobs) or 1.0
+            self._norms = {
+                job_id: self.k1 * (1 - self.b + self.b * length / avg_length)
+                for job_id, length in self._lengths.items()
+            }
+            self._norms_size = len(self._jobs)
+        return self._norms
+
+    def refresh(self) -> None:
+        """
+        Indexes jobs appended to the file since the last read (by this or
+        another worker), or replays the whole file if it was compacted.
+        """
+        with self._lock:
+            try:
+                f = open(self.path, "r", encoding="utf-8")
+            except FileNotFoundError:
+                return
+            with f:
+                stat = os.fstat(f.fileno())
+                if stat.st_ino != self._inode:
+                    self._reset()
+                    self._inode = stat.st_ino
+                if stat.st_size <= self._offset:
+                    return
+                f.seek(self._offset)
+                for line in f:
+                    if not line.endswith("\n"):
+                        break  # Another worker is still writing this line.
+                    self._offset += len(line.encode("utf-8"))
+                    self._lines += 1
+                    try:
+                        self._index(json.loads(line))
+                    except (ValueError, KeyError) as e:
+                        logger.warning("Skipping a corrupt job index record: %s", e)
+
+    def add(self, company_name: str, job_role: str, job_description: str, context: ContextOutput) -> str:
+        """
+        Saves a job and its extracted context.
+
+        Returns:
+            The job's id (see `job_id_for`).
+        """
+        job_id = job_id_for(company_name, job_role, job_description)
+        self.refresh()
+        with self._lock:
+            if job_id in self._jobs:
+                return job_id
+        record = {
+            "job_id": job_id,
+            "company_name": company_name,
+            "job_role": job_role,
+            "job_description": job_description,
+            "context": context.model_dump(),
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # Appends and compactions serialise on a side lock file: a compaction
+        # replaces the index file, and an append must not land in the old one.
+        with open(self.path + ".lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+                self.refresh()
+                if self._lines > self.max_jobs + self.max_jobs // 4:
+                    self._compact()
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        self.refresh()
+        return job_id
+
+    def _compact(self) -> None:
+        """Rewrites the file with the newest `max_jobs` jobs. Call with the side lock file held."""
+        with open(self.path, "r", encoding="utf-8") as f:
+            lines = [line for line in f if line.endswith("\n")]
+        kept: Dict[str, str] = {}
+        for line in reversed(lines):
+            try:
+                job_id = json.loads(line)["job_id"]
+            except (ValueError, KeyError):
+                continue
+            kept.setdefault(job_id, line)
+            if len(kept) == self.max_jobs:
+                break
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.writelines(reversed(list(kept.values())))
+        os.replace(temp_path, self.path)
+        self._compactions.inc()
+        logger.info("Compacted job index %s from %d to %d jobs", self.path, len(lines), len(kept))
+
+    def match(self, resume_text: str, top_k: int = 5, job_ids: Optional[Sequence[str]] = None) -> List[dict]:
+        """
+        Ranks saved jobs by how well the resume covers their terms.
+
+        Args:
+            resume_text: The resume's extracted text.
+            top_k: Number of matches to return.
+            job_ids: Restrict the ranking to these jobs (e.g. a user's saved list).
+
+        Returns:
+            The best matches first, each with its BM25 score and the job's
+            skills that appear in the resume.
+        """
+        self.refresh()
+        started = time.perf_counter()
+        query_terms = set(index_terms(resume_text))
+        allowed = set(job_ids) if job_ids is not None else None
+        with self._lock:
+            n_jobs = len(self._jobs)
+            if not n_jobs:
+                return []
+            norms = self._length_norms()
+            k1_plus_1 = self.k1 + 1
+            scores: Dict[str, float] = defaultdict(float)
+            for term in query_terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_jobs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for job_id, tf in postings.items():
+                    if allowed is None or job_id in allowed:
+                        scores[job_id] += idf * tf * k1_plus_1 / (tf + norms[job_id])
+
+            ranked = sorted(scores.items(), key=lambda item: -item[1])[:top_k]
+            resume_tokens = f" {' '.join(tokenize(resume_text))} "
+            results = [
+                {
+                    **self._jobs[job_id],
+                    "score": round(score, 4),
+                    "matched_skills": sorted(
+                        skill for skill in self._skills[job_id] if f" {' '.join(tokenize(skill))} " in resume_tokens
+                    ),
+                }
+                for job_id, score in ranked
+            ]
+        self._query_ms.observe((time.perf_counter() - started) * 1000)
+        return results
+
+
+_MAX_TENANTS = int(os.getenv("JOB_INDEX_MAX_TENANTS", 256))
+_job_indexes: "OrderedDict[str, JobMatchIndex]" = OrderedDict()
+_job_index_lock = threading.Lock()
+
+
+def job_index_path(tenant: str) -> str:
+    """The file holding one tenant's saved jobs, under JOB_INDEX_DIR (default `rcraft_jobs` in the temp directory)."""
+    directory = os.getenv("JOB_INDEX_DIR", os.path.join(tempfile.gettempdir(), "rcraft_jobs"))
+    return os.path.join(directory, hashlib.sha256(tenant.encode("utf-8")).hexdigest()[:32] + ".jsonl")
+
+
+def get_job_index(tenant: str) -> JobMatchIndex:
+    """
+    The saved-jobs index of one tenant (see `tenant_for`); one tenant never
+    sees another's jobs. The indexes of the JOB_INDEX_MAX_TENANTS most
+    recently used tenants stay in memory.
+
+    The first call for a tenant replays its file, so call this from a worker
+    thread, not the event loop.
+    """
+    with _job_index_lock:
+        index = _job_indexes.get(tenant)
+        if index is not None:
+            _job_indexes.move_to_end(tenant)
+            return index
+    loaded = JobMatchIndex(job_index_path(tenant))
+    loaded.refresh()
+    with _job_index_lock:
+        index = _job_indexes.setdefault(tenant, loaded)
+        _job_indexes.move_to_end(tenant)
+        evicted = [] if index is loaded else [loaded]  # Another thread loaded it first.
+        while len(_job_indexes) > _MAX_TENANTS:
+            evicted.append(_job_indexes.popitem(last=False)[1])
+    for stale in evicted:
+        stale.release()
+    return index
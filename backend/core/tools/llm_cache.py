@@ -0,0 +1,140 @@
+import os
+import json
+import hashlib
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from backend.core.tools.memory_cache import TTLCache
+from backend.core.tools.metrics import metrics
+
+
+def cache_key(model: Optional[str], temperature: Optional[float], prompt: str,
+              output_schema: Optional[Type[BaseModel]] = None) -> str:
+    """
+    Identifies one LLM request by everything that determines its response.
+
+    The schema contributes its full JSON schema, not just its name, so a
+    changed field or description invalidates cached answers.
+    """
+    digest = hashlib.sha256()
+    schema = json.dumps(output_schema.model_json_schema(), sort_keys=True) if output_schema else ""
+    for part in (str(model), repr(temperature), schema, prompt):
+        data = part.encode("utf-8")
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def _disabled_agents() -> set:
+    return {name.strip() for name in os.getenv("LLM_CACHE_DISABLED_AGENTS", "").split(",") if name.strip()}
+
+
+class LLMResponseCache:
+    """
+    An in-process cache of LLM responses for deterministic calls.
+
+    Entries are keyed by `cache_key` and bounded by count, total size and a
+    TTL (LRU eviction, see `TTLCache`). Structured results are stored as JSON
+    and re-validated on every hit, so callers never share a mutable instance.
+
+    Concurrent identical calls are collapsed: the first computes while the
+    others wait for it and then read its entry, so an identical prompt reaches
+    the provider once. Failed calls are not cached.
+
+    Hits, misses, the hit rate and the tokens a hit avoided spending are
+    recorded under `llm.cache.*` in the metrics registry.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 ttl_seconds: Optional[float] = None):
+        """
+        Args:
+            max_entries: Defaults to LLM_CACHE_MAX_ENTRIES, or 2048.
+            max_bytes: Defaults to LLM_CACHE_MAX_BYTES, or 32 MiB.
+            ttl_seconds: Defaults to LLM_CACHE_TTL, or 1 hour.
+        """
+        self._cache = TTLCache(
+            max_entries=max_entries or int(os.getenv("LLM_CACHE_MAX_ENTRIES", 2048)),
+            max_bytes=max_bytes or int(os.getenv("LLM_CACHE_MAX_BYTES", 32 * 1024 * 1024)),
+            default_ttl_seconds=ttl_seconds or float(os.getenv("LLM_CACHE_TTL", 3600)),
+        )
+        # Per-key lock and the number of callers holding or waiting for it.
+        self._key_locks: Dict[str, List] = {}
+        self._lock = threading.Lock()
+
+        self._hits = metrics.counter("llm.cache.hits", "LLM calls answered from the response cache.")
+        self._misses = metrics.counter("llm.cache.misses", "Cacheable LLM calls that went to the provider.")
+        self._hit_rate = metrics.gauge("llm.cache.hit_rate", "Share of cacheable LLM calls answered from the cache.")
+        self._tokens_saved = metrics.counter("llm.cache.tokens_saved", "Provider tokens not spent thanks to cache hits.")
+
+    def enabled_for(self, agent: str) -> bool:
+        """False if caching is switched off globally (LLM_CACHE_ENABLED=0) or for this agent (LLM_CACHE_DISABLED_AGENTS)."""
+        if os.getenv("LLM_CACHE_ENABLED", "1").strip().lower() in ("0", "false", "no"):
+            return False
+        return agent not in _disabled_agents()
+
+    def _lookup(self, key: str, output_schema: Optional[Type[BaseModel]]) -> Tuple[bool, Any]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return False, None
+        payload, total_tokens = entry
+        self._tokens_saved.inc(total_tokens or 0)
+        return True, output_schema.model_validate_json(payload) if output_schema else payload
+
+    def _record(self, hit: bool) -> None:
+        (self._hits if hit else self._misses).inc()
+        total = self._hits.value + self._misses.value
+        self._hit_rate.set(self._hits.value / total if total else 0.0)
+
+    def get_or_call(self, key: str, call: Callable[[], Tuple[Any, Optional[int]]],
+                    output_schema: Optional[Type[BaseModel]] = None) -> Tuple[Any, bool]:
+        """
+        Returns the cached response for `key`, or makes the call and caches its result.
+
+        Args:
+            key: From `cache_key`.
+            call: Performs the provider call; returns the result (a string, or an
+                `output_schema` instance) and the total tokens it used.
+            output_schema: The structured output type, if any.
+
+        Returns:
+            The result and whether it came from the cache.
+        """
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+            key_lock = entry[0]
+        try:
+            with key_lock:
+                hit, result = self._lookup(key, output_schema)
+                self._record(hit)
+                if hit:
+                    return result, True
+
+                result, total_tokens = call()
+                if result is not None:
+                    payload = result.model_dump_json() if isinstance(result, BaseModel) else result
+                    self._cache.put(key, (payload, total_tokens), size=len(payload))
+                return result, False
+        finally:
+            # Only the last caller holding or waiting for the key drops its lock;
+            # popping it earlier would let a newcomer make the same call under a fresh lock.
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._key_locks[key]
+
+
+_llm_cache: Optional[LLMResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """The response cache shared by every agent, sized by LLM_CACHE_MAX_ENTRIES and LLM_CACHE_MAX_BYTES."""
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = LLMResponseCache()
+        return _llm_cache
@@ -0,0 +1,201 @@
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from langchain_core.messages import BaseMessage
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from pydantic import BaseModel
+
+from backend.core.tools.llm_cache import cache_key, get_llm_cache
+from backend.core.tools.llm_hedging import get_request_hedger
+from backend.core.tools.llm_scheduler import current_call_context
+from backend.core.tools.tracing import tracer
+
+
+# The shared call path for every LLM request made by the agents. Keeping the
+# provider calls in one place means cross-cutting concerns (tracing and
+# scheduling) are applied uniformly instead of being re-implemented inside each
+# agent, and the provider can be swapped for a stand-in (`set_llm_provider`),
+# e.g. the offline fakes the load tests use.
+#
+# Deterministic calls are served from an exact-prompt response cache (see
+# `llm_cache`). Chat calls are cacheable when the model runs at temperature 0;
+# callers can force it either way with `cache=`, and individual agents can be
+# excluded with LLM_CACHE_DISABLED_AGENTS.
+#
+# Provider requests that take unusually long can be hedged with a duplicate
+# request (LLM_HEDGE_ENABLED, see `llm_hedging`).
+
+
+# A replacement for the Gemini SDK calls, or None to call Gemini.
+_provider: Optional[Any] = None
+
+
+def set_llm_provider(provider: Optional[Any]) -> None:
+    """
+    Sends every LLM call of this process to `provider` instead of Gemini.
+
+    The provider needs `invoke(prompt, output_schema) -> (result, usage)` and
+    `generate_content(prompt)`, like `backend.benchmarks.fake_providers.FakeLLM`.
+    Pass None to restore the real SDKs.
+    """
+    global _provider
+    _provider = provider
+
+
+def _record_usage(usage: Optional[Dict[str, Any]]) -> Optional[int]:
+    """
+    Copies LangChain-style `usage_metadata` onto the active span using OTel GenAI attribute names.
+
+    When the request is hedged, that is the attempt's own span; the hedger
+    copies the winner's usage onto the call's span.
+
+    Returns:
+        The total token count, if the provider reported one.
+    """
+    usage = usage or {}
+    span = tracer.current_span()
+    span.set_attribute("gen_ai.usage.input_tokens", usage.get("input_tokens"))
+    span.set_attribute("gen_ai.usage.output_tokens", usage.get("output_tokens"))
+    span.set_attribute("gen_ai.usage.total_tokens", usage.get("total_tokens"))
+    return usage.get("total_tokens")
+
+
+def _scheduling_attributes() -> Dict[str, Any]:
+    context = current_call_context()
+    return {"llm.priority": context.priority.name.lower(), "llm.tenant": context.tenant}
+
+
+def invoke_chat_model(
+    llm: Any,
+    prompt: ChatPromptTemplate,
+    inputs: Dict[str, Any],
+    output_schema: Optional[Type[BaseModel]] = None,
+    agent: str = "unknown",
+    cache: Optional[bool] = None,
+) -> Any:
+    """
+    Renders a chat prompt and sends it to a LangChain chat model.
+
+    Args:
+        llm: The LangChain chat model (e.g. ChatGoogleGenerativeAI).
+        prompt: The message-based prompt template.
+        inputs: The variables used to render the prompt.
+        output_schema: If given, the model is asked for structured output and the
+            parsed Pydantic instance is returned. Otherwise the text is returned.
+        agent: The calling agent's name, recorded on the trace span.
+        cache: Whether an identical earlier response may be reused. Defaults to
+            True for models at temperature 0 and False otherwise.
+
+    Cache misses wait for a slot from the LLM scheduler, which orders them by
+    the priority and tenant set with `llm_scheduler.scheduling`, and may be
+    hedged when they run long.
+
+    Returns:
+        The parsed `output_schema` instance, or the response text as a string.
+    """
+    messages = prompt.format_messages(**inputs)
+    model_name = getattr(llm, "model", None)
+    temperature = getattr(llm, "temperature", None)
+
+    attributes = {
+        "gen_ai.system": "gemini",
+        "gen_ai.request.model": model_name,
+        "gen_ai.request.temperature": temperature,
+        "llm.agent": agent,
+        "llm.output_schema": output_schema.__name__ if output_schema else None,
+        **_scheduling_attributes(),
+    }
+    with tracer.start_span("llm.invoke", attributes=attributes) as span:
+        def call():
+            return get_request_hedger().run(str(model_name), lambda: _invoke_provider(llm, messages, output_schema), span)
+
+        response_cache = get_llm_cache()
+        if not (cache if cache is not None else temperature == 0) or not response_cache.enabled_for(agent):
+            return call()[0]
+        rendered = "\n".join(f"{m.type}: {m.content}" for m in messages)
+        key = cache_key(model_name, temperature, rendered, output_schema)
+        result, hit = response_cache.get_or_call(key, call, output_schema)
+        span.set_attribute("llm.cache.hit", hit)
+        return result
+
+
+def _invoke_provider(llm: Any, messages: List[BaseMessage], output_schema: Optional[Type[BaseModel]]) -> Tuple[Any, Optional[int]]:
+    """
+    Sends rendered messages to the configured provider (Gemini, or a stand-in set with `set_llm_provider`).
+
+    Returns:
+        The result and the total tokens used.
+    """
+    if _provider is not None:
+        result, usage = _provider.invoke("\n".join(str(m.content) for m in messages), output_schema)
+        return result, _record_usage(usage)
+
+    if output_schema is None:
+        message = llm.invoke(messages)
+        total_tokens = _record_usage(getattr(message, "usage_metadata", None))
+        return StrOutputParser().invoke(message), total_tokens
+
+    # `include_raw` keeps the provider message so token usage can be recorded.
+    result = llm.with_structured_output(output_schema, include_raw=True).invoke(messages)
+    total_tokens = _record_usage(getattr(result.get("raw"), "usage_metadata", None))
+    if result.get("parsing_error") is not None:
+        raise result["parsing_error"]
+    return result.get("parsed"), total_tokens
+
+
+class CachedGenerateContentResponse:
+    """Stands in for a `generate_content` response served from the cache; no tokens were used."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.usage_metadata = None
+
+
+def generate_content(model: Any, prompt: str, generation_config: Any = None, agent: str = "unknown",
+                     cache: bool = False) -> Any:
+    """
+    Sends a prompt through a `google.generativeai.GenerativeModel`.
+
+    Returns the raw SDK response so callers keep access to `.text`. Like
+    `invoke_chat_model`, the call is gated by the LLM scheduler. With
+    `cache=True`, an identical earlier call (same model, generation config and
+    prompt) is answered from the response cache instead.
+    """
+    model_name = getattr(model, "model_name", None)
+    attributes = {
+        "gen_ai.system": "gemini",
+        "gen_ai.request.model": model_name,
+        "llm.agent": agent,
+        **_scheduling_attributes(),
+    }
+    with tracer.start_span("llm.generate_content", attributes=attributes) as span:
+        def request():
+            if _provider is not None:
+                response = _provider.generate_content(prompt)
+            else:
+                response = model.generate_content(prompt, generation_config=generation_config)
+            usage = getattr(response, "usage_metadata", None)
+            if usage is not None:
+                _record_usage({
+                    "input_tokens": getattr(usage, "prompt_token_count", None),
+                    "output_tokens": getattr(usage, "candidates_token_count", None),
+                    "total_tokens": getattr(usage, "total_token_count", None),
+                })
+            return response
+
+        def call():
+            # The SDK reports "models/<name>"; the scheduler's per-model caps use the bare name.
+            response = get_request_hedger().run(str(model_name).removeprefix("models/"), request, span)
+            return response, getattr(getattr(response, "usage_metadata", None), "total_token_count", None)
+
+        response_cache = get_llm_cache()
+        if not cache or not response_cache.enabled_for(agent):
+            return call()[0]
+        def call_text():
+            response, total_tokens = call()
+            return response.text, total_tokens
+
+        key = cache_key(f"{model_name} {generation_config!r}", getattr(generation_config, "temperature", None), prompt)
+        text, hit = response_cache.get_or_call(key, call_text)
+        span.set_attribute("llm.cache.hit", hit)
+        return CachedGenerateContentResponse(text)
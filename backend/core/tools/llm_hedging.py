@@ -0,0 +1,211 @@
+import os
+import time
+import logging
+import threading
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Optional, Tuple, TypeVar
+
+from backend.core.tools.llm_scheduler import get_llm_scheduler
+from backend.core.tools.metrics import metrics
+from backend.core.tools.tracing import Span, tracer
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def hedging_enabled() -> bool:
+    """Hedging is opt-in: LLM_HEDGE_ENABLED=1 switches it on."""
+    return os.getenv("LLM_HEDGE_ENABLED", "0").strip().lower() in ("1", "true", "yes")
+
+
+class RequestHedger:
+    """
+    Sends a duplicate of an LLM request that is slower than usual and keeps the first answer.
+
+    Every request runs in a worker thread while the caller waits. If it has
+    not finished after the `percentile` of its model's recent provider
+    latency, a second identical request is sent, provided the hedge budget
+    allows it and the scheduler has a free slot with nobody queued for it
+    (hedges never delay real calls). The first successful response wins; if
+    one attempt fails, the other is awaited instead.
+
+    The losing request is cancelled if it has not started; a provider call
+    already in progress cannot be interrupted from Python, so it runs to
+    completion in the background, keeps its scheduler slot until then and
+    its result is discarded.
+
+    Each attempt of a hedgeable request runs in its own `llm.attempt` span
+    (`primary` or `hedge`) under the call's span, so the request callable
+    should record provider details such as token usage on the active span;
+    only the winning attempt's usage is copied onto the call's span.
+
+    The budget is a token bucket: every request earns `budget` hedge credits,
+    up to `burst`, and a hedge spends one, so hedges can never exceed that
+    share of calls over time. Hedge rate, wins and skips are recorded under
+    `llm.hedge.*`.
+    """
+
+    def __init__(self, percentile: Optional[float] = None, budget: Optional[float] = None, burst: Optional[float] = None,
+                 min_samples: Optional[int] = None, min_delay_ms: Optional[float] = None, max_workers: Optional[int] = None):
+        """
+        Args:
+            percentile: Latency percentile after which a request is hedged.
+                Defaults to LLM_HEDGE_PERCENTILE, or 95.
+            budget: Hedges allowed per request, on average. Defaults to
+                LLM_HEDGE_BUDGET, or 0.05.
+            burst: Most hedge credits that can be saved up. Defaults to
+                LLM_HEDGE_BURST, or 5.
+            min_samples: Latencies a model needs on record before its requests
+                are hedged. Defaults to LLM_HEDGE_MIN_SAMPLES, or 20.
+            min_delay_ms: Lower bound of the hedge delay. Defaults to
+                LLM_HEDGE_MIN_DELAY_MS, or 250.
+            max_workers: Threads running hedged requests. Defaults to
+                LLM_HEDGE_MAX_WORKERS, or 64.
+        """
+        self.percentile = percentile if percentile is not None else float(os.getenv("LLM_HEDGE_PERCENTILE", 95))
+        self.budget = budget if budget is not None else float(os.getenv("LLM_HEDGE_BUDGET", 0.05))
+        self.burst = burst if burst is not None else float(os.getenv("LLM_HEDGE_BURST", 5))
+        self.min_samples = min_samples if min_samples is not None else int(os.getenv("LLM_HEDGE_MIN_SAMPLES", 20))
+        self.min_delay_ms = min_delay_ms if min_delay_ms is not None else float(os.getenv("LLM_HEDGE_MIN_DELAY_MS", 250))
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or int(os.getenv("LLM_HEDGE_MAX_WORKERS", 64)), thread_name_prefix="llm-hedge"
+        )
+        self._credits = self.burst
+        self._lock = threading.Lock()
+
+        self._requests = metrics.counter("llm.hedge.requests", "LLM requests eligible for hedging.")
+        self._issued = metrics.counter("llm.hedge.issued", "Duplicate LLM requests sent after the primary was slow.")
+        self._wins = metrics.counter("llm.hedge.wins", "Hedged requests whose duplicate answered first.")
+        self._no_budget = metrics.counter("llm.hedge.budget_exhausted", "Slow requests not hedged for lack of budget.")
+        self._no_slot = metrics.counter("llm.hedge.no_slot", "Slow requests not hedged because the model had no free slot.")
+        self._rate = metrics.gauge("llm.hedge.rate", "Share of eligible LLM requests that were hedged.")
+
+    @staticmethod
+    def _latency(model: str):
+        return metrics.histogram(f"llm.latency_ms.{model}", "Provider latency of one LLM request.")
+
+    def hedge_delay_ms(self, model: str) -> Optional[float]:
+        """How long a request to `model` may run before it is hedged, or None while too few latencies are known."""
+        latency = self._latency(model)
+        if latency.count < self.min_samples:
+            return None
+        return max(self.min_delay_ms, latency.percentile(self.percentile) or 0.0)
+
+    def _spend_credit(self) -> bool:
+        with self._lock:
+            if self._credits < 1:
+                return False
+            self._credits -= 1
+            return True
+
+    def _submit(self, model: str, request: Callable[[], T], name: str) -> Future:
+        """
+        Runs one attempt in a worker thread, in a copy of the caller's context
+        (call priority, active span, log ids) and inside its own `llm.attempt`
+        span. The model's scheduler slot, already taken for it, is released
+        when the attempt ends. The future resolves to the result and the span.
+        """
+        context = contextvars.copy_context()
+
+        def attempt() -> Tuple[T, Span]:
+            started = time.perf_counter()
+            try:
+                with tracer.start_span("llm.attempt", attributes={"llm.attempt": name}) as attempt_span:
+                    result = request()
+            finally:
+                get_llm_scheduler().release(model)
+            self._latency(model).observe((time.perf_counter() - started) * 1000)
+            return result, attempt_span
+
+        return self._executor.submit(context.run, attempt)
+
+    @staticmethod
+    def _outcome(future: Future, span) -> T:
+        """The attempt's result; its token usage is copied onto the call's span."""
+        result, attempt_span = future.result()
+        if span is not None:
+            span.set_attributes({key: value for key, value in attempt_span.attributes.items()
+                                 if key.startswith("gen_ai.usage.")})
+        return result
+
+    def run(self, model: str, request: Callable[[], T], span=None) -> T:
+        """
+        Sends `request` under a scheduler slot of `model`, hedging it if enabled and slow.
+
+        Args:
+            model: The scheduler's name for the model; latencies are tracked per model.
+            request: Makes one provider call. It may be called twice, concurrently.
+            span: The call's trace span, annotated with the scheduler wait,
+                whether the request was hedged and the winning attempt's usage.
+
+        Returns:
+            The result of the first attempt to succeed.
+
+        Raises:
+            The primary attempt's exception, if no attempt succeeded.
+        """
+        scheduler = get_llm_scheduler()
+        if not hedging_enabled():
+            with scheduler.slot(model) as waited_ms:
+                if span is not None:
+                    span.set_attribute("llm.scheduler.wait_ms", waited_ms)
+                return request()
+
+        waited_ms = scheduler.acquire(model)
+        if span is not None:
+            span.set_attribute("llm.scheduler.wait_ms", waited_ms)
+        with self._lock:
+            self._credits = min(self.burst, self._credits + self.budget)
+        self._requests.inc()
+        self._rate.set(self._issued.value / self._requests.value)
+
+        delay_ms = self.hedge_delay_ms(model)
+        primary = self._submit(model, request, "primary")
+        if delay_ms is None or wait([primary], timeout=delay_ms / 1000).done:
+            return self._outcome(primary, span)
+
+        if not self._spend_credit():
+            self._no_budget.inc()
+            return self._outcome(primary, span)
+        if not scheduler.try_acquire(model):
+            with self._lock:
+                self._credits += 1
+            self._no_slot.inc()
+            return self._outcome(primary, span)
+
+        hedge = self._submit(model, request, "hedge")
+        self._issued.inc()
+        self._rate.set(self._issued.value / self._requests.value)
+        if span is not None:
+            span.set_attributes({"llm.hedge.issued": True, "llm.hedge.delay_ms": round(delay_ms, 1)})
+        logger.debug("Hedged a %s request still running after %.0fms", model, delay_ms)
+
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        if loser.cancel():
+                            scheduler.release(model)  # It never ran, so it never freed its slot.
+                    if future is hedge:
+                        self._wins.inc()
+                    if span is not None:
+                        span.set_attribute("llm.hedge.winner", "hedge" if future is hedge else "primary")
+                    return self._outcome(future, span)
+        return self._outcome(primary, span)
+
+
+_hedger: Optional[RequestHedger] = None
+_hedger_lock = threading.Lock()
+
+
+def get_request_hedger() -> RequestHedger:
+    """The hedger shared by all LLM calls, so the hedge budget and per-model latencies are pooled."""
+    global _hedger
+    with _hedger_lock:
+        if _hedger is None:
+            _hedger = RequestHedger()
+        return _hedger
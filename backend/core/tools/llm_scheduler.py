@@ -0,0 +1,249 @@
+import os
+import heapq
+import itertools
+import threading
+import time
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Dict, List, Optional
+
+from backend.core.tools.metrics import metrics
+
+
+class Priority(IntEnum):
+    """Scheduling classes for LLM calls. Lower values are always served first."""
+    INTERACTIVE = 0  # A user is waiting on the response, e.g. /analyze.
+    BATCH = 1        # Long multi-step jobs, e.g. an optimizer run.
+    BACKGROUND = 2   # Work nobody is waiting on, e.g. warm-ups and pre-computation.
+
+
+@dataclass(frozen=True)
+class CallContext:
+    """Who an LLM call is made for, and how urgently."""
+    priority: Priority
+    tenant: str
+    weight: float
+
+
+_call_context: contextvars.ContextVar[CallContext] = contextvars.ContextVar(
+    "llm_call_context", default=CallContext(Priority.BATCH, "default", 1.0)
+)
+
+
+def _parse_mapping(value: Optional[str]) -> Dict[str, float]:
+    """Parses "a=2,b=0.5" style environment settings."""
+    mapping = {}
+    for item in (value or "").split(","):
+        name, _, number = item.partition("=")
+        if name.strip() and number.strip():
+            mapping[name.strip()] = float(number)
+    return mapping
+
+
+def tenant_weight(tenant: str) -> float:
+    """A tenant's fair-queuing weight from LLM_TENANT_WEIGHTS (e.g. "acme=2,free=0.5"); 1 by default."""
+    return _parse_mapping(os.getenv("LLM_TENANT_WEIGHTS")).get(tenant, 1.0)
+
+
+def tenant_for(request) -> str:
+    """
+    The fair-queuing tenant of an HTTP request: the X-Tenant-ID header when a
+    gateway sets it, otherwise the client address.
+    """
+    tenant = request.headers.get("X-Tenant-ID")
+    if tenant:
+        return tenant
+    return request.client.host if request.client else "anonymous"
+
+
+@contextmanager
+def scheduling(priority: Priority, tenant: str = "default"):
+    """
+    Tags every LLM call made inside the block (including in threads started from it
+    with a copied context, such as `run_in_threadpool`) with a priority and tenant.
+    """
+    token = _call_context.set(CallContext(priority, tenant, tenant_weight(tenant)))
+    try:
+        yield
+    finally:
+        _call_context.reset(token)
+
+
+def current_call_context() -> CallContext:
+    return _call_context.get()
+
+
+class _Waiter:
+    __slots__ = ("event", "context")
+
+    def __init__(self, context: CallContext):
+        self.event = threading.Event()
+        self.context = context
+
+
+class _ModelQueue:
+    """Per-model scheduling state. Guarded by the scheduler's lock."""
+
+    def __init__(self, max_concurrency: int, interactive_reserve: int):
+        self.max_concurrency = max_concurrency
+        # Slots only interactive calls may use, so a user-facing call never waits
+        # behind a full set of long batch calls (calls cannot be preempted).
+        self.interactive_reserve = min(interactive_reserve, max_concurrency - 1)
+        self.in_flight = 0
+        self.virtual_time = 0.0
+        self.tenant_finish: Dict[str, float] = {}
+        self.heap: List = []
+
+    def has_capacity_for(self, priority: Priority) -> bool:
+        limit = self.max_concurrency if priority == Priority.INTERACTIVE else self.max_concurrency - self.interactive_reserve
+        return self.in_flight < limit
+
+
+class LLMScheduler:
+    """
+    The single gate every outbound LLM call passes through.
+
+    Each model has its own concurrency cap. Waiting calls are ordered by
+    priority class first (interactive, then batch, then background), and
+    within a class by weighted fair queuing between tenants: every queued
+    call gets a virtual finish time of `max(now, tenant's last finish) +
+    1 / weight`, and the smallest is dispatched next. A tenant flooding the
+    queue therefore only delays its own calls, and a tenant with weight 2
+    gets twice the share of one with weight 1. Some slots of each model are
+    reserved for interactive calls so they stay fast while batch work soaks
+    up the rest.
+
+    Calls are blocking (agents run in worker threads), so waiting parks the
+    calling thread.
+    """
+
+    def __init__(self, default_concurrency: Optional[int] = None, model_concurrency: Optional[Dict[str, int]] = None,
+                 interactive_reserve: Optional[int] = None):
+        """
+        Args:
+            default_concurrency: Cap for models without an explicit one. Defaults
+                to LLM_MAX_CONCURRENCY, or 8.
+            model_concurrency: Per-model caps. Defaults to LLM_MODEL_CONCURRENCY,
+                e.g. "gemini-2.5-pro=4,gemini-2.5-flash=16".
+            interactive_reserve: Slots per model held back for interactive calls.
+                Defaults to LLM_INTERACTIVE_RESERVE, or 1.
+        """
+        self.default_concurrency = default_concurrency or int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+        self.model_concurrency = model_concurrency if model_concurrency is not None else {
+            model: int(cap) for model, cap in _parse_mapping(os.getenv("LLM_MODEL_CONCURRENCY")).items()
+        }
+        self.interactive_reserve = interactive_reserve if interactive_reserve is not None else int(os.getenv("LLM_INTERACTIVE_RESERVE", 1))
+        self._models: Dict[str, _ModelQueue] = {}
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+
+        self._queue_depth = metrics.gauge("llm.scheduler.queue_depth", "LLM calls waiting for a model slot.")
+        self._in_flight = metrics.gauge("llm.scheduler.in_flight", "LLM calls currently running.")
+        self._wait = {
+            priority: metrics.histogram(f"llm.scheduler.wait_ms.{priority.name.lower()}", "Time an LLM call waited for a slot.")
+            for priority in Priority
+        }
+
+    def _queue(self, model: str) -> _ModelQueue:
+        queue = self._models.get(model)
+        if queue is None:
+            cap = self.model_concurrency.get(model, self.default_concurrency)
+            queue = self._models[model] = _ModelQueue(cap, self.interactive_reserve)
+        return queue
+
+    def _dispatch(self, queue: _ModelQueue) -> None:
+        """
+        Wakes queued calls, best first, while the model has capacity for them.
+
+        A tenant whose last finish tag the virtual clock has reached would
+        start at the clock anyway, so its entry is dropped; only tenants with
+        calls still ahead of the clock are remembered.
+        """
+        dispatched = False
+        while queue.heap and queue.has_capacity_for(queue.heap[0][0]):
+            _, finish, _, waiter = heapq.heappop(queue.heap)
+            queue.virtual_time = max(queue.virtual_time, finish)
+            queue.in_flight += 1
+            self._queue_depth.dec()
+            self._in_flight.inc()
+            waiter.event.set()
+            dispatched = True
+        if dispatched:
+            queue.tenant_finish = {
+                tenant: finish for tenant, finish in queue.tenant_finish.items() if finish > queue.virtual_time
+            }
+
+    def acquire(self, model: str) -> float:
+        """
+        Blocks until the current call context may call `model`.
+
+        Returns:
+            The time spent waiting, in milliseconds.
+        """
+        context = current_call_context()
+        waiter = _Waiter(context)
+        started = time.perf_counter()
+        with self._lock:
+            queue = self._queue(model)
+            start = max(queue.virtual_time, queue.tenant_finish.get(context.tenant, 0.0))
+            finish = start + 1.0 / max(context.weight, 1e-6)
+            queue.tenant_finish[context.tenant] = finish
+            heapq.heappush(queue.heap, (context.priority, finish, next(self._sequence), waiter))
+            self._queue_depth.inc()
+            self._dispatch(queue)
+        waiter.event.wait()
+        waited_ms = (time.perf_counter() - started) * 1000
+        self._wait[context.priority].observe(waited_ms)
+        return waited_ms
+
+    def try_acquire(self, model: str) -> bool:
+        """
+        Takes a slot of `model` only if one is free and no call is queued for it.
+
+        For optional extra work, e.g. hedged requests, that should never
+        delay or compete with the calls already waiting. Release it with
+        `release` like any other slot.
+        """
+        context = current_call_context()
+        with self._lock:
+            queue = self._queue(model)
+            if queue.heap or not queue.has_capacity_for(context.priority):
+                return False
+            queue.in_flight += 1
+            self._in_flight.inc()
+            return True
+
+    def release(self, model: str) -> None:
+        """Frees the slot taken by `acquire` and hands it to the next queued call."""
+        with self._lock:
+            queue = self._queue(model)
+            queue.in_flight -= 1
+            self._in_flight.dec()
+            self._dispatch(queue)
+
+    @contextmanager
+    def slot(self, model: str):
+        """Holds a slot of `model` for the duration of the block; yields the wait in milliseconds."""
+        waited_ms = self.acquire(model)
+        try:
+            yield waited_ms
+        finally:
+            self.release(model)
+
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """
+    The scheduler every LLM call goes through; caps come from LLM_MAX_CONCURRENCY
+    and LLM_MODEL_CONCURRENCY when it is first used. Safe to call from any thread.
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler()
+        return _scheduler
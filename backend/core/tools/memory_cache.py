@@ -0,0 +1,107 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    A thread-safe, in-process LRU cache whose entries also expire after a TTL.
+
+    The cache is bounded both by entry count and, for values with a size
+    (bytes or str, or an explicit `size` passed to `put`), by total bytes.
+    When either bound is exceeded the least recently used entries are evicted.
+    Expired entries are dropped lazily when they are read or evicted.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: Optional[int] = None,
+                 default_ttl_seconds: Optional[float] = None):
+        """
+        Args:
+            max_entries: Maximum number of live entries.
+            max_bytes: Optional upper bound for the summed size of all values.
+            default_ttl_seconds: TTL applied when `put` is called without one.
+                None means entries only leave the cache through LRU eviction.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl_seconds = default_ttl_seconds
+        # key -> (value, size, expires_at monotonic timestamp or None)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, Optional[float]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _sizeof(value: Any) -> int:
+        return len(value) if isinstance(value, (bytes, bytearray, str)) else 0
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the live value for `key` and marks it as recently used, or `default`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, _, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def ttl_remaining(self, key: Hashable) -> Optional[float]:
+        """Seconds until `key` expires; 0 if it is missing or expired, None if it never expires."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return 0.0
+            expires_at = entry[2]
+            if expires_at is None:
+                return None
+            return max(0.0, expires_at - time.monotonic())
+
+    def put(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None, size: Optional[int] = None) -> None:
+        """Stores `value` under `key`, then evicts least recently used entries until the cache fits."""
+        ttl = ttl_seconds if ttl_seconds is not None else self.default_ttl_seconds
+        size = self._sizeof(value) if size is None else size
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+            self._evict()
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Removes `key` and returns its value, or `default` if it is not cached."""
+        with self._lock:
+            if key not in self._entries:
+                return default
+            value = self._entries[key][0]
+            self._remove(key)
+            return value
+
+    def _over_limit(self) -> bool:
+        return len(self._entries) > self.max_entries or (self.max_bytes is not None and self._bytes > self.max_bytes)
+
+    def _evict(self) -> None:
+        if not self._over_limit():
+            return
+        # Reclaim expired entries first so they never push out live ones.
+        now = time.monotonic()
+        for key in [k for k, (_, _, exp) in self._entries.items() if exp is not None and exp <= now]:
+            self._remove(key)
+        while self._entries and self._over_limit():
+            self._remove(next(iter(self._entries)))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
@@ -0,0 +1,136 @@
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+
+class Counter:
+    """A monotonically increasing count, e.g. the number of rejected requests."""
+
+    def __init__(self, name: str, description: str = ""):
+        self.name = name
+        self.description = description
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def snapshot(self) -> Dict:
+        return {"type": "counter", "value": self._value}
+
+
+class Gauge:
+    """A value that can go up and down, e.g. the current queue depth."""
+
+    def __init__(self, name: str, description: str = ""):
+        self.name = name
+        self.description = description
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value -= amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def snapshot(self) -> Dict:
+        return {"type": "gauge", "value": self._value}
+
+
+class Histogram:
+    """
+    Tracks a distribution of observations, e.g. latencies in milliseconds.
+
+    Count and sum are exact. Percentiles are computed over a sliding window of
+    the most recent observations, which keeps memory bounded and makes them
+    reflect current behaviour rather than the whole process lifetime.
+    """
+
+    def __init__(self, name: str, description: str = "", window: int = 2048):
+        self.name = name
+        self.description = description
+        self._window = deque(maxlen=window)
+        self._count = 0
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._window.append(value)
+            self._count += 1
+            self._sum += value
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Returns the q-th percentile (0-100) of the recent window, or None if empty."""
+        with self._lock:
+            values = sorted(self._window)
+        if not values:
+            return None
+        index = min(len(values) - 1, max(0, round(q / 100 * (len(values) - 1))))
+        return values[index]
+
+    def snapshot(self) -> Dict:
+        return {
+            "type": "histogram",
+            "count": self._count,
+            "sum": round(self._sum, 3),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+class MetricsRegistry:
+    """A process-wide, get-or-create registry of named metrics."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, description: str):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, description)
+            elif not isinstance(metric, cls):
+                raise TypeError(f"Metric '{name}' is already registered as a {type(metric).__name__}.")
+            return metric
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        return self._get_or_create(Counter, name, description)
+
+    def gauge(self, name: str, description: str = "") -> Gauge:
+        return self._get_or_create(Gauge, name, description)
+
+    def histogram(self, name: str, description: str = "") -> Histogram:
+        return self._get_or_create(Histogram, name, description)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Returns the current value of every registered metric, keyed by name."""
+        with self._lock:
+            metrics = dict(self._metrics)
+        return {name: metric.snapshot() for name, metric in sorted(metrics.items())}
+
+
+# Read by GET /metrics; each worker process reports only its own metrics.
+metrics = MetricsRegistry()
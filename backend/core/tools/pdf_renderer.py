@@ -1,8 +1,21 @@
+import logging
 import os
-import uuid
-import subprocess
-from jinja2 import Environment, FileSystemLoader
+import hashlib
+import threading
+from typing import Optional
 from ..data_models import FinalResumeSections
+from .tracing import tracer
+from .render_pool import get_compile_pool
+from .typst_backends import get_typst_backend
+
+logger = logging.getLogger(__name__)
+
+# Bump when the render pipeline changes in a way the template file alone does
+# not capture (e.g. `markdown_to_typst` or the render context), so cached PDFs
+# are invalidated.
+RENDERER_VERSION = "1"
+
+TEMPLATE_NAME = "resume_template.typ"
 
 def markdown_to_typst(text: str) -> str:
     """A simple converter to change Markdown lists to Typst lists."""
@@ -26,14 +39,36 @@ class TypstRenderer:
         core_dir = os.path.dirname(tools_dir)
         self.template_dir = os.path.join(core_dir, 'utils', 'typst_templates')
         
+        # Imported here so the API module does not pay for Jinja until a PDF is rendered.
+        from jinja2 import Environment, FileSystemLoader
         self.env = Environment(loader=FileSystemLoader(self.template_dir))
 
-    def render_to_pdf(self, resume_data: FinalResumeSections) -> str:
-        """Takes a FinalResumeSections object, creates a .typ file, and compiles it to PDF."""
+        # The template is hashed once; a renderer outlives many requests (see `get_renderer`).
+        with open(os.path.join(self.template_dir, TEMPLATE_NAME), "rb") as f:
+            self._template_version = f"{RENDERER_VERSION}-{hashlib.sha256(f.read()).hexdigest()[:16]}"
+
+    def template_version(self) -> str:
+        """A short hash identifying the template file and renderer version, taken when the renderer was built."""
+        return self._template_version
+
+    def fingerprint(self, resume_data: FinalResumeSections) -> str:
+        """
+        Returns a content hash of the resume data and template version.
+
+        Two calls with equal inputs yield the same PDF, so this value is used
+        both as the render cache key and as the HTTP ETag of the download.
+        """
+        digest = hashlib.sha256()
+        digest.update(self.template_version().encode("utf-8"))
+        digest.update(resume_data.model_dump_json().encode("utf-8"))
+        return digest.hexdigest()
+
+    def render_source(self, resume_data: FinalResumeSections) -> str:
+        """Renders the Jinja2 template into Typst markup for the given resume data."""
         try:
-            template = self.env.get_template("resume_template.typ")
+            template = self.env.get_template(TEMPLATE_NAME)
         except Exception as e:
-            print(f"ERROR: Could not load 'resume_template.typ' from '{self.template_dir}'. Details: {e}")
+            logger.error("Could not load '%s' from '%s': %s", TEMPLATE_NAME, self.template_dir, e)
             raise FileNotFoundError("Could not find resume_template.typ. Check the template path.")
 
         render_context = {
@@ -49,31 +84,53 @@ class TypstRenderer:
             "education": markdown_to_typst(resume_data.education) if resume_data.education else None,
         }
         
-        rendered_typ = template.render(render_context)
+        return template.render(render_context)
 
-        output_dir = "generated_resumes"
-        os.makedirs(output_dir, exist_ok=True)
-        job_name = f"resume_{uuid.uuid4()}"
-        typ_file_path = os.path.join(output_dir, f"{job_name}.typ")
-        pdf_file_path = os.path.join(output_dir, f"{job_name}.pdf")
+    @tracer.traced("typst.render_to_pdf")
+    def render_to_pdf(self, resume_data: FinalResumeSections) -> bytes:
+        """
+        Takes a FinalResumeSections object and compiles it to PDF entirely in memory.
 
-        with open(typ_file_path, "w", encoding="utf-8") as f:
-            f.write(rendered_typ)
+        The markup is handed to the configured Typst backend in memory (stdin/
+        stdout for the CLI, or the in-process bindings), so no intermediate
+        files are written. This keeps the render path free of cleanup races and
+        usable on read-only filesystems.
 
-        # --- Compile the .typ file to .pdf using the Typst binary ---
-        command = ["typst", "compile", typ_file_path, pdf_file_path]
-        
-        try:
-            result = subprocess.run(command, check=True, capture_output=True, text=True)
-            print(f"--- TOOL: Typst compilation successful. PDF saved to {pdf_file_path} ---")
-        except subprocess.CalledProcessError as e:
-            print("--- TOOL: ERROR: Typst compilation failed. ---")
-            print("Compiler Output:", e.stdout)
-            print("Compiler Error:", e.stderr)
-            raise ConnectionAbortedError("Typst compilation failed on the server.")
-        finally:
-            # Clean up the intermediate .typ file
-            if os.path.exists(typ_file_path):
-                os.remove(typ_file_path)
-
-        return pdf_file_path
\ No newline at end of file
+        Returns:
+            The compiled PDF as bytes.
+        """
+        rendered_typ = self.render_source(resume_data)
+
+        # --- Compile with the configured Typst backend (CLI subprocess or in-process bindings) ---
+        backend = get_typst_backend()
+        attributes = {"typst.source_bytes": len(rendered_typ), "typst.backend": backend.name}
+        with tracer.start_span("typst.compile", attributes=attributes) as span:
+            pdf_bytes = backend.compile(rendered_typ, self.template_dir)
+            span.set_attribute("typst.pdf_bytes", len(pdf_bytes))
+        logger.debug("Typst compilation successful (%d bytes)", len(pdf_bytes))
+
+        return pdf_bytes
+
+    @tracer.traced("typst.render_to_pdf")
+    async def render_to_pdf_async(self, resume_data: FinalResumeSections) -> bytes:
+        """
+        The non-blocking counterpart of `render_to_pdf` for use inside `async def` endpoints.
+
+        The compile runs through the shared, bounded `TypstCompilePool`, so it never
+        blocks the event loop and a burst of downloads cannot spawn unlimited compilers.
+        """
+        rendered_typ = self.render_source(resume_data)
+        return await get_compile_pool().compile(rendered_typ, self.template_dir)
+
+
+_renderer: Optional[TypstRenderer] = None
+_renderer_lock = threading.Lock()
+
+
+def get_renderer() -> TypstRenderer:
+    """The worker's renderer; its Jinja environment, compiled template and template hash are built once."""
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = TypstRenderer()
+        return _renderer
@@ -0,0 +1,88 @@
+import logging
+import os
+import uuid
+import tempfile
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PdfRenderCache:
+    """
+    A size-bounded, content-addressed disk cache for rendered resume PDFs.
+
+    Entries are keyed by a fingerprint of the resume content and template
+    version (see `TypstRenderer.fingerprint`), so identical resumes share one
+    compiled PDF and a template change naturally invalidates old entries.
+    When the total size exceeds `max_bytes`, the least recently used entries
+    are evicted. Reads refresh an entry's modification time to mark it as used.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        """
+        Args:
+            cache_dir: Directory for cached PDFs. Defaults to PDF_CACHE_DIR, or
+                an `rcraft_pdf_cache` folder in the system temp directory.
+            max_bytes: Upper bound for the cache size. Defaults to
+                PDF_CACHE_MAX_BYTES, or 256 MiB.
+        """
+        self.cache_dir = cache_dir or os.getenv(
+            "PDF_CACHE_DIR", os.path.join(tempfile.gettempdir(), "rcraft_pdf_cache")
+        )
+        self.max_bytes = max_bytes or int(os.getenv("PDF_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Returns the cached PDF bytes for `key`, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        logger.debug("PDF render cache hit for %s", key[:12])
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Stores PDF bytes under `key` and evicts old entries if the cache is over its size limit."""
+        if len(data) > self.max_bytes:
+            return
+        # Write to a unique temp name first so concurrent readers never see a partial file.
+        tmp_path = os.path.join(self.cache_dir, f".{key}.{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(key))
+        self._evict()
+
+    def _evict(self) -> None:
+        """Deletes least-recently-used entries until the cache fits within `max_bytes`."""
+        with self._lock:
+            entries = []
+            total = 0
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith(".pdf"):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+
+            if total <= self.max_bytes:
+                return
+            for _, size, path in sorted(entries):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                if total <= self.max_bytes:
+                    break
@@ -0,0 +1,112 @@
+import logging
+import os
+import asyncio
+import time
+from typing import Optional
+
+from backend.core.tools.metrics import metrics
+from backend.core.tools.tracing import tracer
+from backend.core.tools.typst_backends import TypstBackend, compile_timeout_seconds, get_typst_backend
+
+logger = logging.getLogger(__name__)
+
+
+class RenderQueueFullError(Exception):
+    """Raised when too many compiles are already waiting; callers should retry later."""
+
+
+class TypstCompilePool:
+    """
+    An asyncio-native, bounded pool of Typst compiles.
+
+    Compiles run through the configured backend's non-blocking path (an async
+    subprocess, or a worker thread for the in-process backend), so the event
+    loop stays free while Typst works. At most `max_concurrency` compiles run
+    at once; up to `max_queue` further requests wait their turn, and anything
+    beyond that is rejected immediately with `RenderQueueFullError`
+    (backpressure) instead of piling up. A compile that exceeds the timeout
+    fails with `TimeoutError` (the subprocess backend also kills the compiler).
+
+    Queue wait and compile time are recorded in the metrics registry under
+    `typst.queue_wait_ms` and `typst.compile_ms`.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None, max_queue: Optional[int] = None,
+                 timeout_seconds: Optional[float] = None, backend: Optional[TypstBackend] = None):
+        """
+        Args:
+            max_concurrency: Compilers allowed to run at once. Defaults to
+                TYPST_MAX_CONCURRENCY, or the number of CPU cores.
+            max_queue: Requests allowed to wait for a free compiler. Defaults to
+                TYPST_MAX_QUEUE, or 32.
+            timeout_seconds: Per-compile timeout. Defaults to TYPST_COMPILE_TIMEOUT, or 30s.
+            backend: The compile engine. Defaults to the one selected by TYPST_BACKEND.
+        """
+        self.backend = backend or get_typst_backend()
+        self.max_concurrency = max_concurrency or int(os.getenv("TYPST_MAX_CONCURRENCY", os.cpu_count() or 1))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv("TYPST_MAX_QUEUE", 32))
+        self.timeout_seconds = timeout_seconds or compile_timeout_seconds()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._waiting = 0
+
+        self._queue_depth = metrics.gauge("typst.queue_depth", "Compiles waiting for a free compiler.")
+        self._in_flight = metrics.gauge("typst.in_flight", "Compiles currently running.")
+        self._queue_wait = metrics.histogram("typst.queue_wait_ms", "Time spent waiting for a compiler slot.")
+        self._compile_time = metrics.histogram("typst.compile_ms", "Wall time of a single Typst compile.")
+        self._rejected = metrics.counter("typst.rejected", "Compiles rejected because the queue was full.")
+        self._timeouts = metrics.counter("typst.timeouts", "Compiles killed for exceeding the timeout.")
+
+    async def compile(self, source: str, root: str) -> bytes:
+        """
+        Compiles Typst markup to PDF bytes.
+
+        Raises:
+            RenderQueueFullError: If the wait queue is full.
+            TimeoutError: If the compile exceeds the timeout.
+            TypstCompileError: If Typst reports a compilation error.
+        """
+        if self._waiting >= self.max_queue and self._semaphore.locked():
+            self._rejected.inc()
+            raise RenderQueueFullError("Too many PDF renders are queued. Please retry shortly.")
+
+        self._waiting += 1
+        self._queue_depth.inc()
+        enqueued_at = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+            self._queue_depth.dec()
+        self._queue_wait.observe((time.perf_counter() - enqueued_at) * 1000)
+
+        self._in_flight.inc()
+        started_at = time.perf_counter()
+        try:
+            attributes = {"typst.source_bytes": len(source), "typst.backend": self.backend.name}
+            with tracer.start_span("typst.compile", attributes=attributes) as span:
+                try:
+                    pdf_bytes = await self.backend.compile_async(source, root, self.timeout_seconds)
+                except TimeoutError:
+                    self._timeouts.inc()
+                    raise
+                span.set_attribute("typst.pdf_bytes", len(pdf_bytes))
+            logger.debug("Typst compilation successful (%d bytes)", len(pdf_bytes))
+            return pdf_bytes
+        finally:
+            self._compile_time.observe((time.perf_counter() - started_at) * 1000)
+            self._in_flight.dec()
+            self._semaphore.release()
+
+
+_compile_pool: Optional[TypstCompilePool] = None
+
+
+def get_compile_pool() -> TypstCompilePool:
+    """
+    The compile pool bounded by TYPST_MAX_CONCURRENCY and TYPST_MAX_QUEUE. Its semaphore
+    binds to the running loop, so it must first be requested from inside that loop.
+    """
+    global _compile_pool
+    if _compile_pool is None:
+        _compile_pool = TypstCompilePool()
+    return _compile_pool
@@ -0,0 +1,350 @@
+import os
+import re
+import time
+import fcntl
+import hashlib
+import tempfile
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.core.data_models import CategoryScores
+from backend.core.tools.metrics import metrics
+
+# The score vector stored for every finished analysis, one column per entry.
+COLUMNS: Tuple[str, ...] = ("overall_score",) + tuple(CategoryScores.model_fields)
+
+# The cohort quantiles reported alongside a percentile rank.
+QUANTILES = (25, 50, 75, 90)
+QUANTILE_REFRESH_FRACTION = 0.01
+
+_DTYPE = np.dtype("<f4")
+
+# Who produced each row: digests of the upload and of the analysis session
+# (all zeros when unknown), kept in a `keys.bin` file alongside the columns.
+_KEY_DTYPE = np.dtype([("upload", "V16"), ("session", "V16")])
+_NO_KEY = bytes(16)
+
+# Every in-place replacement is also appended to a `replaced.bin` journal, so
+# other workers can bring their key index up to date without re-reading all
+# keys, and the number of entries serves as the cohort's replacement count.
+_REPLACED_DTYPE = np.dtype([("row", "<u8"), ("old_upload", "V16"), ("upload", "V16"), ("session", "V16")])
+
+# Seniority and level words are dropped so "Senior Backend Engineer II" and
+# "backend engineer" fall into the same cohort.
+_LEVEL_WORDS = {"senior", "sr", "junior", "jr", "lead", "staff", "principal", "intern", "associate",
+                "entry", "level", "mid", "i", "ii", "iii", "iv"}
+
+
+def canonical_role(job_role: str) -> str:
+    """Normalises a free-text job role into the cohort it is compared against."""
+    words = re.findall(r"[a-z0-9+#]+", job_role.casefold())
+    core = [word for word in words if word not in _LEVEL_WORDS]
+    return " ".join(core or words)
+
+
+def _digest(value: Optional[str]) -> bytes:
+    return hashlib.sha256(value.encode("utf-8")).digest()[:16] if value else _NO_KEY
+
+
+class _KeyIndex:
+    """The rows holding each session and upload digest, as of `rows` keys and `replaced` journal entries."""
+
+    def __init__(self):
+        self.rows = 0
+        self.replaced = 0
+        self.sessions: Dict[bytes, int] = {}
+        self.uploads: Dict[bytes, List[int]] = {}
+
+    def add(self, row: int, upload: bytes, session: bytes) -> None:
+        if session != _NO_KEY:
+            self.sessions[session] = row
+        if upload != _NO_KEY and row not in self.uploads.setdefault(upload, []):
+            self.uploads[upload].append(row)
+
+    def discard_upload(self, row: int, upload: bytes) -> None:
+        rows = self.uploads.get(upload)
+        if rows and row in rows:
+            rows.remove(row)
+            if not rows:
+                del self.uploads[upload]
+
+
+class ScoreStore:
+    """
+    A columnar store of analysis scores, partitioned by canonical role.
+
+    Each role has a directory holding one little-endian float32 file per
+    column in `COLUMNS`; row i of the cohort is the i-th value of every file.
+    Every row is keyed by the upload it scored and the analysis session it
+    came from, so each resume counts once: a repeat upload of the same file
+    adds nothing, and a session's revisions replace its row in place rather
+    than appending one per revision. Rows are written under an exclusive file
+    lock, so several workers (and hosts sharing the volume) can write
+    concurrently. Readers memory-map the
+    column files read-only: the OS page cache is shared by every worker, so a
+    cohort of millions of rows costs each process no private memory, and
+    percentile ranks are computed with vectorised comparisons over the maps.
+
+    Writers find a key's row in an in-memory index that is brought up to
+    date from the tail of the keys file and of the replacement journal, so an
+    append does not re-read every key.
+
+    Cohort quantiles are cached per role and only recomputed once the cohort
+    has noticeably changed (rows added or replaced); percentile ranks are
+    always exact.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Args:
+            directory: Root directory of the store. Defaults to SCORE_STORE_DIR,
+                or an `rcraft_scores` folder in the system temp directory.
+        """
+        self.directory = directory or os.getenv("SCORE_STORE_DIR", os.path.join(tempfile.gettempdir(), "rcraft_scores"))
+        os.makedirs(self.directory, exist_ok=True)
+        self._maps: Dict[str, Tuple[int, Dict[str, np.memmap]]] = {}
+        self._quantiles: Dict[str, Tuple[int, int, Dict[str, List[float]]]] = {}
+        self._key_indexes: Dict[str, _KeyIndex] = {}
+        self._lock = threading.Lock()
+
+        self._appended = metrics.counter("scores.appended", "Analysis score vectors appended to the cohort store.")
+        self._replaced = metrics.counter("scores.replaced", "Session score vectors replaced by a later revision.")
+        self._duplicates = metrics.counter("scores.duplicates", "Repeat uploads not added to the cohort store.")
+        self._query_ms = metrics.histogram("scores.query_ms", "Time to compute cohort percentiles.")
+
+    def _role_dir(self, role: str) -> str:
+        slug = re.sub(r"[^a-z0-9]+", "-", role).strip("-")[:48] or "role"
+        return os.path.join(self.directory, f"{slug}-{hashlib.sha256(role.encode('utf-8')).hexdigest()[:8]}")
+
+    def append(self, job_role: str, report: dict, upload_sha256: Optional[str] = None,
+               session_id: Optional[str] = None) -> None:
+        """
+        Records the score vector of one `FinalHolisticReport`-shaped dict in its role's cohort.
+
+        Args:
+            job_role: The target role; it picks the cohort.
+            report: The analysis report.
+            upload_sha256: Digest of the uploaded file. An upload already in
+                the cohort is not added again.
+            session_id: The analysis session. A session keeps only its latest
+                scores: its earlier row is overwritten.
+
+        Raises:
+            KeyError: If the report lacks one of the scores.
+        """
+        role = canonical_role(job_role)
+        row = [float(report["overall_score"])] + [float(report["category_scores"][name]) for name in COLUMNS[1:]]
+        role_dir = self._role_dir(role)
+        os.makedirs(role_dir, exist_ok=True)
+        with open(os.path.join(role_dir, ".lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                if not os.path.exists(os.path.join(role_dir, "role.txt")):
+                    with open(os.path.join(role_dir, "role.txt"), "w", encoding="utf-8") as f:
+                        f.write(role)
+                rows = self._row_count(role_dir)
+                upload, session = _digest(upload_sha256), _digest(session_id)
+                key = np.array([(upload, session)], dtype=_KEY_DTYPE)
+                index = self._key_index(role, role_dir, rows)
+                existing = self._find_row(index, upload, session)
+                if existing is None:
+                    # Columns are padded to a common length first, so a writer that died
+                    # between files cannot shift later rows out of alignment.
+                    for name, value in zip(COLUMNS, row):
+                        with open(os.path.join(role_dir, f"{name}.f32"), "ab") as f:
+                            f.truncate(rows * _DTYPE.itemsize)
+                            f.write(np.asarray([value], dtype=_DTYPE).tobytes())
+                    self._write_key(role_dir, rows, key, new_row=True)
+                    with self._lock:
+                        index.add(rows, upload, session)
+                        index.rows = rows + 1
+                    self._appended.inc()
+                elif existing[1]:
+                    for name, value in zip(COLUMNS, row):
+                        with open(os.path.join(role_dir, f"{name}.f32"), "r+b") as f:
+                            f.seek(existing[0] * _DTYPE.itemsize)
+                            f.write(np.asarray([value], dtype=_DTYPE).tobytes())
+                    old_upload = self._write_key(role_dir, existing[0], key, new_row=False)
+                    entry = np.array([(existing[0], old_upload, upload, session)], dtype=_REPLACED_DTYPE)
+                    with open(os.path.join(role_dir, "replaced.bin"), "ab") as f:
+                        f.write(entry.tobytes())
+                    with self._lock:
+                        index.discard_upload(existing[0], old_upload)
+                        index.add(existing[0], upload, session)
+                        index.replaced += 1
+                    self._replaced.inc()
+                else:
+                    self._duplicates.inc()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _key_index(self, role: str, role_dir: str, rows: int) -> _KeyIndex:
+        """
+        The role's key index, updated with the keys and replacements written
+        since it was last read (by this or another worker). Call with the
+        role's file lock held.
+        """
+        keys_path = os.path.join(role_dir, "keys.bin")
+        journal_path = os.path.join(role_dir, "replaced.bin")
+        with self._lock:
+            index = self._key_indexes.setdefault(role, _KeyIndex())
+            if index.rows < rows and os.path.exists(keys_path):
+                keys = np.fromfile(keys_path, dtype=_KEY_DTYPE, count=rows - index.rows,
+                                   offset=index.rows * _KEY_DTYPE.itemsize)
+                for row, (upload, session) in enumerate(keys.tolist(), start=index.rows):
+                    index.add(row, upload, session)
+                index.rows += len(keys)
+            replaced = self._replacement_count(role_dir)
+            if index.replaced < replaced:
+                entries = np.fromfile(journal_path, dtype=_REPLACED_DTYPE, count=replaced - index.replaced,
+                                      offset=index.replaced * _REPLACED_DTYPE.itemsize)
+                for row, old_upload, upload, session in entries.tolist():
+                    index.discard_upload(row, old_upload)
+                    index.add(row, upload, session)
+                index.replaced = replaced
+            return index
+
+    @staticmethod
+    def _find_row(index: _KeyIndex, upload: bytes, session: bytes) -> Optional[Tuple[int, bool]]:
+        """
+        The row a key should be written to, if not a new one, and whether to overwrite it.
+
+        The session's row is overwritten; otherwise a row with the same upload
+        means the report is a repeat and is not written at all.
+        """
+        if session != _NO_KEY and session in index.sessions:
+            return index.sessions[session], True
+        if upload != _NO_KEY and upload in index.uploads:
+            return max(index.uploads[upload]), False
+        return None
+
+    @staticmethod
+    def _write_key(role_dir: str, row: int, key: np.ndarray, new_row: bool) -> bytes:
+        """
+        Writes the key of `row`. Like the columns, the keys file is cut or padded
+        to the rows before a new one first; rows recorded before keys existed
+        get empty keys.
+
+        Returns:
+            The upload digest the row was keyed by before (empty for a new row).
+        """
+        path = os.path.join(role_dir, "keys.bin")
+        if new_row:
+            with open(path, "ab") as f:
+                f.truncate(row * _KEY_DTYPE.itemsize)
+                f.write(key.tobytes())
+            return _NO_KEY
+        with open(path, "r+b") as f:
+            f.seek(row * _KEY_DTYPE.itemsize)
+            previous = f.read(_KEY_DTYPE.itemsize)
+            f.seek(row * _KEY_DTYPE.itemsize)
+            f.write(key.tobytes())
+        return previous[:16].ljust(16, b"\0")
+
+    @staticmethod
+    def _replacement_count(role_dir: str) -> int:
+        """Rows replaced in place so far: the entries in the replacement journal."""
+        path = os.path.join(role_dir, "replaced.bin")
+        return os.path.getsize(path) // _REPLACED_DTYPE.itemsize if os.path.exists(path) else 0
+
+    @staticmethod
+    def _row_count(role_dir: str) -> int:
+        """Rows present in every column (a concurrent append may be half-written)."""
+        sizes = []
+        for name in COLUMNS:
+            path = os.path.join(role_dir, f"{name}.f32")
+            sizes.append(os.path.getsize(path) if os.path.exists(path) else 0)
+        return min(sizes) // _DTYPE.itemsize
+
+    def _columns(self, role: str) -> Tuple[int, Dict[str, np.ndarray]]:
+        """The role's columns as read-only memory maps, re-mapped when rows were added."""
+        role_dir = self._role_dir(role)
+        rows = self._row_count(role_dir) if os.path.isdir(role_dir) else 0
+        with self._lock:
+            cached = self._maps.get(role)
+            if cached is not None and cached[0] == rows:
+                return cached
+            if rows == 0:
+                columns = {name: np.empty(0, dtype=_DTYPE) for name in COLUMNS}
+            else:
+                columns = {
+                    name: np.memmap(os.path.join(role_dir, f"{name}.f32"), dtype=_DTYPE, mode="r", shape=(rows,))
+                    for name in COLUMNS
+                }
+            self._maps[role] = (rows, columns)
+            return rows, columns
+
+    def _cohort_quantiles(self, role: str, rows: int, columns: Dict[str, np.ndarray]) -> Dict[str, List[float]]:
+        """
+        The cohort quantiles of every column.
+
+        Computing them scans and partitions every column, so they are reused
+        until rows added plus rows replaced since reach `QUANTILE_REFRESH_FRACTION`
+        of the cohort; a handful of changed rows cannot move the quartiles of a
+        large cohort noticeably.
+        """
+        role_dir = self._role_dir(role)
+        replaced = self._replacement_count(role_dir) if os.path.isdir(role_dir) else 0
+        with self._lock:
+            cached = self._quantiles.get(role)
+        if cached is not None:
+            cached_rows, cached_replaced, quantiles = cached
+            if (rows - cached_rows) + (replaced - cached_replaced) <= cached_rows * QUANTILE_REFRESH_FRACTION:
+                return quantiles
+        quantiles = {
+            name: [float(q) for q in np.percentile(column, QUANTILES)] if rows else []
+            for name, column in columns.items()
+        }
+        with self._lock:
+            self._quantiles[role] = (rows, replaced, quantiles)
+        return quantiles
+
+    def percentiles(self, job_role: str, scores: Dict[str, Optional[float]]) -> dict:
+        """
+        Ranks scores against everyone else who targeted the same role.
+
+        Args:
+            job_role: The target role; it is canonicalised like on append.
+            scores: Values to rank, keyed by column name. Missing or None values
+                are not ranked, but their cohort quantiles are still reported.
+
+        Returns:
+            A dict shaped like `CohortPercentileReport`. A percentile rank is the
+            share of the cohort scoring below the value, counting ties as half.
+        """
+        started = time.perf_counter()
+        role = canonical_role(job_role)
+        rows, columns = self._columns(role)
+        quantiles = self._cohort_quantiles(role, rows, columns)
+
+        results = {}
+        for name in COLUMNS:
+            value = scores.get(name)
+            percentile = None
+            if value is not None and rows:
+                column, target = columns[name], np.float32(value)
+                below = np.count_nonzero(column < target)
+                equal = np.count_nonzero(column == target)
+                percentile = round(100.0 * (below + 0.5 * equal) / rows, 2).item()
+            results[name] = {
+                "value": value,
+                "percentile": percentile,
+                "cohort_quantiles": dict(zip((f"p{q}" for q in QUANTILES), quantiles[name])),
+            }
+        self._query_ms.observe((time.perf_counter() - started) * 1000)
+        return {"job_role": job_role, "canonical_role": role, "cohort_size": rows, "metrics": results}
+
+
+_score_store: Optional[ScoreStore] = None
+_score_store_lock = threading.Lock()
+
+
+def get_score_store() -> ScoreStore:
+    """The cohort store under SCORE_STORE_DIR; its memory maps are reused across requests."""
+    global _score_store
+    with _score_store_lock:
+        if _score_store is None:
+            _score_store = ScoreStore()
+        return _score_store
@@ -0,0 +1,158 @@
+import logging
+import os
+import uuid
+import asyncio
+import hashlib
+from typing import Awaitable, Callable, Dict, Optional, TypeVar, Union
+
+import redis
+import redis.asyncio as aioredis
+
+from backend.core.tools.metrics import metrics
+from backend.core.tools.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_REDIS_ERRORS = (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError)
+
+
+def request_key(namespace: str, *parts: Union[str, bytes]) -> str:
+    """
+    Builds a single-flight key from the inputs that determine a request's result.
+
+    Parts are length-prefixed before hashing, so ("ab", "c") and ("a", "bc") differ.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part.encode("utf-8") if isinstance(part, str) else part
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return f"{namespace}:{digest.hexdigest()}"
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent executions of the same expensive call.
+
+    The first caller for a key becomes the leader and runs the computation;
+    identical calls that arrive while it runs wait for it and receive the same
+    result instead of starting their own LLM pipeline.
+
+    Within a process, followers await the leader's task directly (and get its
+    exception too). Across workers, the leader holds a Redis lock
+    (`SET NX PX`, refreshed while it runs) and publishes the encoded result
+    under a short-lived key that followers on other workers poll for. If the
+    leader dies or fails without a result, its lock lapses and a follower
+    takes over. Without Redis, coalescing is per process only.
+
+    The computation runs as its own task, so a leader whose client disconnects
+    does not cancel the work its followers are waiting for.
+    """
+
+    def __init__(self, redis_client: Optional[aioredis.Redis], lock_ttl_seconds: Optional[float] = None,
+                 result_ttl_seconds: Optional[float] = None, poll_interval_seconds: float = 0.5):
+        """
+        Args:
+            redis_client: Shared async client for cross-worker coalescing, or None.
+            lock_ttl_seconds: Lifetime of the leader's lock between refreshes.
+                Defaults to SINGLE_FLIGHT_LOCK_TTL, or 30s.
+            result_ttl_seconds: How long a finished result stays available to
+                late followers. Defaults to SINGLE_FLIGHT_RESULT_TTL, or 30s.
+            poll_interval_seconds: How often cross-worker followers check for the result.
+        """
+        self.redis_client = redis_client
+        self.lock_ttl_seconds = lock_ttl_seconds or float(os.getenv("SINGLE_FLIGHT_LOCK_TTL", 30))
+        self.result_ttl_seconds = result_ttl_seconds or float(os.getenv("SINGLE_FLIGHT_RESULT_TTL", 30))
+        self.poll_interval_seconds = poll_interval_seconds
+        self._flights: Dict[str, asyncio.Task] = {}
+
+        self._leaders = metrics.counter("single_flight.leaders", "Calls that ran the computation.")
+        self._local_followers = metrics.counter("single_flight.local_followers", "Calls coalesced onto a leader in this process.")
+        self._remote_followers = metrics.counter("single_flight.remote_followers", "Calls served by a leader on another worker.")
+
+    async def run(self, key: str, compute: Callable[[], Awaitable[T]],
+                  encode: Callable[[T], bytes], decode: Callable[[bytes], T]) -> T:
+        """
+        Returns the result of `compute`, sharing one execution among concurrent callers with the same key.
+
+        Args:
+            key: Identifies the request, e.g. from `request_key`.
+            compute: The expensive call, run at most once per flight.
+            encode: Serializes the result for followers on other workers.
+            decode: The inverse of `encode`.
+        """
+        flight = self._flights.get(key)
+        if flight is not None:
+            self._local_followers.inc()
+            logger.debug("Joined in-flight request %s", key[:24])
+            return await asyncio.shield(flight)
+
+        flight = asyncio.ensure_future(self._fly(key, compute, encode, decode))
+        self._flights[key] = flight
+        flight.add_done_callback(lambda _: self._flights.pop(key, None))
+        return await asyncio.shield(flight)
+
+    async def _fly(self, key: str, compute: Callable[[], Awaitable[T]],
+                   encode: Callable[[T], bytes], decode: Callable[[bytes], T]) -> T:
+        """Runs one flight for this process: leads it across workers, or follows another worker's leader."""
+        if self.redis_client is None:
+            return await self._lead(key, compute)
+
+        lock_key, result_key = f"singleflight:lock:{key}", f"singleflight:result:{key}"
+        owner = uuid.uuid4().hex
+        try:
+            while True:
+                cached = await self.redis_client.get(result_key)
+                if cached is not None:
+                    self._remote_followers.inc()
+                    return decode(cached)
+                if await self.redis_client.set(lock_key, owner, nx=True, px=int(self.lock_ttl_seconds * 1000)):
+                    break
+                # Another worker is computing; wait for its result or for its lock to lapse.
+                with tracer.start_span("single_flight.wait", attributes={"single_flight.key": key}):
+                    while await self.redis_client.exists(lock_key):
+                        await asyncio.sleep(self.poll_interval_seconds)
+        except _REDIS_ERRORS as e:
+            logger.warning("Redis unavailable for request coalescing, running locally: %s", e)
+            return await self._lead(key, compute)
+
+        heartbeat = asyncio.create_task(self._hold_lock(lock_key, owner))
+        try:
+            result = await self._lead(key, compute)
+            try:
+                await self.redis_client.set(result_key, encode(result), px=int(self.result_ttl_seconds * 1000))
+            except _REDIS_ERRORS:
+                pass
+            return result
+        finally:
+            heartbeat.cancel()
+            await self._release_lock(lock_key, owner)
+
+    async def _lead(self, key: str, compute: Callable[[], Awaitable[T]]) -> T:
+        self._leaders.inc()
+        with tracer.start_span("single_flight.lead", attributes={"single_flight.key": key}):
+            return await compute()
+
+    async def _hold_lock(self, lock_key: str, owner: str) -> None:
+        """Keeps the lock alive while the leader computes, so long pipelines are not taken over."""
+        while True:
+            await asyncio.sleep(self.lock_ttl_seconds / 3)
+            try:
+                if await self.redis_client.get(lock_key) == owner.encode():
+                    await self.redis_client.pexpire(lock_key, int(self.lock_ttl_seconds * 1000))
+            except _REDIS_ERRORS:
+                pass
+
+    async def _release_lock(self, lock_key: str, owner: str) -> None:
+        """Deletes the lock only if this leader still owns it (it may have lapsed and been taken over)."""
+        try:
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                await pipe.watch(lock_key)
+                if await pipe.get(lock_key) == owner.encode():
+                    pipe.multi()
+                    pipe.delete(lock_key)
+                    await pipe.execute()
+        except (redis.exceptions.WatchError, *_REDIS_ERRORS):
+            pass
@@ -0,0 +1,113 @@
+import os
+import math
+from collections import Counter
+from typing import List, Sequence
+
+from backend.core.tools.text_similarity import tokenize, shingles, minhash_signature, estimate_jaccard
+
+
+def estimate_tokens(text: str) -> int:
+    """A fast, provider-independent token estimate (~4 characters per token for English text)."""
+    return max(1, len(text) // 4)
+
+
+class SnippetRanker:
+    """
+    A local relevance stage for web-search snippets.
+
+    Snippets are first de-duplicated with MinHash over word shingles, so the
+    same "about us" blurb syndicated across several sites is kept only once.
+    The survivors are ranked with BM25 against a query (the role and company)
+    and packed greedily into a fixed token budget, which keeps the downstream
+    LLM prompt bounded no matter how verbose the search results are.
+    """
+
+    def __init__(self, token_budget: int = None, duplicate_threshold: float = 0.6,
+                 shingle_size: int = 2, k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            token_budget: Maximum estimated tokens of snippet text to return.
+                Defaults to the RESEARCH_SNIPPET_TOKEN_BUDGET env var, or 1200.
+            duplicate_threshold: Estimated Jaccard similarity above which two
+                snippets are treated as near-duplicates.
+            shingle_size: Word n-gram size used for near-duplicate detection.
+            k1, b: Standard BM25 term-saturation and length-normalisation parameters.
+        """
+        self.token_budget = token_budget or int(os.getenv("RESEARCH_SNIPPET_TOKEN_BUDGET", 1200))
+        self.duplicate_threshold = duplicate_threshold
+        self.shingle_size = shingle_size
+        self.k1 = k1
+        self.b = b
+
+    def deduplicate(self, snippets: Sequence[str]) -> List[str]:
+        """Drops exact and near-duplicate snippets, keeping the first occurrence of each."""
+        kept: List[str] = []
+        kept_signatures = []
+        for snippet in snippets:
+            text = snippet.strip()
+            if not text:
+                continue
+            signature = minhash_signature(shingles(tokenize(text), self.shingle_size))
+            if any(estimate_jaccard(signature, other) >= self.duplicate_threshold for other in kept_signatures):
+                continue
+            kept.append(text)
+            kept_signatures.append(signature)
+        return kept
+
+    def bm25_scores(self, query: str, documents: Sequence[str]) -> List[float]:
+        """Scores each document against the query with Okapi BM25."""
+        query_terms = set(tokenize(query))
+        doc_tokens = [tokenize(doc) for doc in documents]
+        if not doc_tokens or not query_terms:
+            return [0.0] * len(documents)
+
+        avg_length = sum(len(tokens) for tokens in doc_tokens) / len(doc_tokens) or 1.0
+        document_frequency = Counter(term for tokens in doc_tokens for term in set(tokens) if term in query_terms)
+        n_docs = len(doc_tokens)
+
+        scores = []
+        for tokens in doc_tokens:
+            term_counts = Counter(tokens)
+            length_norm = self.k1 * (1 - self.b + self.b * len(tokens) / avg_length)
+            score = 0.0
+            for term in query_terms:
+                tf = term_counts.get(term, 0)
+                if not tf:
+                    continue
+                df = document_frequency[term]
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                score += idf * tf * (self.k1 + 1) / (tf + length_norm)
+            scores.append(score)
+        return scores
+
+    def select(self, snippets: Sequence[str], query: str) -> List[str]:
+        """
+        De-duplicates, ranks and budget-packs snippets.
+
+        Args:
+            snippets: Candidate snippets, in the order the search engines returned them.
+            query: The text to rank against, e.g. "<role> <company>".
+
+        Returns:
+            The selected snippets, most relevant first, whose combined estimated
+            token count fits within `token_budget`.
+        """
+        unique = self.deduplicate(snippets)
+        scores = self.bm25_scores(query, unique)
+        # Ties keep the search engine's original order, which is itself a relevance signal.
+        ranked = sorted(range(len(unique)), key=lambda i: (-scores[i], i))
+
+        selected: List[str] = []
+        remaining = self.token_budget
+        for i in ranked:
+            cost = estimate_tokens(unique[i])
+            if cost <= remaining:
+                selected.append(unique[i])
+                remaining -= cost
+            elif not selected:
+                # Never return nothing just because the best snippet is long: truncate it instead.
+                selected.append(unique[i][: remaining * 4])
+                remaining = 0
+            if remaining <= 0:
+                break
+        return selected
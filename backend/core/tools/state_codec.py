@@ -0,0 +1,61 @@
+import struct
+from typing import Type, TypeVar
+
+import msgpack
+import zstandard
+from pydantic import BaseModel
+
+# A compact, versioned binary envelope for workflow state persisted in Redis.
+#
+# Layout: MAGIC (3 bytes) | format version (1 byte) | codec (1 byte) | payload
+# The payload is the model's msgpack encoding, zstd-compressed when that pays
+# off. Values written before this format existed (plain JSON text) are still
+# decoded, so stored runs survive a deploy.
+
+MAGIC = b"RCS"
+FORMAT_VERSION = 1
+CODEC_RAW = 0
+CODEC_ZSTD = 1
+
+_HEADER = struct.Struct(">3sBB")
+
+# Small payloads gain nothing from compression, and the zstd frame header would make them larger.
+_COMPRESSION_THRESHOLD = 256
+_COMPRESSION_LEVEL = 3
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def encode_model(model: BaseModel) -> bytes:
+    """Serializes a Pydantic model into the versioned msgpack(+zstd) envelope."""
+    payload = msgpack.packb(model.model_dump(mode="json"), use_bin_type=True)
+    codec = CODEC_RAW
+    if len(payload) >= _COMPRESSION_THRESHOLD:
+        compressed = zstandard.ZstdCompressor(level=_COMPRESSION_LEVEL).compress(payload)
+        if len(compressed) < len(payload):
+            payload, codec = compressed, CODEC_ZSTD
+    return _HEADER.pack(MAGIC, FORMAT_VERSION, codec) + payload
+
+
+def decode_model(data: bytes, model_cls: Type[ModelT]) -> ModelT:
+    """
+    Rebuilds a Pydantic model from an envelope produced by `encode_model`,
+    or from legacy JSON text.
+
+    Raises:
+        ValueError: If the envelope version or codec is not supported.
+    """
+    if not data.startswith(MAGIC):
+        return model_cls.model_validate_json(data)
+
+    _, version, codec = _HEADER.unpack_from(data)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported state format version: {version}")
+
+    payload = memoryview(data)[_HEADER.size:]
+    if codec == CODEC_ZSTD:
+        payload = zstandard.ZstdDecompressor().decompress(payload)
+    elif codec != CODEC_RAW:
+        raise ValueError(f"Unsupported state codec: {codec}")
+
+    return model_cls.model_validate(msgpack.unpackb(payload, raw=False))
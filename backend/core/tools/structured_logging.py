@@ -0,0 +1,234 @@
+import os
+import sys
+import copy
+import json
+import time
+import zlib
+import queue
+import atexit
+import random
+import logging
+import threading
+import contextvars
+import logging.handlers
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional
+
+from backend.core.tools.metrics import metrics
+from backend.core.tools.tracing import tracer
+
+# Correlation ids of the work being logged. Like the active span in `tracing`,
+# they follow a request across `await` points and into threadpool workers.
+_request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+_workflow_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("workflow_id", default=None)
+
+# Attributes every LogRecord has; anything else on a record came from `extra=`.
+_RESERVED_ATTRIBUTES = set(logging.makeLogRecord({}).__dict__) | {"message", "asctime", "taskName"}
+
+_dropped = metrics.counter("logging.dropped", "Log records dropped because the log queue was full.")
+_sampled_out = metrics.counter("logging.sampled_out", "Log records discarded by level-based sampling.")
+
+
+def bind_request_id(request_id: Optional[str]) -> contextvars.Token:
+    """Tags every record logged in the current context with a request id."""
+    return _request_id.set(request_id)
+
+
+def reset_request_id(token: contextvars.Token) -> None:
+    _request_id.reset(token)
+
+
+def bind_workflow_id(workflow_id: Optional[str]) -> None:
+    """Tags every later record of the current request with a workflow id."""
+    _workflow_id.set(workflow_id)
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+@contextmanager
+def log_stage(stage: str, logger: Optional[logging.Logger] = None) -> Iterator[None]:
+    """
+    Times a stage of request handling and logs its duration.
+
+    Usable as a context manager or a decorator. The record carries `stage`,
+    `duration_ms` and `status` fields, so a log query can break a slow
+    request down by stage.
+    """
+    logger = logger or logging.getLogger("backend.stages")
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        logger.warning("Stage %s failed", stage, extra={"stage": stage, "duration_ms": duration_ms, "status": "error"})
+        raise
+    duration_ms = round((time.perf_counter() - started) * 1000, 3)
+    logger.info("Stage %s finished", stage, extra={"stage": stage, "duration_ms": duration_ms, "status": "ok"})
+
+
+def parse_sample_rates(spec: str) -> Dict[int, float]:
+    """
+    Parses LOG_SAMPLE_RATES, e.g. "DEBUG=0.01,INFO=0.25".
+
+    Levels that are not listed keep every record.
+    """
+    rates = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        name, rate = item.split("=", 1)
+        level = logging.getLevelName(name.strip().upper())
+        if isinstance(level, int):
+            rates[level] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+class LevelSampler(logging.Filter):
+    """
+    Keeps a fraction of the records at each level.
+
+    Within a request the decision is derived from the request id, so a
+    sampled request keeps all its records at that level and the log of a
+    request is never half there. Records outside a request are sampled at
+    random.
+    """
+
+    def __init__(self, rates: Dict[int, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(record.levelno, 1.0)
+        if rate >= 1.0:
+            return True
+        request_id = _request_id.get()
+        if request_id is not None:
+            draw = (zlib.crc32(f"{request_id}:{record.levelno}".encode("utf-8")) & 0xFFFFFFFF) / 2**32
+        else:
+            draw = random.random()
+        if draw < rate:
+            return True
+        _sampled_out.inc()
+        return False
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the background listener without ever waiting.
+
+    The only work done on the calling thread is merging the message with its
+    arguments, rendering a traceback if there is one, capturing the
+    correlation ids (they live in context variables the listener cannot see)
+    and a `put_nowait`. If the queue is full, because the sink cannot keep
+    up, the record is dropped and counted instead of stalling the request.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.request_id = _request_id.get()
+        record.workflow_id = _workflow_id.get()
+        span = tracer.current_span()
+        record.trace_id = span.trace_id if span is not None else None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _dropped.inc()
+
+
+class _DrainingQueueListener(logging.handlers.QueueListener):
+    """Waits for room in a full queue on shutdown, so the records already queued are still written."""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one JSON object per line, including any `extra=` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRIBUTES and value is not None:
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _TextFormatter(logging.Formatter):
+    """Human-readable output for local development (LOG_FORMAT=text)."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        ids = [f"{key}={getattr(record, key)}" for key in ("request_id", "workflow_id")
+               if getattr(record, key, None)]
+        return f"{line} [{' '.join(ids)}]" if ids else line
+
+
+_listener: Optional[_DrainingQueueListener] = None
+_configure_lock = threading.Lock()
+
+
+def configure_logging() -> None:
+    """
+    Routes all logging through a bounded queue drained by a background thread.
+
+    Configured from the environment:
+        LOG_LEVEL: Minimum level, default INFO.
+        LOG_FORMAT: "json" (default) or "text".
+        LOG_SAMPLE_RATES: Per-level sampling, e.g. "DEBUG=0.01,INFO=0.5".
+        LOG_QUEUE_SIZE: Records buffered before new ones are dropped, default 10000.
+
+    Calling it again is a no-op.
+    """
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+        records: queue.Queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", 10000)))
+
+        sink = logging.StreamHandler(sys.stdout)
+        sink.setFormatter(_TextFormatter() if os.getenv("LOG_FORMAT", "json").strip().lower() == "text" else JsonFormatter())
+
+        handler = NonBlockingQueueHandler(records)
+        rates = parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", ""))
+        if rates:
+            handler.addFilter(LevelSampler(rates))
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(handler)
+        root.setLevel(os.getenv("LOG_LEVEL", "INFO").strip().upper())
+
+        _listener = _DrainingQueueListener(records, sink)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flushes the queued records and stops the background thread."""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
@@ -0,0 +1,67 @@
+import re
+import hashlib
+from typing import Iterable, List, Sequence, Set, Tuple
+
+# Local text-similarity primitives shared by the tools that need to compare
+# free text cheaply (e.g. de-duplicating web-search snippets) without an LLM.
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.\-]*[a-z0-9+#]|[a-z0-9]")
+
+# A Mersenne prime larger than any 64-bit hash, used for universal hashing.
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercases text and splits it into word tokens, keeping terms like 'c++' or 'node.js' intact."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def shingles(tokens: Sequence[str], size: int = 3) -> Set[str]:
+    """Returns the set of contiguous word n-grams ("shingles") of the given size."""
+    if len(tokens) < size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def _stable_hash(value: str) -> int:
+    """A process-independent 64-bit hash (Python's built-in `hash` is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def _permutations(num_perm: int) -> List[Tuple[int, int]]:
+    """Deterministic (a, b) coefficients for `num_perm` universal hash functions."""
+    coefficients = []
+    for i in range(num_perm):
+        seed = _stable_hash(f"minhash-permutation-{i}")
+        coefficients.append(((seed % (_MERSENNE_PRIME - 1)) + 1, (seed >> 7) % _MERSENNE_PRIME))
+    return coefficients
+
+
+_DEFAULT_NUM_PERM = 64
+_DEFAULT_PERMUTATIONS = _permutations(_DEFAULT_NUM_PERM)
+
+
+def minhash_signature(items: Iterable[str], num_perm: int = _DEFAULT_NUM_PERM) -> Tuple[int, ...]:
+    """
+    Computes a MinHash signature for a set of shingles.
+
+    The fraction of equal positions between two signatures is an unbiased
+    estimate of the Jaccard similarity of the underlying sets.
+    """
+    permutations = _DEFAULT_PERMUTATIONS if num_perm == _DEFAULT_NUM_PERM else _permutations(num_perm)
+    hashes = [_stable_hash(item) for item in items]
+    if not hashes:
+        return tuple([_MAX_HASH] * num_perm)
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in permutations
+    )
+
+
+def estimate_jaccard(signature_a: Sequence[int], signature_b: Sequence[int]) -> float:
+    """Estimates Jaccard similarity from two MinHash signatures of equal length."""
+    if not signature_a or len(signature_a) != len(signature_b):
+        return 0.0
+    matches = sum(1 for a, b in zip(signature_a, signature_b) if a == b)
+    return matches / len(signature_a)
@@ -0,0 +1,256 @@
+import logging
+import os
+import sys
+import json
+import inspect
+import time
+import secrets
+import threading
+import importlib
+import contextvars
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    """
+    A single timed operation within a trace.
+
+    Identifiers follow the W3C Trace Context format used by OpenTelemetry
+    (32 hex chars for the trace id, 16 for the span id), so exported spans can
+    be loaded into any OTel-compatible backend without translation.
+    """
+
+    def __init__(self, name: str, trace_id: str, parent_span_id: Optional[str] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_time_ns = time.time_ns()
+        self.end_time_ns: Optional[int] = None
+        self.status = "OK"
+        self.status_message: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attaches a single attribute. `None` values are dropped, as in OTel."""
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def record_exception(self, exc: BaseException) -> None:
+        """Marks the span as failed and stores the exception type and message."""
+        self.status = "ERROR"
+        self.status_message = str(exc)
+        self.attributes["exception.type"] = type(exc).__name__
+        self.attributes["exception.message"] = str(exc)
+
+    def end(self) -> None:
+        if self.end_time_ns is None:
+            self.end_time_ns = time.time_ns()
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_time_ns or time.time_ns()
+        return (end - self.start_time_ns) / 1_000_000
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializes the span into the OTel JSON span layout."""
+        return {
+            "name": self.name,
+            "context": {"trace_id": self.trace_id, "span_id": self.span_id},
+            "parent_id": self.parent_span_id,
+            "start_time_unix_nano": self.start_time_ns,
+            "end_time_unix_nano": self.end_time_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "status": {"status_code": self.status, "description": self.status_message},
+        }
+
+
+# --- Exporters ---
+
+class SpanExporter(ABC):
+    """Interface for anything that receives finished spans."""
+
+    @abstractmethod
+    def export(self, span: Span) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+class NoOpSpanExporter(SpanExporter):
+    """Discards spans. Used when tracing output is disabled."""
+
+    def export(self, span: Span) -> None:
+        pass
+
+
+class ConsoleSpanExporter(SpanExporter):
+    """Writes one JSON line per finished span to stdout."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+class FileSpanExporter(SpanExporter):
+    """Appends finished spans as JSON lines to a local file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def exporter_from_env() -> SpanExporter:
+    """
+    Builds the exporter selected by the TRACE_EXPORTER environment variable.
+
+    Supported values are "none" (default), "console", "file" (writes to
+    TRACE_FILE_PATH, default "traces.jsonl") or a "package.module:factory"
+    import path for a custom exporter, e.g. an adapter to an OTLP collector.
+    """
+    spec = os.getenv("TRACE_EXPORTER", "none").strip()
+    if spec in ("", "none"):
+        return NoOpSpanExporter()
+    if spec == "console":
+        return ConsoleSpanExporter()
+    if spec == "file":
+        return FileSpanExporter(os.getenv("TRACE_FILE_PATH", "traces.jsonl"))
+    if ":" in spec:
+        module_name, factory_name = spec.split(":", 1)
+        factory = getattr(importlib.import_module(module_name), factory_name)
+        return factory()
+    raise ValueError(f"Unsupported TRACE_EXPORTER value: {spec}")
+
+
+# --- Tracer ---
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """
+    Creates spans and tracks the active one through a context variable.
+
+    Because the active span lives in a `ContextVar`, it follows the request
+    across `await` points and into threadpool workers started by FastAPI or
+    LangGraph, so every span of one HTTP request shares a single trace id.
+    """
+
+    def __init__(self, exporter: Optional[SpanExporter] = None):
+        self.exporter = exporter or NoOpSpanExporter()
+
+    def set_exporter(self, exporter: SpanExporter) -> None:
+        """Replaces the active exporter, shutting down the previous one."""
+        previous, self.exporter = self.exporter, exporter
+        previous.shutdown()
+
+    def current_span(self) -> Optional[Span]:
+        return _current_span.get()
+
+    @contextmanager
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None,
+                   parent: Optional[Tuple[str, str]] = None) -> Iterator[Span]:
+        """
+        Opens a span as a child of the active span and makes it the active one.
+
+        Args:
+            name: The operation name, e.g. "optimizer.node.researcher".
+            attributes: Initial span attributes.
+            parent: An explicit (trace_id, span_id) pair, used to continue a
+                trace received from an incoming `traceparent` header.
+        """
+        if parent is not None:
+            trace_id, parent_span_id = parent
+        elif (active := _current_span.get()) is not None:
+            trace_id, parent_span_id = active.trace_id, active.span_id
+        else:
+            trace_id, parent_span_id = secrets.token_hex(16), None
+
+        span = Span(name, trace_id, parent_span_id, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            span.end()
+            _current_span.reset(token)
+            try:
+                self.exporter.export(span)
+            except Exception as e:
+                # A broken exporter must never fail the request being traced.
+                logger.error("Span export failed: %s", e)
+
+    def traced(self, name: str) -> Callable:
+        """Decorator that runs the wrapped function inside a span of the given name."""
+        def decorator(func: Callable) -> Callable:
+            if inspect.iscoroutinefunction(func):
+                @wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.start_span(name):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.start_span(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Parses a W3C `traceparent` header into (trace_id, parent_span_id)."""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16)
+        int(parts[2], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2]
+
+
+def format_traceparent(span: Span) -> str:
+    """Formats a span as a W3C `traceparent` header value."""
+    return f"00-{span.trace_id}-{span.span_id}-01"
+
+
+# Exports to the sink chosen by TRACE_EXPORTER when this module is first imported;
+# `set_exporter` swaps it later, e.g. in benchmarks.
+tracer = Tracer(exporter_from_env())
@@ -0,0 +1,159 @@
+import logging
+import os
+import asyncio
+import threading
+import subprocess
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TypstCompileError(Exception):
+    """Raised when Typst rejects the markup; a server-side rendering bug, not a connectivity problem."""
+
+
+def build_compile_command(root: str) -> List[str]:
+    """
+    The Typst command line that compiles markup from stdin into a PDF on stdout.
+
+    `-` selects stdin/stdout; the format must be explicit since there is no file extension.
+    """
+    return ["typst", "compile", "--root", root, "--format", "pdf", "-", "-"]
+
+
+def compile_timeout_seconds() -> float:
+    """The per-compile timeout, configurable through TYPST_COMPILE_TIMEOUT."""
+    return float(os.getenv("TYPST_COMPILE_TIMEOUT", 30))
+
+
+class TypstBackend(ABC):
+    """Interface for the engines that turn Typst markup into PDF bytes."""
+
+    name = "base"
+
+    @abstractmethod
+    def compile(self, source: str, root: str) -> bytes:
+        """
+        Compiles Typst markup to PDF bytes, blocking the calling thread.
+
+        Raises:
+            TimeoutError: If the compile exceeds the timeout.
+            TypstCompileError: If Typst reports a compilation error.
+        """
+        pass
+
+    @abstractmethod
+    async def compile_async(self, source: str, root: str, timeout_seconds: float) -> bytes:
+        """The same as `compile`, without blocking the event loop."""
+        pass
+
+
+class SubprocessTypstBackend(TypstBackend):
+    """Runs the `typst` CLI once per compile, piping markup through stdin/stdout."""
+
+    name = "subprocess"
+
+    def compile(self, source: str, root: str) -> bytes:
+        try:
+            result = subprocess.run(build_compile_command(root), input=source.encode("utf-8"), check=True,
+                                    capture_output=True, timeout=compile_timeout_seconds())
+        except subprocess.TimeoutExpired:
+            raise TimeoutError(f"Typst compilation exceeded {compile_timeout_seconds()}s and was killed.")
+        except FileNotFoundError as e:
+            raise RuntimeError("The typst CLI is not installed or not on PATH.") from e
+        except subprocess.CalledProcessError as e:
+            logger.error("Typst compilation failed: %s", e.stderr.decode("utf-8", errors="replace"))
+            raise TypstCompileError("Typst compilation failed on the server.")
+        return result.stdout
+
+    async def compile_async(self, source: str, root: str, timeout_seconds: float) -> bytes:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *build_compile_command(root),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except FileNotFoundError as e:
+            raise RuntimeError("The typst CLI is not installed or not on PATH.") from e
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(source.encode("utf-8")), timeout_seconds)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise TimeoutError(f"Typst compilation exceeded {timeout_seconds}s and was killed.")
+
+        if process.returncode != 0:
+            logger.error("Typst compilation failed: %s", stderr.decode("utf-8", errors="replace"))
+            raise TypstCompileError("Typst compilation failed on the server.")
+        return stdout
+
+
+class InProcessTypstBackend(TypstBackend):
+    """
+    Compiles in-process through the `typst` Python bindings.
+
+    Each worker thread keeps its own long-lived `typst.Compiler`, so the font
+    scan, downloaded packages and Typst's memoized parse/layout results stay
+    warm between compiles. Only the changed resume content is re-processed,
+    which removes the process spawn and font discovery that dominate the
+    subprocess backend on small documents.
+    """
+
+    name = "inprocess"
+
+    def __init__(self):
+        try:
+            import typst
+        except ImportError as e:
+            raise RuntimeError("TYPST_BACKEND=inprocess requires the 'typst' Python package.") from e
+        self._typst = typst
+        self._local = threading.local()
+        font_paths = os.getenv("TYPST_FONT_PATHS")
+        self._font_paths = font_paths.split(os.pathsep) if font_paths else []
+        self._package_cache_path = os.getenv("TYPST_PACKAGE_CACHE_PATH")
+
+    def _compiler(self, root: str):
+        """Returns this thread's warm compiler, creating it on first use."""
+        compiler = getattr(self._local, "compiler", None)
+        if compiler is None:
+            compiler = self._typst.Compiler(
+                root=root,
+                font_paths=self._font_paths,
+                package_cache_path=self._package_cache_path,
+            )
+            self._local.compiler = compiler
+        return compiler
+
+    def compile(self, source: str, root: str) -> bytes:
+        try:
+            return self._compiler(root).compile(input=source.encode("utf-8"), format="pdf", root=root)
+        except self._typst.TypstError as e:
+            logger.error("Typst compilation failed: %s", e)
+            raise TypstCompileError("Typst compilation failed on the server.")
+
+    async def compile_async(self, source: str, root: str, timeout_seconds: float) -> bytes:
+        # A thread cannot be killed, so on timeout the compile finishes in the
+        # background; the caller is released and the compiler slot freed.
+        try:
+            return await asyncio.wait_for(asyncio.to_thread(self.compile, source, root), timeout_seconds)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Typst compilation exceeded {timeout_seconds}s.")
+
+
+_backend: Optional[TypstBackend] = None
+
+
+def get_typst_backend() -> TypstBackend:
+    """The Typst engine selected by TYPST_BACKEND ("subprocess" or "inprocess")."""
+    global _backend
+    if _backend is None:
+        choice = os.getenv("TYPST_BACKEND", "subprocess").strip().lower()
+        if choice == "subprocess":
+            _backend = SubprocessTypstBackend()
+        elif choice == "inprocess":
+            _backend = InProcessTypstBackend()
+        else:
+            raise ValueError(f"Unsupported TYPST_BACKEND value: {choice}")
+    return _backend
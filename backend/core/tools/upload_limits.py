@@ -0,0 +1,59 @@
+import os
+from typing import Iterable, Optional
+
+from fastapi import HTTPException
+from starlette.responses import PlainTextResponse
+
+
+def max_upload_bytes() -> int:
+    """The largest request body accepted on upload routes, configurable through MAX_UPLOAD_BYTES (default 10 MiB)."""
+    return int(os.getenv("MAX_UPLOAD_BYTES", 10 * 1024 * 1024))
+
+
+class BodySizeLimitMiddleware:
+    """
+    ASGI middleware that bounds the request body size on upload routes.
+
+    A request whose Content-Length already exceeds the limit is answered with
+    413 before a single body byte is read. Bodies without a (truthful)
+    Content-Length are counted as they stream in, and reading stops with a
+    413 as soon as the limit is crossed, so an oversized upload is never
+    fully buffered. Multipart parsing spools file parts to disk past 1 MiB,
+    which keeps per-request memory bounded below the limit as well.
+    """
+
+    def __init__(self, app, paths: Iterable[str], max_bytes: Optional[int] = None):
+        """
+        Args:
+            app: The wrapped ASGI application.
+            paths: Request paths the limit applies to.
+            max_bytes: The body size limit. Defaults to `max_upload_bytes()`.
+        """
+        self.app = app
+        self.paths = frozenset(paths)
+        self.max_bytes = max_bytes or max_upload_bytes()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+            response = PlainTextResponse(f"Upload exceeds the {self.max_bytes} byte limit.", status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # FastAPI re-raises HTTPExceptions from body parsing, so this becomes the response.
+                    raise HTTPException(status_code=413, detail=f"Upload exceeds the {self.max_bytes} byte limit.")
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,58 @@
+import logging
+import os
+import time
+import importlib
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# Heavy subsystems that the API modules import lazily, in the order requests
+# usually need them. Warming imports these so the first real request does not
+# pay for them.
+HEAVY_MODULES = [
+    "backend.core.agents.analyzer.preprocessor_agent",
+    "backend.core.agents.analyzer.llm_analyzer_agent",
+    "langgraph.graph",
+    "backend.core.agents.optimizer.context_extraction_agent",
+    "backend.core.agents.optimizer.research_agent",
+    "backend.core.agents.optimizer.strategist_agent",
+    "backend.core.agents.optimizer.builder_agent",
+    "backend.core.agents.optimizer.ats_agent",
+    "backend.core.agents.optimizer.reviewer_agent",
+    "jinja2",
+    "backend.core.tools.score_store",
+]
+
+
+def warmup_mode() -> str:
+    """
+    How the worker warms up, from STARTUP_WARMUP:
+    "background" (default) warms after the worker starts accepting requests,
+    "blocking" finishes warming before it reports ready, and "none" leaves
+    everything to first use.
+    """
+    return os.getenv("STARTUP_WARMUP", "background").strip().lower()
+
+
+def warm_up() -> Dict[str, float]:
+    """
+    Imports the heavy subsystems ahead of the first request.
+
+    A module that fails to import is logged and skipped; the request that
+    needs it will surface the error as usual.
+
+    Returns:
+        The time in milliseconds spent importing each module.
+    """
+    timings = {}
+    started = time.perf_counter()
+    for module in HEAVY_MODULES:
+        module_started = time.perf_counter()
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            logger.warning("Warm-up could not import %s: %s", module, e)
+            continue
+        timings[module] = (time.perf_counter() - module_started) * 1000
+    logger.info("Warm-up finished", extra={"duration_ms": round((time.perf_counter() - started) * 1000, 3)})
+    return timings
@@ -1,4 +1,22 @@
+import logging
+from typing import List
 from ddgs import DDGS
+from backend.core.tools.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# A replacement for DuckDuckGo, or None to search the web.
+_search_provider = None
+
+
+def set_search_provider(provider) -> None:
+    """
+    Sends every web search of this process to `provider`, which needs
+    `text(query, max_results) -> List[str]`. Pass None to restore DuckDuckGo.
+    """
+    global _search_provider
+    _search_provider = provider
+
 
 class WebSearchTool:
     """
@@ -6,6 +24,41 @@ class WebSearchTool:
     It's designed to be simple, dependency-free (no API key needed), and robust.
     """
 
+    def search_snippets(self, query: str, max_results: int = 3) -> List[str]:
+        """
+        Performs a web search for the given query and returns the raw result
+        snippets as a list, so callers can filter or rank them themselves.
+
+        Args:
+            query: The search query string.
+            max_results: The maximum number of search results to retrieve.
+
+        Returns:
+            A list of snippet bodies. The list is empty if the search yields no
+            results or fails.
+        """
+        logger.debug("Performing web search for query: %r", query)
+        with tracer.start_span("web_search.search", attributes={"search.query": query}) as span:
+            try:
+                if _search_provider is not None:
+                    results = _search_provider.text(query, max_results=max_results)
+                else:
+                    with DDGS() as ddgs:
+
+                        # The 'backend="lite"' can sometimes be faster and more reliable for simple text searches.
+                        results = [r['body'] for r in ddgs.text(query, max_results=max_results, backend="lite")]
+                span.set_attribute("search.result_count", len(results))
+
+                if not results:
+                    logger.info("Web search returned no results")
+                return results
+
+            except Exception as e:
+                # Catch any potential exceptions from the ddgs library (e.g., network issues).
+                logger.warning("Web search for %r failed: %s", query, e)
+                span.record_exception(e)
+                return []
+
     def search(self, query: str, max_results: int = 3) -> str:
         """
         Performs a web search for the given query and returns a concatenated
@@ -21,22 +74,11 @@ class WebSearchTool:
             and summarize. Returns a specific "No information found." message if
             the search yields no results or fails.
         """
-        print(f"--- TOOL: Performing web search for query: '{query}' ---")
-        try:
-            with DDGS() as ddgs:
-
-                # The 'backend="lite"' can sometimes be faster and more reliable for simple text searches.
-                results = [r['body'] for r in ddgs.text(query, max_results=max_results, backend="lite")]
-            
-            # Check if the search actually returned anything.
-            if not results:
-                print("--- TOOL: Web search returned no results. ---")
-                return "No information found for the specified query."
-
-            # Join the results with a clear separator for the LLM to easily parse.
-            return "\n\n---\n\n".join(results)
-            
-        except Exception as e:
-            # Catch any potential exceptions from the ddgs library (e.g., network issues).
-            print(f"ERROR in WebSearchTool during search for '{query}': {e}")
-            return "An error occurred during the web search."
\ No newline at end of file
+        results = self.search_snippets(query, max_results=max_results)
+
+        # Check if the search actually returned anything.
+        if not results:
+            return "No information found for the specified query."
+
+        # Join the results with a clear separator for the LLM to easily parse.
+        return "\n\n---\n\n".join(results)
@@ -1,92 +1,388 @@
-import redis
+import logging
 import os
+import time
 import uuid
-import json
-from typing import Optional
-from backend.core.data_models import FinalResumeSections
+import socket
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+
+from backend.core.data_models import FinalResumeSections, OptimizerWorkflowState
+from backend.core.tools.memory_cache import TTLCache
+from backend.core.tools.metrics import metrics
+from backend.core.tools.state_codec import encode_model, decode_model
+from backend.core.tools.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+def create_redis_pool() -> aioredis.ConnectionPool:
+    """
+    Creates the process-wide async Redis connection pool.
+
+    The pool is built once in the application lifespan and shared by every
+    request. Connections are health-checked lazily (a PING is only sent when a
+    connection has been idle longer than REDIS_HEALTH_CHECK_INTERVAL seconds),
+    so requests no longer pay a connect-and-ping round trip.
+    """
+    redis_host = os.getenv("REDIS_HOST", "localhost")
+    redis_port = int(os.getenv("REDIS_PORT", 6379)) # Also make the port configurable
+    return aioredis.ConnectionPool(
+        host=redis_host,
+        port=redis_port,
+        db=0,
+        max_connections=int(os.getenv("REDIS_MAX_CONNECTIONS", 50)),
+        health_check_interval=int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", 30)),
+        socket_connect_timeout=float(os.getenv("REDIS_CONNECT_TIMEOUT", 2)),
+        socket_timeout=float(os.getenv("REDIS_SOCKET_TIMEOUT", 5)),
+        # Responses stay as raw bytes so binary artifacts (rendered PDFs) can share the client.
+        decode_responses=False,
+    )
+
+
+@asynccontextmanager
+async def _redis_errors(action: str):
+    """Translates redis-py connection failures into the built-in ConnectionError the routers handle."""
+    try:
+        yield
+    except (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError) as e:
+        logger.error("Redis unavailable while trying to %s: %s", action, e)
+        raise ConnectionError(f"Redis service is not available. Cannot {action}.") from e
+
+
+def node_id() -> str:
+    """Identifies this worker in sticky-routing hints. NODE_ID overrides the hostname:pid default."""
+    return os.getenv("NODE_ID") or f"{socket.gethostname()}:{os.getpid()}"
+
 
 class WorkflowStateManager:
     """
-    Manages the temporary storage and retrieval of workflow results using Redis.
-    
-    This class handles the connection to Redis and provides a simple interface
-    to save and load the state of a completed resume generation workflow.
+    Manages the temporary storage and retrieval of workflow results.
+
+    State is kept in two tiers: a size- and TTL-bounded in-process L1 cache in
+    front of the shared Redis store. Reads are served from L1 when possible and
+    only fall through to Redis on a miss. Writes go to both; if Redis is
+    unreachable the write is kept in L1 and buffered, and the buffer is replayed
+    (with each key's remaining TTL) once Redis is back. While degraded, a run is
+    only readable on the worker that produced it, which the API advertises to
+    clients through sticky-routing hints (see `node_id` and `degraded`).
     """
 
-    def __init__(self):
+    def __init__(self, pool: Optional[aioredis.ConnectionPool], local_cache: Optional[TTLCache] = None):
+        """
+        Initializes the state manager on top of an existing connection pool.
+
+        Args:
+            pool: The lifespan-scoped pool from `create_redis_pool`. If None,
+                the manager runs purely on its in-process tier.
+            local_cache: The L1 tier. Defaults to a cache bounded by
+                STATE_L1_MAX_ENTRIES (512) and STATE_L1_MAX_BYTES (64 MiB).
+        """
+        self.redis_client: Optional[aioredis.Redis] = aioredis.Redis(connection_pool=pool) if pool else None
+        self.local = local_cache or TTLCache(
+            max_entries=int(os.getenv("STATE_L1_MAX_ENTRIES", 512)),
+            max_bytes=int(os.getenv("STATE_L1_MAX_BYTES", 64 * 1024 * 1024)),
+        )
+        # How long a value read from Redis stays in L1. Values never change once written, so this
+        # only bounds memory and how long an expired run stays readable here.
+        self.fill_ttl_seconds = float(os.getenv("STATE_L1_FILL_TTL", 60))
+        self.max_pending_writes = int(os.getenv("STATE_WRITE_BUFFER_MAX", 1000))
+        self.node_id = node_id()
+        # key -> (value, monotonic expiry) for writes that could not reach Redis yet.
+        self._pending: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._redis_down = self.redis_client is None
+
+        self._l1_hits = metrics.counter("state.l1_hits", "State reads served from the in-process tier.")
+        self._l1_misses = metrics.counter("state.l1_misses", "State reads that fell through to Redis.")
+        self._buffered = metrics.gauge("state.buffered_writes", "Writes waiting for Redis to come back.")
+
+    @property
+    def degraded(self) -> bool:
+        """True while Redis is unreachable or buffered writes have not been replayed yet."""
+        return self._redis_down or bool(self._pending)
+
+    async def ping(self) -> bool:
+        """Checks connectivity and records the result. Returns False instead of raising."""
+        if not self.redis_client:
+            return False
+        try:
+            with tracer.start_span("redis.ping"):
+                self._redis_down = not await self.redis_client.ping()
+        except (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError) as e:
+            logger.error("Could not connect to Redis: %s", e)
+            self._redis_down = True
+        return not self._redis_down
+
+    async def _set_many(self, values: Dict[str, bytes], ttl_ms: int) -> None:
+        """Writes several keys with the same TTL in a single pipelined round trip."""
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for key, value in values.items():
+                pipe.set(key, value, px=ttl_ms)
+            await pipe.execute()
+
+    def _buffer(self, values: Dict[str, bytes], ttl_seconds: float) -> None:
+        """Queues writes for replay, dropping the oldest ones if the buffer is full."""
+        expires_at = time.monotonic() + ttl_seconds
+        for key, value in values.items():
+            self._pending[key] = (value, expires_at)
+            self._pending.move_to_end(key)
+        while len(self._pending) > self.max_pending_writes:
+            dropped, _ = self._pending.popitem(last=False)
+            logger.warning("Write buffer full, dropped buffered key %s", dropped)
+        self._buffered.set(len(self._pending))
+
+    async def _write(self, values: Dict[str, bytes], ttl_seconds: float, action: str) -> bool:
+        """
+        Writes to L1, then to Redis. If Redis is unreachable the values are buffered instead.
+
+        Returns:
+            True if the values reached Redis, False if they were buffered.
+        """
+        for key, value in values.items():
+            self.local.put(key, value, ttl_seconds=ttl_seconds)
+
+        if self.redis_client and not self._redis_down:
+            try:
+                async with _redis_errors(action):
+                    await self._set_many(values, int(ttl_seconds * 1000))
+                return True
+            except ConnectionError:
+                self._redis_down = True
+
+        self._buffer(values, ttl_seconds)
+        logger.warning("Redis unavailable; kept %d key(s) locally on %s for replay", len(values), self.node_id)
+        return False
+
+    async def _read(self, keys: List[str], action: str) -> List[Optional[bytes]]:
         """
-        Initializes the state manager and attempts to connect to Redis.
-        The host is now read from an environment variable for container flexibility.
+        Reads keys from L1, fetching only the misses from Redis in one MGET.
+
+        A key L1 has evicted but that is still waiting in the write buffer is
+        served from there (and put back into L1): Redis does not have it yet.
+        The first key is the primary one (the run's state); the others are
+        optional extras. While Redis is down, a locally held primary key is
+        returned with None for any extras that are not held locally.
 
+        Raises:
+            ConnectionError: If the primary key is not held locally and Redis is not reachable.
         """
-        redis_host = os.getenv("REDIS_HOST", "localhost")
-        redis_port = int(os.getenv("REDIS_PORT", 6379)) # Also make the port configurable
+        values = [self.local.get(key) for key in keys]
+        missing = [i for i, value in enumerate(values) if value is None]
+        self._l1_hits.inc(len(keys) - len(missing))
+        if not missing:
+            return values
+
+        self._l1_misses.inc(len(missing))
+        now = time.monotonic()
+        for i in missing:
+            value, expires_at = self._pending.get(keys[i], (None, 0.0))
+            if value is not None and expires_at > now:
+                self.local.put(keys[i], value, ttl_seconds=expires_at - now)
+                values[i] = value
+        missing = [i for i in missing if values[i] is None]
+        if not missing:
+            return values
 
-        self.redis_client: Optional[redis.Redis] = None
         try:
-            self.redis_client = redis.Redis(host=redis_host, port=redis_port, db=0, decode_responses=True)
-            self.redis_client.ping()
-            print(f"--- TOOL: Connected to Redis successfully at {redis_host}:{redis_port}. ---")
-        except redis.exceptions.ConnectionError as e:
-            print(f"--- TOOL: ERROR: Could not connect to Redis at {redis_host}:{redis_port}. Details: {e} ---")
-            self.redis_client = None
+            # Fail fast while Redis is known to be down; the replayer notices when it is back.
+            if not self.redis_client or self._redis_down:
+                raise ConnectionError(f"Redis service is not available. Cannot {action}.")
+            async with _redis_errors(action):
+                fetched = await self.redis_client.mget([keys[i] for i in missing])
+        except ConnectionError:
+            self._redis_down = True
+            if values[0] is not None:
+                return values
+            raise
+
+        for i, value in zip(missing, fetched):
+            if value is not None:
+                self.local.put(keys[i], value, ttl_seconds=self.fill_ttl_seconds)
+            values[i] = value
+        return values
 
-    def save_state(self, resume_data: FinalResumeSections, ttl_seconds: int = 600) -> str:
+    async def replay_pending(self) -> int:
         """
-        Saves the structured resume data to Redis with a Time-To-Live (TTL).
+        Pushes buffered writes to Redis with their remaining TTL. Expired ones are discarded.
+
+        Returns:
+            The number of keys written.
+        """
+        if not self.redis_client or not self._pending:
+            return 0
+
+        now = time.monotonic()
+        batch = {key: entry for key, entry in self._pending.items() if entry[1] > now}
+        try:
+            async with _redis_errors("replay buffered writes"):
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    for key, (value, expires_at) in batch.items():
+                        pipe.set(key, value, px=max(1, int((expires_at - now) * 1000)))
+                    await pipe.execute()
+        except ConnectionError:
+            self._redis_down = True
+            return 0
+
+        for key, entry in batch.items():
+            # A key re-buffered while the pipeline ran keeps its newer value.
+            if self._pending.get(key) is entry:
+                del self._pending[key]
+        for key in [key for key, (_, expires_at) in self._pending.items() if expires_at <= now]:
+            del self._pending[key]
+        self._buffered.set(len(self._pending))
+        self._redis_down = False
+        logger.info("Replayed %d buffered key(s) to Redis", len(batch))
+        return len(batch)
+
+    async def run_replayer(self, interval_seconds: Optional[float] = None) -> None:
+        """
+        Background loop that detects Redis recovery and replays buffered writes.
+
+        Runs until cancelled; started from the application lifespan.
+        """
+        interval = interval_seconds or float(os.getenv("STATE_REPLAY_INTERVAL", 5))
+        while True:
+            await asyncio.sleep(interval)
+            if self.degraded and await self.ping():
+                await self.replay_pending()
+
+    @staticmethod
+    def _workflow_state_key(workflow_id: str) -> str:
+        """The Redis key under which the full OptimizerWorkflowState of a run is stored."""
+        return f"{workflow_id}:state"
+
+    async def save_state(self, resume_data: FinalResumeSections, ttl_seconds: int = 600,
+                         workflow_state: Optional[OptimizerWorkflowState] = None) -> str:
+        """
+        Saves the structured resume data with a Time-To-Live (TTL).
+
+        Values are stored in the compact msgpack+zstd envelope from `state_codec`.
+        If Redis is down the run is kept in the in-process tier and replayed
+        later, so completed work is never thrown away; check `degraded` to
+        know whether the run is only readable on this worker for now.
 
         Args:
             resume_data: The Pydantic model of the final resume sections.
             ttl_seconds: Time-to-live for the cache entry (default is 10 minutes).
+            workflow_state: Optionally, the complete workflow state (inputs and every
+                agent's output), kept under the same TTL so the run can be replayed.
 
         Returns:
             A unique workflow_id string that can be used to retrieve the state.
-            
-        Raises:
-            ConnectionError: If the Redis client is not connected.
         """
-        if not self.redis_client:
-            raise ConnectionError("Redis service is not available. Cannot save workflow state.")
-            
         # Generate a new, unique ID for this workflow instance.
         workflow_id = str(uuid.uuid4())
-        
-        # Serialize the Pydantic model into a JSON string for storage.
-        state_json = resume_data.model_dump_json()
-        
-        # Use the 'set' command with the 'ex' (expire) parameter to automatically handle the TTL.
-        self.redis_client.set(workflow_id, state_json, ex=ttl_seconds)
-        
-        print(f"--- TOOL: Saved workflow state to Redis with ID: {workflow_id} (TTL: {ttl_seconds}s) ---")
+
+        # Serialize the Pydantic models into the binary envelope for storage.
+        values = {workflow_id: encode_model(resume_data)}
+        if workflow_state is not None:
+            values[self._workflow_state_key(workflow_id)] = encode_model(workflow_state)
+
+        # Every key carries the TTL, locally and in Redis.
+        with tracer.start_span("redis.save_state", attributes={"workflow.id": workflow_id, "state.bytes": sum(map(len, values.values()))}) as span:
+            stored_remotely = await self._write(values, ttl_seconds, "save workflow state")
+            span.set_attribute("state.degraded", not stored_remotely)
+
+        logger.debug("Saved workflow state with ID %s (TTL: %ss)", workflow_id, ttl_seconds)
         return workflow_id
 
-    def load_state(self, workflow_id: str) -> FinalResumeSections:
+    async def load_state(self, workflow_id: str) -> FinalResumeSections:
         """
-        Retrieves and reconstructs the resume data from Redis using a workflow ID.
+        Retrieves and reconstructs the resume data using a workflow ID.
 
         Args:
             workflow_id: The unique ID of the workflow run, previously returned by save_state.
 
         Returns:
             A FinalResumeSections Pydantic model instance.
-            
+
         Raises:
-            ConnectionError: If the Redis client is not connected.
-            FileNotFoundError: If the workflow_id does not exist in Redis or has expired.
+            ConnectionError: If the run is not cached locally and Redis is not reachable.
+            FileNotFoundError: If the workflow_id does not exist or has expired.
         """
-        if not self.redis_client:
-            raise ConnectionError("Redis service is not available. Cannot load workflow state.")
+        with tracer.start_span("redis.load_state", attributes={"workflow.id": workflow_id}):
+            payload, = await self._read([workflow_id], "load workflow state")
 
-        # Retrieve the JSON string from Redis.
-        state_json = self.redis_client.get(workflow_id)
-        
-        # If the key doesn't exist (or has expired), Redis returns None.
-        if not state_json:
+        # If the key doesn't exist (or has expired), the lookup returns None.
+        if not payload:
             raise FileNotFoundError(f"Workflow ID '{workflow_id}' not found in Redis or has expired.")
-        
-        print(f"--- TOOL: Loaded workflow state from Redis for ID: {workflow_id} ---")
-        
-        # Deserialize the JSON string and use Pydantic to parse and validate it back into a model instance.
-        # This is a critical validation step.
-        return FinalResumeSections(**json.loads(state_json))
-    
+
+        logger.debug("Loaded workflow state for ID %s", workflow_id)
+
+        # Decode straight into the Pydantic model, which validates it. This is a critical validation step.
+        return decode_model(payload, FinalResumeSections)
+
+    async def load_workflow_state(self, workflow_id: str) -> OptimizerWorkflowState:
+        """
+        Retrieves the complete OptimizerWorkflowState stored alongside a run.
+
+        Raises:
+            ConnectionError: If the run is not cached locally and Redis is not reachable.
+            FileNotFoundError: If the run does not exist, has expired, or was saved without its full state.
+        """
+        with tracer.start_span("redis.load_workflow_state", attributes={"workflow.id": workflow_id}):
+            payload, = await self._read([self._workflow_state_key(workflow_id)], "load workflow state")
+
+        if not payload:
+            raise FileNotFoundError(f"Full workflow state for ID '{workflow_id}' not found in Redis or has expired.")
+
+        return decode_model(payload, OptimizerWorkflowState)
+
+    @staticmethod
+    def _artifact_key(workflow_id: str) -> str:
+        """The Redis key under which the rendered PDF of a workflow is stored."""
+        return f"{workflow_id}:pdf"
+
+    async def _remaining_ttl_seconds(self, workflow_id: str) -> float:
+        """The remaining lifetime of a run's state, from L1 when it holds the authoritative copy."""
+        if workflow_id in self._pending or self._redis_down or not self.redis_client:
+            return self.local.ttl_remaining(workflow_id) or 0.0
+        async with _redis_errors("save workflow artifact"):
+            remaining_ms = await self.redis_client.pttl(workflow_id)
+        return remaining_ms / 1000 if remaining_ms > 0 else 0.0
+
+    async def save_artifact(self, workflow_id: str, pdf_bytes: bytes) -> None:
+        """
+        Stores the rendered PDF next to the workflow state, expiring with it.
+
+        The artifact inherits the remaining TTL of the state key, so both
+        disappear together. Nothing is stored if the state has already expired.
+        """
+        with tracer.start_span("redis.save_artifact", attributes={"workflow.id": workflow_id, "artifact.bytes": len(pdf_bytes)}):
+            try:
+                remaining_seconds = await self._remaining_ttl_seconds(workflow_id)
+            except ConnectionError:
+                self._redis_down = True
+                remaining_seconds = self.local.ttl_remaining(workflow_id) or 0.0
+            if remaining_seconds <= 0:
+                logger.info("Workflow %s expired before its PDF could be stored", workflow_id)
+                return
+            await self._write({self._artifact_key(workflow_id): pdf_bytes}, remaining_seconds, "save workflow artifact")
+
+        logger.debug("Saved pre-rendered PDF for ID %s (%d bytes)", workflow_id, len(pdf_bytes))
+
+    async def load_state_with_artifact(self, workflow_id: str) -> Tuple[FinalResumeSections, Optional[bytes]]:
+        """
+        Retrieves the resume data and, if present, its pre-rendered PDF.
+
+        Both come from L1 when cached; otherwise the misses are fetched in a single round trip.
+
+        Returns:
+            A tuple of the FinalResumeSections model and the PDF bytes, or None
+            if no artifact has been rendered yet.
+
+        Raises:
+            ConnectionError: If the run is not cached locally and Redis is not reachable.
+            FileNotFoundError: If the workflow_id does not exist or has expired.
+        """
+        with tracer.start_span("redis.load_state_with_artifact", attributes={"workflow.id": workflow_id}):
+            payload, pdf_bytes = await self._read([workflow_id, self._artifact_key(workflow_id)], "load workflow state")
+
+        if not payload:
+            raise FileNotFoundError(f"Workflow ID '{workflow_id}' not found in Redis or has expired.")
+
+        return decode_model(payload, FinalResumeSections), pdf_bytes
@@ -1,16 +1,105 @@
 # main.py
-from fastapi import FastAPI
+import time
+import uuid
+import logging
+import asyncio
+from contextlib import asynccontextmanager
+from dotenv import load_dotenv
+from fastapi import FastAPI, Request
 import uvicorn
 
+logger = logging.getLogger(__name__)
+
+# Load the .env file once per process, before any module reads its configuration.
+load_dotenv()
+
+from backend.core.tools.structured_logging import bind_request_id, configure_logging, reset_request_id
+
+# Log records are queued and written by a background thread from here on.
+configure_logging()
+
 from .core.apis.analysis_router import router as  analysis_router
 from backend.core.apis.optimizer_router import router as optimizer_router
+from backend.core.apis.cohort_router import router as cohort_router
+from backend.core.apis.jobs_router import router as jobs_router
+from backend.core.tools.tracing import tracer, parse_traceparent, format_traceparent
+from backend.core.tools.metrics import metrics
+from backend.core.tools.single_flight import SingleFlight
+from backend.core.tools.upload_limits import BodySizeLimitMiddleware
+from backend.core.tools.warmup import warm_up, warmup_mode
+from backend.core.tools.workflow_state_manager import WorkflowStateManager, create_redis_pool
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Creates process-wide resources once per worker: the async Redis pool and
+    the two-tier WorkflowStateManager on top of it. Connectivity is checked
+    once here instead of on every request; a failure is logged, the API still
+    starts in degraded mode, and a background task replays buffered writes
+    once Redis is reachable.
+
+    The heavy agent subsystems are imported lazily; depending on
+    STARTUP_WARMUP they are warmed in a worker thread before (blocking) or
+    right after (background) the worker starts serving.
+    """
+    redis_pool = create_redis_pool()
+    state_manager = app.state.state_manager = WorkflowStateManager(redis_pool)
+    if await state_manager.ping():
+        logger.info("Connected to Redis")
+    replayer = asyncio.create_task(state_manager.run_replayer())
+    app.state.single_flight = SingleFlight(state_manager.redis_client)
+
+    mode = warmup_mode()
+    if mode == "blocking":
+        await asyncio.to_thread(warm_up)
+    elif mode == "background":
+        app.state.warmup = asyncio.create_task(asyncio.to_thread(warm_up))
+    yield
+    replayer.cancel()
+    await redis_pool.aclose()
 
 app = FastAPI(
+    lifespan=lifespan,
     title="ResumeCraft.ai",
     description="An AI-powered service to generate a holistic analysis of resumes.",
     version="1.0.0"
 )
 
+# Cap upload sizes before the multipart body is parsed.
+app.add_middleware(BodySizeLimitMiddleware, paths=["/api/v1/analyze", "/api/v1/jobs/match"])
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """
+    Opens the root span for every HTTP request. An incoming W3C `traceparent`
+    header is continued, and the trace id is echoed back so a client can
+    look up the spans of a slow request.
+
+    The request is also given an id (the caller's `X-Request-ID`, or a new
+    one) that every log record written while handling it carries, and one
+    access record with its status and duration is logged when it finishes.
+    """
+    request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
+    token = bind_request_id(request_id)
+    started = time.perf_counter()
+    attributes = {"http.method": request.method, "http.route": request.url.path}
+    parent = parse_traceparent(request.headers.get("traceparent"))
+    try:
+        with tracer.start_span(f"{request.method} {request.url.path}", attributes=attributes, parent=parent) as span:
+            response = await call_next(request)
+            span.set_attribute("http.status_code", response.status_code)
+            response.headers["traceparent"] = format_traceparent(span)
+            response.headers["X-Request-ID"] = request_id
+            logger.info("%s %s %d", request.method, request.url.path, response.status_code, extra={
+                "http_method": request.method,
+                "http_path": request.url.path,
+                "http_status": response.status_code,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            })
+            return response
+    finally:
+        reset_request_id(token)
+
 # Include the router that contains our /analyze endpoint
 app.include_router(
     analysis_router, 
@@ -23,11 +112,28 @@ app.include_router(
     tags=["Optimizer"]
 )
 
+app.include_router(
+    cohort_router,
+    prefix="/api/v1",
+    tags=["Analytics"]
+)
+
+app.include_router(
+    jobs_router,
+    prefix="/api/v1",
+    tags=["Jobs"]
+)
+
 @app.get("/", tags=["Root"])
 async def read_root():
     """A simple health check endpoint."""
     return {"message": "Career Co-Pilot API is running."}
 
+@app.get("/metrics", tags=["Root"])
+async def read_metrics():
+    """Returns a JSON snapshot of the in-process metrics (queue depths, latencies, counters)."""
+    return metrics.snapshot()
+
 # This allows running the server directly using `python main.py`
 if __name__ == "__main__":
     uvicorn.run( 
@@ -0,0 +1,54 @@
+import os
+
+import fakeredis
+import pytest
+
+from backend.core.data_models import (
+    ContextOutput, FinalResumeSections, OptimizerWorkflowState, ResearchOutput, ReviewerOutput, StrategyOutput,
+)
+
+# The services check for a key at construction; no test talks to Gemini.
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+
+@pytest.fixture
+def redis_server():
+    """An in-memory Redis server; set `connected = False` to simulate an outage."""
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def async_redis(redis_server):
+    return fakeredis.FakeAsyncRedis(server=redis_server)
+
+
+@pytest.fixture
+def resume_sections():
+    return FinalResumeSections(
+        summary="Backend engineer with seven years of Python.",
+        experience="* Built payment services handling 2k requests per second.",
+        projects="* Open-source rate limiter.",
+        skills="Python, Go, Kubernetes, PostgreSQL",
+        education="* BSc Computer Science",
+    )
+
+
+@pytest.fixture
+def workflow_state(resume_sections):
+    """A finished optimizer run: every node's output is present."""
+    return OptimizerWorkflowState(
+        job_description="Acme is hiring a backend engineer to build Python services on Kubernetes.",
+        job_role="Backend Engineer",
+        company_name="Acme",
+        context=ContextOutput(
+            role="Backend Engineer", company="Acme", skills=["Python", "Kubernetes"],
+            responsibilities=["Build services"], tone="technical", experience_level="mid-senior",
+            boolean_search_string="python AND kubernetes",
+        ),
+        research=ResearchOutput(company_style="direct", mission_focus=["reliability"], key_phrases=["ship fast"]),
+        strategy=StrategyOutput(sections=["summary", "experience"], priority_order=["experience"],
+                                guidelines=["Quantify impact"], tone_of_voice="confident"),
+        draft_resume_text="draft",
+        optimized_resume_text="optimized",
+        final_report=ReviewerOutput(final_resume=resume_sections, readability_score=0.8),
+    )
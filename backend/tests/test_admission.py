@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from backend.core.tools.admission import AdmissionController, AdmissionRejectedError
+
+
+def test_slot_is_released_when_the_request_fails():
+    async def main():
+        controller = AdmissionController("test_release", max_concurrency=1, max_queue=0, max_wait_seconds=1)
+        with pytest.raises(RuntimeError):
+            async with controller.admit():
+                raise RuntimeError("handler failed")
+        # The only slot is free again, so the next request is admitted at once.
+        async with controller.admit():
+            pass
+
+    asyncio.run(main())
+
+
+def test_full_queue_is_rejected_with_429():
+    async def main():
+        controller = AdmissionController("test_queue", max_concurrency=1, max_queue=1, max_wait_seconds=5)
+        running = asyncio.Event()
+        release = asyncio.Event()
+
+        async def hold():
+            async with controller.admit():
+                running.set()
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await running.wait()
+        waiter = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejectedError) as rejected:
+            async with controller.admit():
+                pass
+        release.set()
+        await asyncio.gather(holder, waiter)
+        return rejected.value
+
+    error = asyncio.run(main())
+    assert error.status_code == 429
+    assert error.retry_after_seconds >= 1
+
+
+def test_request_waiting_past_the_deadline_is_rejected_with_503():
+    async def main():
+        controller = AdmissionController("test_deadline", max_concurrency=1, max_queue=4, max_wait_seconds=0.05)
+        release = asyncio.Event()
+
+        async def hold():
+            async with controller.admit():
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejectedError) as rejected:
+            async with controller.admit():
+                pass
+        release.set()
+        await holder
+        assert controller._waiting == 0
+        return rejected.value
+
+    assert asyncio.run(main()).status_code == 503
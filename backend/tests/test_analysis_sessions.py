@@ -0,0 +1,59 @@
+import pytest
+
+from backend.core.tools.analysis_sessions import (
+    LAYOUT_CATEGORIES, AnalysisSessionStore, AnalysisSnapshot, changed_sections, resume_signature, revision_categories,
+)
+
+SECTIONS = {
+    "summary": "Backend engineer with seven years of Python and Go experience building payment systems.",
+    "experience": "Acme 2019-2024: built payment services handling two thousand requests per second, "
+                  "led the migration to Kubernetes, and cut infrastructure cost by thirty percent.",
+    "skills": "Python, Go, Kubernetes, PostgreSQL, Kafka, AWS",
+    "education": "BSc Computer Science, State University",
+}
+
+
+def _text(sections) -> str:
+    return "\n".join(f"{name.upper()}\n{body}" for name, body in sections.items())
+
+
+@pytest.fixture
+def previous():
+    return AnalysisSnapshot(
+        job_role="Backend Engineer", resume_text=_text(SECTIONS), sections=dict(SECTIONS), page_count=1,
+        persona_json="{}", evaluation={}, signature=resume_signature(_text(SECTIONS)),
+    )
+
+
+def test_changed_sections_ignore_whitespace():
+    assert changed_sections({"a": "x  y", "b": "z"}, {"a": "x y", "c": "w"}) == {"b", "c"}
+
+
+def test_editing_one_section_re_scores_only_its_categories(previous):
+    sections = dict(SECTIONS, skills="Python, Go, Kubernetes, PostgreSQL, Kafka, AWS, Terraform")
+    assert revision_categories(previous, "backend engineer", _text(sections), sections, 1) == ["ats", "relevance", "skills"]
+
+
+def test_unchanged_resume_needs_no_evaluation(previous):
+    assert revision_categories(previous, "Backend Engineer", previous.resume_text + "\n", dict(SECTIONS), 1) == []
+
+
+def test_layout_changes_re_score_structure(previous):
+    sections = dict(SECTIONS, skills="Python, Go, Kubernetes, PostgreSQL, Kafka, AWS, Terraform")
+    categories = revision_categories(previous, "Backend Engineer", _text(sections), sections, 2)
+    assert LAYOUT_CATEGORIES <= set(categories)
+
+
+def test_different_role_or_resume_needs_a_full_analysis(previous):
+    assert revision_categories(previous, "Data Scientist", previous.resume_text, dict(SECTIONS), 1) is None
+    other = {name: f"Completely different {name} content about marketing campaigns." for name in SECTIONS}
+    assert revision_categories(previous, "Backend Engineer", _text(other), other, 1) is None
+
+
+def test_store_keeps_the_latest_snapshot_per_session(previous):
+    store = AnalysisSessionStore(max_entries=2)
+    store.put("a", previous)
+    store.put("b", previous)
+    store.put("c", previous)
+    assert store.get("a") is None
+    assert store.get("c") is previous
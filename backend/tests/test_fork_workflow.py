@@ -0,0 +1,83 @@
+import pytest
+
+from backend.core.services.resume_optimizer_service import NODE_ORDER, NODE_OUTPUTS, ResumeOptimizerService
+
+
+@pytest.fixture
+def service(workflow_state):
+    """The optimizer with every agent replaced by a stub that records its calls."""
+    service = ResumeOptimizerService.__new__(ResumeOptimizerService)
+    service.calls = []
+    service.seen = {}
+
+    def stub(name):
+        def node(state):
+            service.calls.append(name)
+            service.seen[name] = state
+            if name == "builder":
+                return {"draft_resume_text": f"draft in a {state.strategy.tone_of_voice} tone"}
+            return {NODE_OUTPUTS[name]: getattr(workflow_state, NODE_OUTPUTS[name])}
+        return node
+
+    service.nodes = {name: stub(name) for name in NODE_ORDER}
+    service._graphs = {}
+    return service
+
+
+def test_fork_runs_only_the_downstream_nodes(service, workflow_state):
+    forked = service.fork_workflow(workflow_state, "builder", {"strategy.tone_of_voice": "formal"})
+    assert service.calls == ["builder", "optimizer", "reviewer"]
+    assert forked.draft_resume_text == "draft in a formal tone"
+    assert forked.context == workflow_state.context
+
+
+def test_company_override_is_carried_into_the_reused_context(service, workflow_state):
+    service.fork_workflow(workflow_state, "researcher", {"company_name": "Globex"})
+    assert service.seen["researcher"].context.company == "Globex"
+
+
+def test_regenerated_fields_cannot_be_overridden(service, workflow_state):
+    with pytest.raises(ValueError, match="regenerated"):
+        service.fork_workflow(workflow_state, "builder", {"draft_resume_text": "mine"})
+    assert service.calls == []
+
+
+def test_inputs_no_forked_node_reads_are_rejected(service, workflow_state):
+    with pytest.raises(ValueError, match="Fork from 'context_extractor'"):
+        service.fork_workflow(workflow_state, "strategist", {"job_description": "A different posting."})
+    service.fork_workflow(workflow_state, "context_extractor", {"job_description": "A different posting."})
+    assert service.seen["context_extractor"].job_description == "A different posting."
+
+
+@pytest.mark.parametrize("overrides", [{"strategy.unknown": "x"}, {"nope": 1}])
+def test_unknown_fields_are_rejected(service, workflow_state, overrides):
+    with pytest.raises(ValueError, match="Unknown field"):
+        service.fork_workflow(workflow_state, "builder", overrides)
+
+
+def test_invalid_values_and_nodes_are_rejected(service, workflow_state):
+    with pytest.raises(ValueError, match="valid workflow state"):
+        service.fork_workflow(workflow_state, "builder", {"strategy.sections": "not a list"})
+    with pytest.raises(ValueError, match="Unknown node"):
+        service.fork_workflow(workflow_state, "editor", {})
+
+
+def test_parent_must_have_the_upstream_outputs(service, workflow_state):
+    incomplete = workflow_state.model_copy(update={"strategy": None})
+    with pytest.raises(ValueError, match="no 'strategy' output"):
+        service.fork_workflow(incomplete, "builder", {})
+
+
+def test_forks_reuse_the_compiled_graph(service, workflow_state):
+    service.fork_workflow(workflow_state, "builder", {})
+    graph = service._graphs["builder"]
+    service.fork_workflow(workflow_state, "builder", {})
+    assert service._graph_from("builder") is graph
+
+
+def test_requests_share_one_optimizer_service(monkeypatch):
+    from backend.core.apis import optimizer_router
+
+    monkeypatch.setattr(optimizer_router, "ResumeOptimizerService", object)
+    monkeypatch.setattr(optimizer_router, "_optimizer_service", None)
+    assert optimizer_router.get_optimizer_service() is optimizer_router.get_optimizer_service()
@@ -0,0 +1,59 @@
+import pytest
+
+from backend.core.tools import jd_fingerprint_index
+from backend.core.tools.jd_fingerprint_index import JDFingerprintIndex, normalize_job_description
+
+POSTING = """
+Acme is hiring a Senior Backend Engineer to design Python services on Kubernetes.
+You will own our payments API and mentor two engineers.
+Experience with PostgreSQL, Kafka and AWS is required.
+Apply at https://jobs.acme.com/123?utm_source=board.
+Acme is an equal opportunity employer.
+"""
+
+
+@pytest.fixture
+def context(workflow_state):
+    return workflow_state.context
+
+
+def test_normalization_drops_urls_and_boilerplate():
+    lines = normalize_job_description(POSTING)
+    assert not any("http" in line or "utm_source" in line for line in lines)
+    assert not any("equal opportunity" in line for line in lines)
+    assert any("payments API" in line for line in lines)
+
+
+def test_reordered_reposting_reuses_the_context(context):
+    index = JDFingerprintIndex(threshold=0.85)
+    index.add("Acme", POSTING, context)
+    reposted = "\n".join(reversed(POSTING.strip().splitlines())).replace("utm_source=board", "utm_source=mail")
+
+    match = index.lookup("  ACME ", reposted)
+    assert match is not None
+    reused, similarity = match
+    assert reused == context and similarity == 1.0
+
+
+def test_near_duplicate_matches_but_a_different_posting_does_not(context):
+    index = JDFingerprintIndex(threshold=0.6)
+    index.add("Acme", POSTING, context)
+    assert index.lookup("Acme", POSTING.replace("two engineers", "three engineers")) is not None
+    assert index.lookup("Acme", "Acme needs a product designer fluent in Figma and user research.") is None
+
+
+def test_postings_only_match_within_the_same_company(context):
+    index = JDFingerprintIndex()
+    index.add("Acme", POSTING, context)
+    assert index.lookup("Globex", POSTING) is None
+
+
+def test_entries_expire_and_are_bounded_per_company(context, monkeypatch):
+    index = JDFingerprintIndex(max_entries_per_company=1, ttl_seconds=60)
+    index.add("Acme", POSTING, context)
+    index.add("Acme", "Acme needs a product designer fluent in Figma and user research.", context)
+    assert index.lookup("Acme", POSTING) is None
+
+    now = jd_fingerprint_index.time.monotonic()
+    monkeypatch.setattr(jd_fingerprint_index.time, "monotonic", lambda: now + 120)
+    assert index.lookup("Acme", "Acme needs a product designer fluent in Figma and user research.") is None
@@ -0,0 +1,73 @@
+from backend.core.data_models import ContextOutput
+from backend.core.tools import job_match_index
+from backend.core.tools.job_match_index import JobMatchIndex, get_job_index, job_id_for
+
+
+def _context(role: str, skills, responsibilities) -> ContextOutput:
+    return ContextOutput(role=role, company="Acme", skills=skills, responsibilities=responsibilities,
+                         tone="technical", experience_level="mid", boolean_search_string="")
+
+
+def _index(tmp_path) -> JobMatchIndex:
+    index = JobMatchIndex(str(tmp_path / "jobs.jsonl"))
+    index.add("Acme", "Backend Engineer", "Build Python services on Kubernetes.",
+              _context("Backend Engineer", ["Python", "Kubernetes", "PostgreSQL"], ["Build APIs"]))
+    index.add("Globex", "Data Scientist", "Train machine learning models.",
+              _context("Data Scientist", ["Machine Learning", "Statistics"], ["Run experiments"]))
+    return index
+
+
+def test_resume_is_ranked_against_the_best_fitting_job(tmp_path):
+    results = _index(tmp_path).match("Senior engineer: Python, Kubernetes and PostgreSQL APIs.", top_k=2)
+    assert results[0]["job_role"] == "Backend Engineer"
+    assert results[0]["matched_skills"] == ["kubernetes", "postgresql", "python"]
+
+
+def test_saving_the_same_job_twice_indexes_it_once(tmp_path):
+    index = _index(tmp_path)
+    job_id = index.add("ACME ", "backend engineer", "Build  Python services on Kubernetes.",
+                       _context("Backend Engineer", ["Python"], []))
+    assert job_id == job_id_for("Acme", "Backend Engineer", "Build Python services on Kubernetes.")
+    assert len(index) == 2
+
+
+def test_other_workers_pick_up_saved_jobs(tmp_path):
+    _index(tmp_path)
+    other_worker = JobMatchIndex(str(tmp_path / "jobs.jsonl"))
+    assert [job["job_role"] for job in other_worker.match("machine learning statistics")] == ["Data Scientist"]
+
+
+def test_match_can_be_restricted_to_given_jobs(tmp_path):
+    index = _index(tmp_path)
+    data_scientist = job_id_for("Globex", "Data Scientist", "Train machine learning models.")
+    results = index.match("Python Kubernetes machine learning", job_ids=[data_scientist])
+    assert [job["job_id"] for job in results] == [data_scientist]
+
+
+def test_empty_index_matches_nothing(tmp_path):
+    assert JobMatchIndex(str(tmp_path / "none.jsonl")).match("Python") == []
+
+
+def test_tenants_only_match_their_own_jobs(tmp_path, monkeypatch):
+    monkeypatch.setenv("JOB_INDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(job_match_index, "_job_indexes", type(job_match_index._job_indexes)())
+    get_job_index("tenant-a").add("Acme", "Backend Engineer", "Build Python services.",
+                                  _context("Backend Engineer", ["Python"], []))
+    assert get_job_index("tenant-b").match("Python backend services") == []
+    assert len(get_job_index("tenant-a")) == 1
+
+
+def test_file_is_compacted_to_the_newest_jobs(tmp_path):
+    path = str(tmp_path / "jobs.jsonl")
+    index = JobMatchIndex(path, max_jobs=4)
+    for n in range(5):
+        index.add("Acme", f"Engineer {n}", f"Job number {n}.", _context("Engineer", [f"skill{n}"], []))
+    assert len(index) == 5  # Within the slack above max_jobs.
+    index.add("Acme", "Engineer 5", "Job number 5.", _context("Engineer", ["skill5"], []))
+    assert sorted(job["job_role"] for job in index._jobs.values()) == [f"Engineer {n}" for n in range(2, 6)]
+    with open(path) as f:
+        assert len(f.readlines()) == 4
+
+    other_worker = JobMatchIndex(path, max_jobs=4)
+    other_worker.refresh()
+    assert len(other_worker) == 4
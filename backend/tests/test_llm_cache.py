@@ -0,0 +1,69 @@
+import threading
+import time
+
+import pytest
+
+from backend.core.data_models import ResearchOutput
+from backend.core.tools.llm_cache import LLMResponseCache, cache_key
+
+
+def test_cache_key_covers_model_temperature_schema_and_prompt():
+    base = cache_key("gemini-2.5-flash", 0, "prompt")
+    assert base == cache_key("gemini-2.5-flash", 0, "prompt")
+    assert base != cache_key("gemini-2.5-pro", 0, "prompt")
+    assert base != cache_key("gemini-2.5-flash", 0.2, "prompt")
+    assert base != cache_key("gemini-2.5-flash", 0, "prompt", ResearchOutput)
+
+
+def test_concurrent_identical_calls_reach_the_provider_once():
+    cache = LLMResponseCache()
+    calls = []
+
+    def call():
+        calls.append(1)
+        time.sleep(0.05)
+        return "answer", 10
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_call("k", call))) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(hit for _, hit in results) == [False] + [True] * 9
+    assert all(result == "answer" for result, _ in results)
+    assert cache._key_locks == {}
+
+
+def test_failed_calls_are_not_cached_and_free_their_lock():
+    cache = LLMResponseCache()
+
+    def failing():
+        raise TimeoutError("provider timed out")
+
+    with pytest.raises(TimeoutError):
+        cache.get_or_call("k", failing)
+    assert cache._key_locks == {}
+    assert cache.get_or_call("k", lambda: ("answer", 1)) == ("answer", False)
+
+
+def test_structured_hits_are_fresh_instances():
+    cache = LLMResponseCache()
+    research = ResearchOutput(company_style="direct", mission_focus=["reliability"], key_phrases=["ship fast"])
+    cache.get_or_call("k", lambda: (research, 5), ResearchOutput)
+
+    first, hit = cache.get_or_call("k", lambda: pytest.fail("should be cached"), ResearchOutput)
+    first.key_phrases.append("mutated")
+    second, _ = cache.get_or_call("k", lambda: pytest.fail("should be cached"), ResearchOutput)
+    assert hit and second == research
+
+
+def test_enabled_for_respects_global_and_per_agent_switches(monkeypatch):
+    cache = LLMResponseCache()
+    monkeypatch.setenv("LLM_CACHE_DISABLED_AGENTS", "researcher")
+    assert cache.enabled_for("strategist")
+    assert not cache.enabled_for("researcher")
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "0")
+    assert not cache.enabled_for("strategist")
@@ -0,0 +1,118 @@
+import threading
+import time
+
+import pytest
+
+from backend.core.tools import llm_scheduler
+from backend.core.tools.llm_hedging import RequestHedger
+from backend.core.tools.llm_scheduler import LLMScheduler
+from backend.core.tools.metrics import metrics
+from backend.core.tools.tracing import tracer
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    monkeypatch.setenv("LLM_HEDGE_ENABLED", "1")
+    scheduler = LLMScheduler(default_concurrency=4, interactive_reserve=0)
+    monkeypatch.setattr(llm_scheduler, "_scheduler", scheduler)
+    return scheduler
+
+
+def _seed_latency(model: str, latency_ms: float = 1.0, samples: int = 5) -> None:
+    for _ in range(samples):
+        metrics.histogram(f"llm.latency_ms.{model}").observe(latency_ms)
+
+
+def _wait_until_idle(scheduler: LLMScheduler, model: str) -> None:
+    deadline = time.monotonic() + 2
+    while scheduler._queue(model).in_flight:
+        assert time.monotonic() < deadline, "a slot was never released"
+        time.sleep(0.005)
+
+
+def test_not_hedged_until_enough_latencies_are_known(scheduler):
+    hedger = RequestHedger(min_samples=5, min_delay_ms=1, budget=1, burst=1)
+    assert hedger.hedge_delay_ms("hedge-cold") is None
+    _seed_latency("hedge-cold", 40.0)
+    assert hedger.hedge_delay_ms("hedge-cold") == pytest.approx(40.0, rel=0.1)
+
+
+def test_exhausted_budget_skips_the_hedge(scheduler):
+    model = "hedge-budget"
+    _seed_latency(model)
+    hedger = RequestHedger(min_samples=1, min_delay_ms=1, budget=0, burst=0)
+    skipped = metrics.counter("llm.hedge.budget_exhausted").value
+    calls = []
+
+    def slow():
+        calls.append(threading.current_thread().name)
+        time.sleep(0.05)
+        return "primary"
+
+    assert hedger.run(model, slow) == "primary"
+    assert len(calls) == 1
+    assert metrics.counter("llm.hedge.budget_exhausted").value == skipped + 1
+    _wait_until_idle(scheduler, model)
+
+
+def test_hedge_answers_when_the_primary_stalls(scheduler):
+    model = "hedge-win"
+    _seed_latency(model)
+    hedger = RequestHedger(min_samples=1, min_delay_ms=1, budget=1, burst=1)
+    wins = metrics.counter("llm.hedge.wins").value
+    attempts = []
+    lock = threading.Lock()
+
+    def request():
+        with lock:
+            attempts.append(1)
+            first = len(attempts) == 1
+        time.sleep(0.3 if first else 0.01)
+        return "primary" if first else "hedge"
+
+    with tracer.start_span("llm.invoke") as span:
+        assert hedger.run(model, request, span) == "hedge"
+    assert span.attributes["llm.hedge.winner"] == "hedge"
+    assert metrics.counter("llm.hedge.wins").value == wins + 1
+    _wait_until_idle(scheduler, model)
+
+
+def test_only_the_winners_usage_reaches_the_call_span(scheduler):
+    model = "hedge-usage"
+    _seed_latency(model)
+    hedger = RequestHedger(min_samples=1, min_delay_ms=1, budget=1, burst=1)
+    attempts = []
+    lock = threading.Lock()
+
+    def request():
+        with lock:
+            attempts.append(1)
+            first = len(attempts) == 1
+        time.sleep(0.3 if first else 0.01)
+        tracer.current_span().set_attribute("gen_ai.usage.total_tokens", 100 if first else 7)
+        return "primary" if first else "hedge"
+
+    with tracer.start_span("llm.invoke") as span:
+        hedger.run(model, request, span)
+    _wait_until_idle(scheduler, model)
+    assert span.attributes["gen_ai.usage.total_tokens"] == 7
+
+
+def test_slot_is_released_when_every_attempt_fails(scheduler):
+    model = "hedge-error"
+    hedger = RequestHedger(min_samples=1, min_delay_ms=1, budget=1, burst=1)
+
+    def failing():
+        raise ConnectionResetError("provider dropped the connection")
+
+    with pytest.raises(ConnectionResetError):
+        hedger.run(model, failing)
+    _wait_until_idle(scheduler, model)
+
+
+def test_disabled_hedging_runs_inline_under_a_slot(scheduler, monkeypatch):
+    monkeypatch.setenv("LLM_HEDGE_ENABLED", "0")
+    hedger = RequestHedger()
+    caller = threading.current_thread()
+    assert hedger.run("hedge-off", lambda: threading.current_thread() is caller)
+    assert scheduler._queue("hedge-off").in_flight == 0
@@ -0,0 +1,87 @@
+import threading
+import time
+
+import pytest
+
+from backend.core.tools.llm_scheduler import LLMScheduler, Priority, scheduling, tenant_weight
+
+
+def _wait_for_queue(scheduler: LLMScheduler, model: str, depth: int) -> None:
+    deadline = time.monotonic() + 2
+    while len(scheduler._queue(model).heap) < depth:
+        assert time.monotonic() < deadline, "callers never queued"
+        time.sleep(0.001)
+
+
+def test_slot_is_released_when_the_call_fails():
+    scheduler = LLMScheduler(default_concurrency=1, interactive_reserve=0)
+    with pytest.raises(RuntimeError):
+        with scheduler.slot("model"):
+            raise RuntimeError("provider error")
+    assert scheduler._queue("model").in_flight == 0
+    with scheduler.slot("model") as waited_ms:
+        assert waited_ms < 100
+
+
+def test_interactive_calls_are_served_before_queued_batch_calls():
+    scheduler = LLMScheduler(default_concurrency=1, interactive_reserve=0)
+    order = []
+
+    def call(priority: Priority, name: str):
+        with scheduling(priority, tenant=name):
+            with scheduler.slot("model"):
+                order.append(name)
+
+    scheduler.acquire("model")
+    batch = threading.Thread(target=call, args=(Priority.BATCH, "batch"))
+    batch.start()
+    _wait_for_queue(scheduler, "model", 1)
+    interactive = threading.Thread(target=call, args=(Priority.INTERACTIVE, "interactive"))
+    interactive.start()
+    _wait_for_queue(scheduler, "model", 2)
+
+    scheduler.release("model")
+    batch.join()
+    interactive.join()
+    assert order == ["interactive", "batch"]
+
+
+def test_interactive_reserve_keeps_a_slot_for_interactive_calls():
+    scheduler = LLMScheduler(default_concurrency=2, interactive_reserve=1)
+    scheduler.acquire("model")
+    with scheduling(Priority.BATCH):
+        assert not scheduler.try_acquire("model")
+    with scheduling(Priority.INTERACTIVE):
+        assert scheduler.try_acquire("model")
+
+
+def test_try_acquire_never_jumps_the_queue():
+    scheduler = LLMScheduler(default_concurrency=2, interactive_reserve=1)
+    scheduler.acquire("model")
+    # A batch call queues behind the reserved slot, which stays free.
+    waiter = threading.Thread(target=scheduler.acquire, args=("model",))
+    waiter.start()
+    _wait_for_queue(scheduler, "model", 1)
+
+    with scheduling(Priority.INTERACTIVE):
+        assert not scheduler.try_acquire("model")
+    scheduler.release("model")
+    waiter.join()
+    scheduler.release("model")
+    assert scheduler._queue("model").in_flight == 0
+
+
+def test_tenant_weights_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv("LLM_TENANT_WEIGHTS", "acme=2, free=0.5")
+    assert tenant_weight("acme") == 2.0
+    assert tenant_weight("free") == 0.5
+    assert tenant_weight("other") == 1.0
+
+
+def test_idle_tenants_are_forgotten():
+    scheduler = LLMScheduler(default_concurrency=1)
+    for tenant in ("a", "b", "c"):
+        with scheduling(Priority.INTERACTIVE, tenant=tenant):
+            scheduler.acquire("model")
+            scheduler.release("model")
+    assert scheduler._queue("model").tenant_finish == {}
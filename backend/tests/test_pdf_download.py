@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.core.apis.optimizer_router import get_render_cache, get_state_manager
+from backend.core.tools.pdf_renderer import TypstRenderer, get_renderer
+from backend.core.tools.render_cache import PdfRenderCache
+from backend.core.tools.typst_backends import TypstCompileError
+from backend.core.tools.workflow_state_manager import WorkflowStateManager
+from backend.main import app
+
+
+@pytest.fixture
+def state_manager(async_redis):
+    return WorkflowStateManager(async_redis.connection_pool)
+
+
+@pytest.fixture
+def client(state_manager):
+    app.dependency_overrides[get_state_manager] = lambda: state_manager
+    app.dependency_overrides[get_render_cache] = PdfRenderCache
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_typst_errors_are_500_without_routing_hints(client, state_manager, resume_sections, monkeypatch):
+    async def broken_template(self, resume_data):
+        raise TypstCompileError("Typst compilation failed on the server.")
+
+    monkeypatch.setattr(TypstRenderer, "render_to_pdf_async", broken_template)
+    workflow_id = asyncio.run(state_manager.save_state(resume_sections))
+
+    response = client.get(f"/api/v1/optimizer/download-pdf/{workflow_id}")
+    assert response.status_code == 500
+    assert "X-Served-By" not in response.headers
+
+
+def test_unreachable_state_is_503_with_routing_hints(client, redis_server):
+    redis_server.connected = False
+    response = client.get("/api/v1/optimizer/download-pdf/some-run")
+    assert response.status_code == 503
+    assert response.headers["X-State-Degraded"] == "1"
+
+
+def test_pre_rendered_pdf_is_served_with_an_etag(client, state_manager, resume_sections):
+    async def save():
+        workflow_id = await state_manager.save_state(resume_sections)
+        await state_manager.save_artifact(workflow_id, b"%PDF-1.7 stored")
+        return workflow_id
+
+    workflow_id = asyncio.run(save())
+    response = client.get(f"/api/v1/optimizer/download-pdf/{workflow_id}")
+    assert response.content == b"%PDF-1.7 stored"
+    revalidated = client.get(f"/api/v1/optimizer/download-pdf/{workflow_id}",
+                             headers={"If-None-Match": response.headers["ETag"]})
+    assert revalidated.status_code == 304
+
+
+def test_renderer_and_template_hash_are_built_once(monkeypatch):
+    renderer = get_renderer()
+    monkeypatch.setattr("builtins.open", None)  # Any re-read of the template would fail.
+    assert get_renderer() is renderer
+    assert renderer.template_version() == get_renderer().template_version()
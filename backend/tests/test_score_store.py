@@ -0,0 +1,83 @@
+import pytest
+
+from backend.core.data_models import CategoryScores
+from backend.core.tools.score_store import ScoreStore, canonical_role
+
+
+def _report(category_score: float) -> dict:
+    return {
+        "overall_score": category_score * 10,
+        "category_scores": {name: category_score for name in CategoryScores.model_fields},
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ScoreStore(str(tmp_path))
+
+
+def test_roles_are_canonicalised_into_cohorts():
+    assert canonical_role("Senior Backend Engineer II") == canonical_role("backend engineer")
+    assert canonical_role("Lead") == "lead"
+
+
+def test_percentiles_count_ties_as_half(store):
+    for score in (2, 4, 6, 8):
+        store.append("Backend Engineer", _report(score))
+    report = store.percentiles("Sr. Backend Engineer", {"overall_score": 60, "skills": 9})
+    assert report["cohort_size"] == 4
+    assert report["metrics"]["overall_score"]["percentile"] == 62.5
+    assert report["metrics"]["skills"]["percentile"] == 100.0
+    assert report["metrics"]["ats"]["percentile"] is None
+    assert report["metrics"]["ats"]["cohort_quantiles"]["p50"] == 5.0
+
+
+def test_a_session_keeps_only_its_latest_revision(store):
+    store.append("Backend Engineer", _report(5), upload_sha256="v1", session_id="session")
+    store.append("Backend Engineer", _report(7), upload_sha256="v2", session_id="session")
+    report = store.percentiles("Backend Engineer", {"overall_score": 70})
+    assert report["cohort_size"] == 1
+    assert report["metrics"]["overall_score"]["percentile"] == 50.0
+
+
+def test_repeat_uploads_are_counted_once(store):
+    store.append("Backend Engineer", _report(5), upload_sha256="same-file")
+    store.append("Backend Engineer", _report(5), upload_sha256="same-file")
+    store.append("Backend Engineer", _report(5), upload_sha256="same-file", session_id="new-session")
+    store.append("Backend Engineer", _report(6), upload_sha256="other-file")
+    assert store.percentiles("Backend Engineer", {})["cohort_size"] == 2
+
+
+def test_rows_written_before_keys_existed_stay_in_the_cohort(store):
+    store.append("Backend Engineer", _report(3))
+    store.append("Backend Engineer", _report(3))
+    store.append("Backend Engineer", _report(5), upload_sha256="v1", session_id="session")
+    store.append("Backend Engineer", _report(6), upload_sha256="v2", session_id="session")
+    assert store.percentiles("Backend Engineer", {})["cohort_size"] == 3
+
+
+def test_another_process_sees_appended_rows(store, tmp_path):
+    store.percentiles("Backend Engineer", {})
+    ScoreStore(str(tmp_path)).append("Backend Engineer", _report(5))
+    assert store.percentiles("Backend Engineer", {})["cohort_size"] == 1
+
+
+def test_revisions_refresh_the_cohort_quantiles(store):
+    store.append("Backend Engineer", _report(5), upload_sha256="v1", session_id="session")
+    assert store.percentiles("Backend Engineer", {})["metrics"]["overall_score"]["cohort_quantiles"]["p50"] == 50.0
+    store.append("Backend Engineer", _report(7), upload_sha256="v2", session_id="session")
+    assert store.percentiles("Backend Engineer", {})["metrics"]["overall_score"]["cohort_quantiles"]["p50"] == 70.0
+
+
+def test_replacements_by_another_process_update_the_key_index(store, tmp_path):
+    store.append("Backend Engineer", _report(5), upload_sha256="v1", session_id="session")
+    ScoreStore(str(tmp_path)).append("Backend Engineer", _report(7), upload_sha256="v2", session_id="session")
+    store.append("Backend Engineer", _report(7), upload_sha256="v2", session_id="other-session")
+    assert store.percentiles("Backend Engineer", {})["cohort_size"] == 1
+    store.append("Backend Engineer", _report(5), upload_sha256="v1")
+    assert store.percentiles("Backend Engineer", {})["cohort_size"] == 2
+
+
+def test_incomplete_reports_are_rejected(store):
+    with pytest.raises(KeyError):
+        store.append("Backend Engineer", {"overall_score": 50, "category_scores": {}})
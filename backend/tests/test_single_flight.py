@@ -0,0 +1,98 @@
+import asyncio
+import json
+
+import pytest
+
+from backend.core.tools.single_flight import SingleFlight, request_key
+
+
+def _codec():
+    return dict(encode=lambda value: json.dumps(value).encode("utf-8"), decode=json.loads)
+
+
+def test_request_key_separates_parts():
+    assert request_key("analyze", "ab", "c") != request_key("analyze", "a", "bc")
+    assert request_key("analyze", "a", b"b") == request_key("analyze", "a", "b")
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"score": 7}
+
+    async def main():
+        flight = SingleFlight(None)
+        return await asyncio.gather(*(flight.run("k", compute, **_codec()) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert results == [{"score": 7}] * 5
+    assert len(calls) == 1
+
+
+def test_followers_receive_the_leaders_exception_and_the_key_is_freed():
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def succeeding():
+        return "ok"
+
+    async def main():
+        flight = SingleFlight(None)
+        results = await asyncio.gather(*(flight.run("k", failing, **_codec()) for _ in range(3)),
+                                       return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert await flight.run("k", succeeding, **_codec()) == "ok"
+
+    asyncio.run(main())
+    assert len(calls) == 1
+
+
+def test_workers_sharing_redis_run_the_computation_once(async_redis):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "result"
+
+    async def main():
+        # Two SingleFlight instances stand in for two worker processes.
+        first = SingleFlight(async_redis, poll_interval_seconds=0.01)
+        second = SingleFlight(async_redis, poll_interval_seconds=0.01)
+        return await asyncio.gather(first.run("k", compute, **_codec()), second.run("k", compute, **_codec()))
+
+    assert asyncio.run(main()) == ["result", "result"]
+    assert len(calls) == 1
+
+
+def test_lock_is_released_when_the_leader_fails(async_redis):
+    async def failing():
+        raise RuntimeError("pipeline crashed")
+
+    async def main():
+        flight = SingleFlight(async_redis, poll_interval_seconds=0.01)
+        with pytest.raises(RuntimeError):
+            await flight.run("k", failing, **_codec())
+        assert not await async_redis.exists("singleflight:lock:k")
+        assert not await async_redis.exists("singleflight:result:k")
+
+    asyncio.run(main())
+
+
+def test_runs_locally_while_redis_is_down(redis_server, async_redis):
+    redis_server.connected = False
+
+    async def compute():
+        return "local"
+
+    async def main():
+        return await SingleFlight(async_redis).run("k", compute, **_codec())
+
+    assert asyncio.run(main()) == "local"
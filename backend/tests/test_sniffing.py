@@ -0,0 +1,54 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.core.apis.analysis_router import get_resume_service, get_single_flight
+from backend.core.parsers import sniff_file_type
+from backend.main import app
+
+
+@pytest.mark.parametrize("head, filename, expected", [
+    (b"%PDF-1.7\n", "resume.pdf", ".pdf"),
+    (b"%PDF-1.4\n", "resume.docx", ".pdf"),
+    (b"PK\x03\x04\x14\x00", "resume.docx", ".docx"),
+    (b"PK\x03\x04\x14\x00", None, ".docx"),
+])
+def test_supported_content_is_detected(head, filename, expected):
+    assert sniff_file_type(head, filename) == expected
+
+
+@pytest.mark.parametrize("head, filename", [
+    (b"PK\x03\x04\x14\x00", "budget.xlsx"),
+    (b"Hello, I am", "resume.pdf"),
+    (b"", "resume.docx"),
+])
+def test_unsupported_content_is_rejected(head, filename):
+    with pytest.raises(ValueError):
+        sniff_file_type(head, filename)
+
+
+class _UnusedService:
+    def analyze_resume(self, **kwargs):
+        raise AssertionError("rejected uploads must not reach the pipeline")
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_resume_service] = _UnusedService
+    app.dependency_overrides[get_single_flight] = lambda: None
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_analyze_rejects_disguised_uploads_with_415(client):
+    response = client.post("/api/v1/analyze", data={"job_role": "Backend Engineer"},
+                           files={"file": ("resume.pdf", b"MZ\x90\x00 not a resume", "application/pdf")})
+    assert response.status_code == 415
+
+
+def test_analyze_rejects_oversized_uploads_with_413(client):
+    oversized = b"%PDF-1.7\n" + b"0" * (10 * 1024 * 1024)
+    response = client.post("/api/v1/analyze", data={"job_role": "Backend Engineer"},
+                           files={"file": ("resume.pdf", oversized, "application/pdf")})
+    assert response.status_code == 413
@@ -0,0 +1,33 @@
+from backend.core.tools.snippet_ranker import SnippetRanker, estimate_tokens
+
+
+def test_near_duplicate_snippets_are_kept_once():
+    about = "Acme builds payment infrastructure for online businesses around the world."
+    ranker = SnippetRanker()
+    kept = ranker.deduplicate([about, "  ", about + " Learn more.", "Acme engineers favour small, reviewed changes."])
+    assert kept == [about, "Acme engineers favour small, reviewed changes."]
+
+
+def test_snippets_are_ranked_by_relevance_to_the_query():
+    ranker = SnippetRanker()
+    snippets = [
+        "The weather in Springfield is sunny this week.",
+        "Acme backend engineers write Python services and run them on Kubernetes.",
+        "Acme was founded in 2009.",
+    ]
+    selected = ranker.select(snippets, "Backend Engineer Acme Python")
+    assert selected[0] == snippets[1]
+    assert selected.index(snippets[2]) < selected.index(snippets[0])
+
+
+def test_selection_fits_the_token_budget():
+    ranker = SnippetRanker(token_budget=30)
+    snippets = [f"Acme culture note number {i} about engineering practices and values." for i in range(20)]
+    selected = ranker.select(snippets, "Acme engineering culture")
+    assert sum(estimate_tokens(snippet) for snippet in selected) <= 30
+
+
+def test_a_single_oversized_snippet_is_truncated_not_dropped():
+    ranker = SnippetRanker(token_budget=10)
+    selected = ranker.select(["Acme " * 200], "Acme")
+    assert selected and len(selected[0]) <= 40
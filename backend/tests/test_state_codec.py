@@ -0,0 +1,30 @@
+import pytest
+
+from backend.core.data_models import OptimizerWorkflowState
+from backend.core.tools.state_codec import CODEC_RAW, CODEC_ZSTD, MAGIC, decode_model, encode_model
+
+
+def test_round_trip_compresses_large_states(workflow_state):
+    workflow_state = workflow_state.model_copy(update={"draft_resume_text": "Built payment services. " * 200})
+    data = encode_model(workflow_state)
+    assert data.startswith(MAGIC) and data[4] == CODEC_ZSTD
+    assert len(data) < len(workflow_state.model_dump_json())
+    assert decode_model(data, OptimizerWorkflowState) == workflow_state
+
+
+def test_small_payloads_are_stored_uncompressed(resume_sections):
+    data = encode_model(resume_sections.model_copy(update={"experience": "", "projects": "", "education": None}))
+    assert data[4] == CODEC_RAW
+    assert decode_model(data, type(resume_sections)).summary == resume_sections.summary
+
+
+def test_legacy_json_values_are_still_readable(workflow_state):
+    assert decode_model(workflow_state.model_dump_json().encode("utf-8"), OptimizerWorkflowState) == workflow_state
+
+
+def test_unknown_versions_and_codecs_are_rejected(resume_sections):
+    data = encode_model(resume_sections)
+    with pytest.raises(ValueError, match="version"):
+        decode_model(data[:3] + bytes([99]) + data[4:], type(resume_sections))
+    with pytest.raises(ValueError, match="codec"):
+        decode_model(data[:4] + bytes([7]) + data[5:], type(resume_sections))
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+
+from backend.core.tools.upload_limits import BodySizeLimitMiddleware
+
+
+def _client(max_bytes: int = 100) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(BodySizeLimitMiddleware, paths=["/upload"], max_bytes=max_bytes)
+
+    @app.post("/upload")
+    async def upload(request: Request):
+        return {"bytes": len(await request.body())}
+
+    @app.post("/other")
+    async def other(request: Request):
+        return {"bytes": len(await request.body())}
+
+    return TestClient(app)
+
+
+def test_bodies_within_the_limit_pass():
+    assert _client().post("/upload", content=b"x" * 100).json() == {"bytes": 100}
+
+
+def test_declared_oversized_bodies_are_rejected_with_413():
+    response = _client().post("/upload", content=b"x" * 101)
+    assert response.status_code == 413
+
+
+def test_streamed_bodies_are_cut_off_at_the_limit():
+    chunks_read = []
+
+    async def receive():
+        chunks_read.append(1)
+        return {"type": "http.request", "body": b"x" * 40, "more_body": len(chunks_read) < 10}
+
+    async def app(scope, receive, send):
+        while (await receive())["more_body"]:
+            pass
+
+    scope = {"type": "http", "path": "/upload", "headers": []}
+    with pytest.raises(HTTPException) as rejected:
+        asyncio.run(BodySizeLimitMiddleware(app, paths=["/upload"], max_bytes=100)(scope, receive, None))
+    assert rejected.value.status_code == 413
+    assert len(chunks_read) == 3
+
+
+def test_other_paths_are_not_limited():
+    assert _client().post("/other", content=b"x" * 1000).json() == {"bytes": 1000}
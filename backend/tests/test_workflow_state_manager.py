@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from backend.core.tools.workflow_state_manager import WorkflowStateManager
+
+
+@pytest.fixture
+def manager(async_redis):
+    return WorkflowStateManager(async_redis.connection_pool)
+
+
+def test_saved_state_round_trips_through_redis(manager, async_redis, resume_sections, workflow_state):
+    async def main():
+        workflow_id = await manager.save_state(resume_sections, ttl_seconds=60, workflow_state=workflow_state)
+        assert await async_redis.exists(workflow_id, f"{workflow_id}:state") == 2
+        # A fresh manager has an empty L1, so this read goes to Redis.
+        other_worker = WorkflowStateManager(async_redis.connection_pool)
+        assert await other_worker.load_state(workflow_id) == resume_sections
+        assert await other_worker.load_workflow_state(workflow_id) == workflow_state
+
+    asyncio.run(main())
+
+
+def test_reads_are_served_from_l1(manager, async_redis, resume_sections):
+    async def main():
+        workflow_id = await manager.save_state(resume_sections, ttl_seconds=60)
+        await async_redis.flushall()
+        assert await manager.load_state(workflow_id) == resume_sections
+
+    asyncio.run(main())
+
+
+def test_unknown_runs_raise_file_not_found(manager):
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(manager.load_state("missing"))
+
+
+def test_writes_are_buffered_while_redis_is_down_and_replayed(manager, redis_server, async_redis, resume_sections):
+    async def main():
+        redis_server.connected = False
+        workflow_id = await manager.save_state(resume_sections, ttl_seconds=60)
+        assert manager.degraded
+        # The worker that produced the run can still serve it.
+        assert await manager.load_state(workflow_id) == resume_sections
+
+        redis_server.connected = True
+        assert await manager.ping()
+        assert await manager.replay_pending() == 1
+        assert not manager.degraded
+        assert 0 < await async_redis.pttl(workflow_id) <= 60_000
+
+    asyncio.run(main())
+
+
+def test_uncached_reads_fail_fast_while_degraded(manager, redis_server, async_redis, resume_sections):
+    async def main():
+        workflow_id = await WorkflowStateManager(async_redis.connection_pool).save_state(resume_sections)
+        redis_server.connected = False
+        with pytest.raises(ConnectionError):
+            await manager.load_state(workflow_id)
+        assert manager.degraded
+
+    asyncio.run(main())
+
+
+def test_artifact_expires_with_its_state(manager, async_redis, resume_sections):
+    async def main():
+        workflow_id = await manager.save_state(resume_sections, ttl_seconds=60)
+        await manager.save_artifact(workflow_id, b"%PDF-1.7")
+        assert 0 < await async_redis.pttl(f"{workflow_id}:pdf") <= 60_000
+        assert await manager.load_state_with_artifact(workflow_id) == (resume_sections, b"%PDF-1.7")
+
+        await manager.save_artifact("expired", b"%PDF-1.7")
+        assert not await async_redis.exists("expired:pdf")
+
+    asyncio.run(main())
+
+
+def test_runs_without_redis_entirely(resume_sections, workflow_state):
+    async def main():
+        manager = WorkflowStateManager(None)
+        assert manager.degraded and not await manager.ping()
+        workflow_id = await manager.save_state(resume_sections, workflow_state=workflow_state)
+        assert await manager.load_workflow_state(workflow_id) == workflow_state
+
+    asyncio.run(main())
+
+
+def test_buffered_runs_stay_readable_after_l1_eviction(manager, redis_server, resume_sections):
+    async def main():
+        redis_server.connected = False
+        workflow_id = await manager.save_state(resume_sections, ttl_seconds=60)
+        manager.local.pop(workflow_id)
+        assert await manager.load_state(workflow_id) == resume_sections
+
+    asyncio.run(main())